@@ -11,8 +11,8 @@ AWS ALB 多账户配置工具 - 统一 CLI 入口
 import sys
 import os
 import argparse
+import importlib
 import subprocess
-import platform
 
 
 def run_command(cmd: list, description: str) -> int:
@@ -27,12 +27,9 @@ def run_command(cmd: list, description: str) -> int:
         返回码
     """
     try:
-        # Windows 需要 shell=True
-        use_shell = platform.system() == 'Windows'
-
+        # 命令首项是 sys.executable，无需经过 shell（Windows 上也不必启动 cmd.exe）
         result = subprocess.run(
             cmd,
-            shell=use_shell,
             check=False
         )
         return result.returncode
@@ -41,33 +38,83 @@ def run_command(cmd: list, description: str) -> int:
         return 1
 
 
+def run_script_main(module_name: str, script_args: list, description: str) -> int:
+    """
+    在当前进程内调用脚本的 main()
+
+    避免再启动一个 Python 解释器（以及重新 import boto3）的开销。
+
+    Args:
+        module_name: 脚本模块名（如 'get_alb_config'）
+        script_args: 传给脚本的命令行参数
+        description: 命令描述
+
+    Returns:
+        返回码
+    """
+    original_argv = sys.argv
+    sys.argv = [f'{module_name}.py'] + script_args
+
+    try:
+        module = importlib.import_module(module_name)
+        return module.main() or 0
+    except SystemExit as e:
+        # argparse 报错或脚本主动退出
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        print(f"✗ {description} 失败: {str(e)}")
+        return 1
+    finally:
+        sys.argv = original_argv
+
+
 def cmd_scan(args):
     """扫描 ALB 配置"""
-    cmd = ['python3' if platform.system() != 'Windows' else 'python', 'get_alb_config.py']
+    script_args = []
 
     # 添加参数
     if args.profiles:
-        cmd.extend(['-p'] + args.profiles)
+        script_args.extend(['-p'] + args.profiles)
 
     if args.regions:
-        cmd.extend(['-r'] + args.regions)
+        script_args.extend(['-r'] + args.regions)
 
     if args.mode:
-        cmd.extend(['--mode', args.mode])
+        script_args.extend(['--mode', args.mode])
 
     if args.output:
-        cmd.extend(['-o', args.output])
+        script_args.extend(['-o', args.output])
 
     if args.debug:
-        cmd.append('--debug')
+        script_args.append('--debug')
 
     if args.no_parallel:
-        cmd.append('--no-parallel')
+        script_args.append('--no-parallel')
+
+    if args.max_account_workers is not None:
+        script_args.extend(['--max-account-workers', str(args.max_account_workers)])
 
     if args.no_latest:
-        cmd.append('--no-latest')
+        script_args.append('--no-latest')
+
+    if args.cache_ttl:
+        script_args.extend(['--cache-ttl', str(args.cache_ttl)])
+
+    if args.invalidate_cache:
+        script_args.append('--invalidate-cache')
+
+    if args.jsonl:
+        script_args.extend(['--jsonl', args.jsonl])
+
+    if args.full_webacl:
+        script_args.append('--full-webacl')
 
-    return run_command(cmd, "ALB 配置扫描")
+    if args.subprocess:
+        return run_command([sys.executable, 'get_alb_config.py'] + script_args, "ALB 配置扫描")
+
+    return run_script_main('get_alb_config', script_args, "ALB 配置扫描")
 
 
 def cmd_analyze(args):
@@ -76,33 +123,40 @@ def cmd_analyze(args):
         print(f"✗ 文件不存在: {args.json_file}")
         return 1
 
-    cmd = ['python3' if platform.system() != 'Windows' else 'python',
-           'analyze_alb_config.py',
-           args.json_file]
+    script_args = [args.json_file]
 
     # 添加分析选项
     if args.list:
-        cmd.append('--list')
+        script_args.append('--list')
 
     if args.waf_coverage:
-        cmd.append('--waf-coverage')
+        script_args.append('--waf-coverage')
 
     if args.no_waf:
-        cmd.append('--no-waf')
+        script_args.append('--no-waf')
 
     if args.by_type:
-        cmd.append('--by-type')
+        script_args.append('--by-type')
 
     if args.by_region:
-        cmd.append('--by-region')
+        script_args.append('--by-region')
 
     if args.search:
-        cmd.extend(['--search', args.search])
+        script_args.extend(['--search'] + args.search)
 
     if args.csv:
-        cmd.extend(['--csv', args.csv])
+        script_args.extend(['--csv', args.csv])
+
+    if args.stream:
+        script_args.append('--stream')
+
+    if args.no_cache:
+        script_args.append('--no-cache')
+
+    if args.subprocess:
+        return run_command([sys.executable, 'analyze_alb_config.py'] + script_args, "ALB 配置分析")
 
-    return run_command(cmd, "ALB 配置分析")
+    return run_script_main('analyze_alb_config', script_args, "ALB 配置分析")
 
 
 def cmd_check_env(args):
@@ -177,8 +231,21 @@ def main():
 
     scan_parser.add_argument('--no-parallel', action='store_true',
                             help='禁用并行扫描')
+    scan_parser.add_argument('--max-account-workers', type=int, default=None, metavar='N',
+                            help='并行扫描的账户数（默认: min(账户数, 16)）')
     scan_parser.add_argument('--no-latest', action='store_true',
                             help='只生成带时间戳的文件，不生成 latest 文件')
+    scan_parser.add_argument('--cache-ttl', type=int, default=0, metavar='SECONDS',
+                            help='缓存 ALB 详情的有效期（秒），默认 0 不使用缓存')
+    scan_parser.add_argument('--invalidate-cache', action='store_true',
+                            help='扫描前清空 ALB 详情缓存')
+    scan_parser.add_argument('--jsonl', metavar='FILE',
+                            help='每个账户扫描完成后立即追加一行到该 JSONL 文件（内存中不保留完整结果）')
+    scan_parser.add_argument('--full-webacl', action='store_true',
+                            help='保留完整的 Web ACL（含规则定义），默认只保留 Name/Id/ARN/Description')
+
+    scan_parser.add_argument('--subprocess', action='store_true',
+                            help='在独立子进程中运行扫描（默认在当前进程内运行）')
 
     # ========== analyze 子命令 ==========
     analyze_parser = subparsers.add_parser('analyze', help='分析 ALB 配置')
@@ -201,12 +268,21 @@ def main():
     analyze_parser.add_argument('--by-region', action='store_true',
                                help='按区域统计')
 
-    analyze_parser.add_argument('--search',
-                               help='搜索指定名称的 ALB')
+    analyze_parser.add_argument('--search', nargs='+',
+                               help='搜索指定名称的 ALB（可指定多个关键字）')
 
     analyze_parser.add_argument('--csv',
                                help='导出为 CSV 文件')
 
+    analyze_parser.add_argument('--stream', action='store_true',
+                               help='流式解析 JSON（需要 ijson，适合超大扫描结果）')
+
+    analyze_parser.add_argument('--no-cache', action='store_true',
+                               help='不使用解析结果缓存')
+
+    analyze_parser.add_argument('--subprocess', action='store_true',
+                               help='在独立子进程中运行分析（默认在当前进程内运行）')
+
     # ========== check-env 子命令 ==========
     check_env_parser = subparsers.add_parser('check-env', help='检查环境配置')
 
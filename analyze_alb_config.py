@@ -6,26 +6,259 @@ ALB 配置分析工具
 生成可读的报告和统计信息
 """
 
-import json
 import argparse
 import csv
-from collections import defaultdict
-from typing import Dict, List, Any
+import hashlib
+import os
+import pickle
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from operator import attrgetter, itemgetter
+from typing import Dict, List, Any, Iterator, Union
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，仅 --stream 模式需要
+    ijson = None
+
+from core.file_utils import load_json_file
+
+# 扁平记录缓存目录；ALBRow 结构变化时需要递增缓存版本
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'alb_cli')
+CACHE_VERSION = 1
+
+
+@dataclass
+class ALBRow:
+    """单个 ALB 的扁平化记录（加载时从嵌套 JSON 中一次性提取）"""
+
+    __slots__ = (
+        'account_id', 'profile', 'region', 'name', 'type', 'state', 'scheme',
+        'dns', 'vpc_id', 'has_waf', 'waf_name', 'waf_id', 'waf_arn',
+        'listener_count', 'tg_count'
+    )
+
+    account_id: str
+    profile: str
+    region: str
+    name: str
+    type: str
+    state: str
+    scheme: str
+    dns: str
+    vpc_id: str
+    has_waf: bool
+    waf_name: str
+    waf_id: str
+    waf_arn: str
+    listener_count: int
+    tg_count: int
+
+    def as_csv_row(self) -> tuple:
+        """按 export_csv 的列顺序返回一行"""
+        return (
+            self.account_id, self.profile, self.region, self.name, self.type,
+            self.state, self.scheme, self.dns, self.vpc_id,
+            'Yes' if self.has_waf else 'No', self.waf_name, self.waf_id, self.waf_arn,
+            self.listener_count, self.tg_count
+        )
 
 
 class ALBConfigAnalyzer:
     """ALB 配置分析器"""
 
-    def __init__(self, json_file: str):
-        """加载 JSON 数据"""
-        with open(json_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+    def __init__(self, json_file: str, stream: bool = False, use_cache: bool = True):
+        """
+        加载 JSON 数据
+
+        Args:
+            json_file: ALB 配置 JSON 文件
+            stream: 是否使用 ijson 流式解析（不一次性加载整个文件，适合超大扫描结果）
+            use_cache: 是否使用扁平记录缓存（按文件路径 + 修改时间 + 大小命中，命中时跳过 JSON 解析）
+        """
+        self.json_file = json_file
+        self.stream = stream
+        self.data = None  # 原始 JSON 数据，按需加载（只有高级统计需要）
+
+        # 汇总统计（首次使用时由 _collect_stats 一次遍历生成）
+        self._stats = None
 
-        # 检测扫描模式（从第一个账户读取）
+        if use_cache and self._load_cache():
+            return
+
+        # 检测扫描模式，并将每个 ALB 提取为扁平记录
         self.scan_modes = {}
-        for account in self.data:
+        self._accounts = []
+        self._rows = []
+        self._region_names = {}  # 按出现顺序记录所有区域（包括没有 ALB 的区域）
+        for account in self.iter_accounts():
             account_id = account.get('account_info', {}).get('account_id', 'Unknown')
             self.scan_modes[account_id] = account.get('scan_mode', 'unknown')
+            self._accounts.append(self._extract_account(account, account_id))
+
+        if use_cache:
+            self._save_cache()
+
+    def _cache_path(self) -> str:
+        """根据文件路径、修改时间和大小计算缓存文件路径"""
+        stat = os.stat(self.json_file)
+        key = f"{os.path.abspath(self.json_file)}|{stat.st_mtime_ns}|{stat.st_size}|{CACHE_VERSION}"
+        return os.path.join(CACHE_DIR, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '.pkl')
+
+    def _load_cache(self) -> bool:
+        """尝试从缓存加载扁平记录，成功返回 True"""
+        try:
+            with open(self._cache_path(), 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # 缓存不存在或已损坏，重新解析
+            return False
+
+        self.scan_modes = cached['scan_modes']
+        self._accounts = cached['accounts']
+        self._region_names = cached['region_names']
+        self._rows = [row for account in self._accounts for row in account['rows']]
+        return True
+
+    def _save_cache(self):
+        """保存扁平记录到缓存（失败不影响分析）"""
+        cached = {
+            'scan_modes': self.scan_modes,
+            'accounts': self._accounts,
+            'region_names': self._region_names
+        }
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(self._cache_path(), 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+    def iter_accounts(self) -> Iterator[Dict[str, Any]]:
+        """逐个返回账户数据（流式模式下每次只在内存中保留一个账户）"""
+        if not self.stream:
+            if self.data is None:
+                self.data = load_json_file(self.json_file)
+            yield from self.data
+            return
+
+        with open(self.json_file, 'rb') as f:
+            yield from ijson.items(f, 'item')
+
+    def _extract_account(self, account: Dict[str, Any], account_id: str) -> Dict[str, Any]:
+        """提取账户摘要和该账户下所有 ALB 的扁平记录"""
+        profile = account.get('profile', 'Unknown')
+        rows = []
+
+        for region_data in account.get('regions', []):
+            region = region_data['region']
+            self._region_names.setdefault(region, None)
+
+            for alb in region_data.get('load_balancers', []):
+                basic = alb.get('basic_info', {})
+                waf = alb.get('waf_association', {})
+                has_waf = bool(waf.get('has_waf'))
+                web_acl = (waf.get('WebACL') or {}) if has_waf else {}
+
+                rows.append(ALBRow(
+                    account_id=account_id,
+                    profile=profile,
+                    region=region,
+                    name=basic.get('LoadBalancerName', ''),
+                    type=basic.get('FriendlyType', basic.get('Type', '')),
+                    state=basic.get('State', {}).get('Code', ''),
+                    scheme=basic.get('Scheme', ''),
+                    dns=basic.get('DNSName', ''),
+                    vpc_id=basic.get('VpcId', ''),
+                    has_waf=has_waf,
+                    waf_name=web_acl.get('Name', ''),
+                    waf_id=web_acl.get('Id', ''),
+                    waf_arn=web_acl.get('ARN', ''),
+                    listener_count=len(alb.get('listeners', [])),
+                    tg_count=len(alb.get('target_groups', []))
+                ))
+
+        self._rows.extend(rows)
+
+        return {
+            'account_id': account_id,
+            'profile': profile,
+            'scan_time': account.get('scan_time', 'Unknown'),
+            'scan_mode': account.get('scan_mode', 'unknown'),
+            'rows': rows
+        }
+
+    @staticmethod
+    def _group_by_region(rows: List[ALBRow]) -> Iterator[tuple]:
+        """按区域分组（rows 已按区域顺序排列），返回 (region, rows)"""
+        group = []
+        for row in rows:
+            if group and row.region != group[0].region:
+                yield group[0].region, group
+                group = []
+            group.append(row)
+        if group:
+            yield group[0].region, group
+
+    @staticmethod
+    def _lowercase_names(account: Dict[str, Any]) -> List[str]:
+        """返回账户下所有 ALB 的小写名称（与 account['rows'] 一一对应，首次搜索时生成并缓存）"""
+        names = account.get('lowercase_names')
+        if names is None:
+            names = account['lowercase_names'] = [row.name.lower() for row in account['rows']]
+        return names
+
+    @staticmethod
+    def _account_stat(account: Dict[str, Any]) -> Dict[str, Any]:
+        """计算单个账户的 WAF 覆盖率（只依赖该账户自身的记录）"""
+        rows = account['rows']
+        total = len(rows)
+        with_waf = sum(map(attrgetter('has_waf'), rows))
+
+        return {
+            'account_id': account['account_id'],
+            'profile': account['profile'],
+            'total': total,
+            'with_waf': with_waf,
+            'without_waf': total - with_waf,
+            'coverage': (with_waf / total * 100) if total > 0 else 0
+        }
+
+    def _collect_stats(self) -> Dict[str, Any]:
+        """
+        基于扁平记录收集 WAF 覆盖率、类型、区域统计
+
+        结果会被缓存，analyze_waf_coverage / analyze_by_type / analyze_by_region
+        共用同一份统计，不再各自遍历全部数据。
+        """
+        if self._stats is not None:
+            return self._stats
+
+        # 按维度分组计数（Counter 在 C 层完成计数，相当于 groupby().size()）
+        region_totals = Counter(map(attrgetter('region'), self._rows))
+        region_with_waf = Counter(row.region for row in self._rows if row.has_waf)
+        type_stats = Counter(row.type or 'Unknown' for row in self._rows)
+
+        region_stats = {
+            region: {'total': region_totals[region], 'with_waf': region_with_waf[region]}
+            for region in self._region_names
+        }
+
+        account_stats = list(map(self._account_stat, self._accounts))
+
+        self._stats = {
+            'accounts': account_stats,
+            'types': type_stats,
+            'regions': region_stats
+        }
+        return self._stats
+
+    def has_albs(self) -> bool:
+        """是否有任何 ALB"""
+        return bool(self._rows)
 
     def show_scan_info(self):
         """显示扫描信息"""
@@ -40,56 +273,40 @@ class ALBConfigAnalyzer:
             'unknown': '未知模式'
         }
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile', 'Unknown')
-            scan_time = account.get('scan_time', 'Unknown')
-            scan_mode = account.get('scan_mode', 'unknown')
+        for account in self._accounts:
+            mode_desc = mode_descriptions.get(account['scan_mode'], account['scan_mode'])
 
-            mode_desc = mode_descriptions.get(scan_mode, scan_mode)
-
-            print(f"\n账户: {account_id} ({profile})")
-            print(f"  扫描时间: {scan_time}")
+            print(f"\n账户: {account['account_id']} ({account['profile']})")
+            print(f"  扫描时间: {account['scan_time']}")
             print(f"  扫描模式: {mode_desc}")
 
     def list_all_albs(self):
         """列出所有 ALB"""
-        print("\n" + "="*80)
-        print("所有 ALB 列表")
-        print("="*80)
+        lines = ["\n" + "="*80, "所有 ALB 列表", "="*80]
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile', 'Unknown')
+        for account in self._accounts:
+            # 没有 ALB 的账户不输出
+            if not account['rows']:
+                continue
 
-            print(f"\n账户: {account_id} ({profile})")
+            lines.append(f"\n账户: {account['account_id']} ({account['profile']})")
 
-            for region_data in account.get('regions', []):
-                region = region_data['region']
-                albs = region_data.get('load_balancers', [])
+            for region, rows in self._group_by_region(account['rows']):
+                lines.append(f"\n  区域: {region}")
 
-                if albs:
-                    print(f"\n  区域: {region}")
+                for row in rows:
+                    waf_status = "✓ 有 WAF" if row.has_waf else "✗ 无 WAF"
 
-                    for alb in albs:
-                        basic = alb.get('basic_info', {})
-                        waf = alb.get('waf_association', {})
+                    if row.has_waf:
+                        waf_status += f" ({row.waf_name or 'Unknown'})"
 
-                        name = basic.get('LoadBalancerName', 'Unknown')
-                        alb_type = basic.get('FriendlyType', basic.get('Type', 'Unknown'))
-                        state = basic.get('State', {}).get('Code', 'Unknown')
-                        dns = basic.get('DNSName', 'N/A')
-                        waf_status = "✓ 有 WAF" if waf.get('has_waf') else "✗ 无 WAF"
+                    lines.append(f"    • {row.name or 'Unknown'}")
+                    lines.append(f"      类型: {row.type or 'Unknown'}")
+                    lines.append(f"      状态: {row.state or 'Unknown'}")
+                    lines.append(f"      DNS: {row.dns or 'N/A'}")
+                    lines.append(f"      WAF: {waf_status}")
 
-                        if waf.get('has_waf'):
-                            waf_name = waf.get('WebACL', {}).get('Name', 'Unknown')
-                            waf_status += f" ({waf_name})"
-
-                        print(f"    • {name}")
-                        print(f"      类型: {alb_type}")
-                        print(f"      状态: {state}")
-                        print(f"      DNS: {dns}")
-                        print(f"      WAF: {waf_status}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def analyze_waf_coverage(self):
         """分析 WAF 覆盖率"""
@@ -97,41 +314,12 @@ class ALBConfigAnalyzer:
         print("WAF 覆盖率分析")
         print("="*80)
 
-        # 全局统计
-        total_albs = 0
-        total_with_waf = 0
-        total_without_waf = 0
-
-        # 按账户统计
-        account_stats = []
-
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile', 'Unknown')
-
-            account_albs = 0
-            account_with_waf = 0
+        account_stats = self._collect_stats()['accounts']
 
-            for region_data in account.get('regions', []):
-                albs = region_data.get('load_balancers', [])
-                account_albs += len(albs)
-                account_with_waf += sum(1 for alb in albs if alb['waf_association']['has_waf'])
-
-            account_without_waf = account_albs - account_with_waf
-            account_coverage = (account_with_waf / account_albs * 100) if account_albs > 0 else 0
-
-            account_stats.append({
-                'account_id': account_id,
-                'profile': profile,
-                'total': account_albs,
-                'with_waf': account_with_waf,
-                'without_waf': account_without_waf,
-                'coverage': account_coverage
-            })
-
-            total_albs += account_albs
-            total_with_waf += account_with_waf
-            total_without_waf += account_without_waf
+        # 全局统计
+        total_albs = sum(stat['total'] for stat in account_stats)
+        total_with_waf = sum(stat['with_waf'] for stat in account_stats)
+        total_without_waf = total_albs - total_with_waf
 
         # 打印按账户统计
         print("\n按账户统计:")
@@ -151,46 +339,32 @@ class ALBConfigAnalyzer:
 
     def find_without_waf(self):
         """列出未绑定 WAF 的 ALB"""
-        print("\n" + "="*80)
-        print("未绑定 WAF 的 ALB（安全审计）")
-        print("="*80)
+        lines = ["\n" + "="*80, "未绑定 WAF 的 ALB（安全审计）", "="*80]
 
         found_any = False
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile', 'Unknown')
-
-            account_has_unwaf = False
-
-            for region_data in account.get('regions', []):
-                region = region_data['region']
-                albs = region_data.get('load_balancers', [])
-
-                unwaf_albs = [alb for alb in albs if not alb['waf_association']['has_waf']]
+        for account in self._accounts:
+            unwaf_rows = [row for row in account['rows'] if not row.has_waf]
 
-                if unwaf_albs:
-                    if not account_has_unwaf:
-                        print(f"\n账户: {account_id} ({profile})")
-                        account_has_unwaf = True
-                        found_any = True
+            if not unwaf_rows:
+                continue
 
-                    print(f"\n  区域: {region}")
+            lines.append(f"\n账户: {account['account_id']} ({account['profile']})")
+            found_any = True
 
-                    for alb in unwaf_albs:
-                        basic = alb.get('basic_info', {})
-                        name = basic.get('LoadBalancerName', 'Unknown')
-                        alb_type = basic.get('FriendlyType', basic.get('Type', 'Unknown'))
-                        scheme = basic.get('Scheme', 'Unknown')
-                        dns = basic.get('DNSName', 'N/A')
+            for region, rows in self._group_by_region(unwaf_rows):
+                lines.append(f"\n  区域: {region}")
 
-                        print(f"    ⚠️  {name}")
-                        print(f"        类型: {alb_type}")
-                        print(f"        方案: {scheme}")
-                        print(f"        DNS: {dns}")
+                for row in rows:
+                    lines.append(f"    ⚠️  {row.name or 'Unknown'}")
+                    lines.append(f"        类型: {row.type or 'Unknown'}")
+                    lines.append(f"        方案: {row.scheme or 'Unknown'}")
+                    lines.append(f"        DNS: {row.dns or 'N/A'}")
 
         if not found_any:
-            print("\n✓ 所有 ALB 都已绑定 WAF")
+            lines.append("\n✓ 所有 ALB 都已绑定 WAF")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def analyze_by_type(self):
         """按类型统计"""
@@ -198,16 +372,10 @@ class ALBConfigAnalyzer:
         print("按类型统计")
         print("="*80)
 
-        type_stats = defaultdict(int)
-
-        for account in self.data:
-            for region_data in account.get('regions', []):
-                for alb in region_data.get('load_balancers', []):
-                    alb_type = alb.get('basic_info', {}).get('FriendlyType', 'Unknown')
-                    type_stats[alb_type] += 1
+        type_stats = self._collect_stats()['types']
 
         print("\n负载均衡器类型分布:")
-        for alb_type, count in sorted(type_stats.items(), key=lambda x: x[1], reverse=True):
+        for alb_type, count in sorted(type_stats.items(), key=itemgetter(1), reverse=True):
             print(f"  {alb_type}: {count}")
 
     def analyze_by_region(self):
@@ -216,72 +384,61 @@ class ALBConfigAnalyzer:
         print("按区域统计")
         print("="*80)
 
-        region_stats = defaultdict(lambda: {'total': 0, 'with_waf': 0})
+        region_stats = self._collect_stats()['regions']
 
-        for account in self.data:
-            for region_data in account.get('regions', []):
-                region = region_data['region']
-                albs = region_data.get('load_balancers', [])
-
-                region_stats[region]['total'] += len(albs)
-                region_stats[region]['with_waf'] += sum(
-                    1 for alb in albs if alb['waf_association']['has_waf']
-                )
+        region_rows = [
+            (region, stats['total'], stats['with_waf']) for region, stats in region_stats.items()
+        ]
 
         print("\n区域分布:")
-        for region, stats in sorted(region_stats.items(), key=lambda x: x[1]['total'], reverse=True):
-            total = stats['total']
-            with_waf = stats['with_waf']
+        for region, total, with_waf in sorted(region_rows, key=itemgetter(1), reverse=True):
             coverage = (with_waf / total * 100) if total > 0 else 0
 
             print(f"  {region}: {total} 个 ALB ({with_waf} 个有 WAF, {coverage:.1f}%)")
 
-    def search(self, name_pattern: str):
-        """搜索指定名称的 ALB"""
-        print("\n" + "="*80)
-        print(f"搜索结果: '{name_pattern}'")
-        print("="*80)
+    def search(self, name_patterns: Union[str, List[str]]):
+        """
+        搜索指定名称的 ALB
 
-        found_any = False
+        Args:
+            name_patterns: 名称关键字（不区分大小写），可传入多个，匹配任意一个即命中
+        """
+        if isinstance(name_patterns, str):
+            name_patterns = [name_patterns]
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile', 'Unknown')
+        pattern_desc = ', '.join(f"'{pattern}'" for pattern in name_patterns)
+        lines = ["\n" + "="*80, f"搜索结果: {pattern_desc}", "="*80]
 
-            for region_data in account.get('regions', []):
-                region = region_data['region']
-                albs = region_data.get('load_balancers', [])
+        found_any = False
 
-                matching_albs = [
-                    alb for alb in albs
-                    if name_pattern.lower() in alb.get('basic_info', {}).get('LoadBalancerName', '').lower()
-                ]
+        # 所有关键字编译为一个正则，每个名称只扫描一遍
+        matcher = re.compile('|'.join(re.escape(pattern.lower()) for pattern in name_patterns))
 
-                if matching_albs:
-                    found_any = True
-                    print(f"\n账户: {account_id} ({profile}), 区域: {region}")
+        for account in self._accounts:
+            matching_rows = [
+                row for row, lowercase_name in zip(account['rows'], self._lowercase_names(account))
+                if matcher.search(lowercase_name)
+            ]
 
-                    for alb in matching_albs:
-                        basic = alb.get('basic_info', {})
-                        waf = alb.get('waf_association', {})
+            for region, rows in self._group_by_region(matching_rows):
+                found_any = True
+                lines.append(f"\n账户: {account['account_id']} ({account['profile']}), 区域: {region}")
 
-                        name = basic.get('LoadBalancerName', 'Unknown')
-                        alb_type = basic.get('FriendlyType', basic.get('Type', 'Unknown'))
-                        state = basic.get('State', {}).get('Code', 'Unknown')
-                        dns = basic.get('DNSName', 'N/A')
-                        waf_status = "有 WAF" if waf.get('has_waf') else "无 WAF"
+                for row in rows:
+                    waf_status = "有 WAF" if row.has_waf else "无 WAF"
 
-                        if waf.get('has_waf'):
-                            waf_name = waf.get('WebACL', {}).get('Name', 'Unknown')
-                            waf_status += f" ({waf_name})"
+                    if row.has_waf:
+                        waf_status += f" ({row.waf_name or 'Unknown'})"
 
-                        print(f"  • {name}")
-                        print(f"    类型: {alb_type}, 状态: {state}")
-                        print(f"    DNS: {dns}")
-                        print(f"    WAF: {waf_status}")
+                    lines.append(f"  • {row.name or 'Unknown'}")
+                    lines.append(f"    类型: {row.type or 'Unknown'}, 状态: {row.state or 'Unknown'}")
+                    lines.append(f"    DNS: {row.dns or 'N/A'}")
+                    lines.append(f"    WAF: {waf_status}")
 
         if not found_any:
-            print(f"\n未找到匹配 '{name_pattern}' 的 ALB")
+            lines.append(f"\n未找到匹配 {pattern_desc} 的 ALB")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def analyze_advanced_stats(self):
         """根据扫描模式分析高级统计（Standard/Full 模式专用）"""
@@ -308,60 +465,59 @@ class ALBConfigAnalyzer:
         total_target_groups = 0
         total_rules = 0
         total_targets = 0
-        health_states = defaultdict(int)
+        health_states = Counter()
 
-        listener_protocols = defaultdict(int)
-        target_group_protocols = defaultdict(int)
+        listener_protocols = Counter()
+        target_group_protocols = Counter()
 
-        for account in self.data:
+        for account in self.iter_accounts():
             scan_mode = account.get('scan_mode', 'unknown')
 
-            for region_data in account.get('regions', []):
-                for alb in region_data.get('load_balancers', []):
-                    # 监听器统计（standard 和 full）
-                    if scan_mode in ['standard', 'full']:
-                        listeners = alb.get('listeners', [])
-                        total_listeners += len(listeners)
+            # 监听器 / 目标组统计（仅 standard 和 full 模式有数据）
+            if scan_mode not in ('standard', 'full'):
+                continue
 
-                        for listener in listeners:
-                            protocol = listener.get('Protocol', 'Unknown')
-                            listener_protocols[protocol] += 1
+            is_full = scan_mode == 'full'
 
-                            # 规则统计（仅 full 模式）
-                            if scan_mode == 'full':
-                                rules = listener.get('Rules', [])
-                                total_rules += len(rules)
-
-                        # 目标组统计
-                        target_groups = alb.get('target_groups', [])
-                        total_target_groups += len(target_groups)
+            for region_data in account.get('regions', []):
+                for alb in region_data.get('load_balancers', []):
+                    listeners = alb.get('listeners', [])
+                    total_listeners += len(listeners)
+                    listener_protocols.update(
+                        listener.get('Protocol', 'Unknown') for listener in listeners
+                    )
+
+                    target_groups = alb.get('target_groups', [])
+                    total_target_groups += len(target_groups)
+                    target_group_protocols.update(
+                        tg.get('Protocol', 'Unknown') for tg in target_groups
+                    )
+
+                    # 规则和目标健康状态统计（仅 full 模式）
+                    if is_full:
+                        total_rules += sum(len(listener.get('Rules', [])) for listener in listeners)
 
                         for tg in target_groups:
-                            protocol = tg.get('Protocol', 'Unknown')
-                            target_group_protocols[protocol] += 1
-
-                            # 目标健康状态统计（仅 full 模式）
-                            if scan_mode == 'full':
-                                target_health = tg.get('target_health', [])
-                                total_targets += len(target_health)
-
-                                for target in target_health:
-                                    state = target.get('TargetHealth', {}).get('State', 'Unknown')
-                                    health_states[state] += 1
+                            target_health = tg.get('target_health', [])
+                            total_targets += len(target_health)
+                            health_states.update(
+                                target.get('TargetHealth', {}).get('State', 'Unknown')
+                                for target in target_health
+                            )
 
         # 打印统计
         print("\n监听器统计:")
         print(f"  总监听器数: {total_listeners}")
         if listener_protocols:
             print("  协议分布:")
-            for protocol, count in sorted(listener_protocols.items(), key=lambda x: x[1], reverse=True):
+            for protocol, count in sorted(listener_protocols.items(), key=itemgetter(1), reverse=True):
                 print(f"    {protocol}: {count}")
 
         print("\n目标组统计:")
         print(f"  总目标组数: {total_target_groups}")
         if target_group_protocols:
             print("  协议分布:")
-            for protocol, count in sorted(target_group_protocols.items(), key=lambda x: x[1], reverse=True):
+            for protocol, count in sorted(target_group_protocols.items(), key=itemgetter(1), reverse=True):
                 print(f"    {protocol}: {count}")
 
         # Full 模式专有统计
@@ -373,7 +529,7 @@ class ALBConfigAnalyzer:
             print("\n目标健康状态（Full 模式）:")
             print(f"  总目标数: {total_targets}")
             if health_states:
-                for state, count in sorted(health_states.items(), key=lambda x: x[1], reverse=True):
+                for state, count in sorted(health_states.items(), key=itemgetter(1), reverse=True):
                     percentage = (count / total_targets * 100) if total_targets > 0 else 0
                     emoji = "✅" if state == "healthy" else "⚠️" if state == "unhealthy" else "🔄"
                     print(f"    {emoji} {state}: {count} ({percentage:.1f}%)")
@@ -385,7 +541,8 @@ class ALBConfigAnalyzer:
         """导出为 CSV"""
         print(f"\n导出到 CSV: {output_file}")
 
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        # 使用较大的写缓冲，减少逐行写入时的系统调用
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
             fieldnames = [
                 'Account_ID', 'Profile', 'Region', 'ALB_Name', 'Type',
                 'State', 'Scheme', 'DNS_Name', 'VPC_ID',
@@ -393,40 +550,9 @@ class ALBConfigAnalyzer:
                 'Listener_Count', 'TargetGroup_Count'
             ]
 
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for account in self.data:
-                account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-                profile = account.get('profile', 'Unknown')
-
-                for region_data in account.get('regions', []):
-                    region = region_data['region']
-                    albs = region_data.get('load_balancers', [])
-
-                    for alb in albs:
-                        basic = alb.get('basic_info', {})
-                        waf = alb.get('waf_association', {})
-
-                        row = {
-                            'Account_ID': account_id,
-                            'Profile': profile,
-                            'Region': region,
-                            'ALB_Name': basic.get('LoadBalancerName', ''),
-                            'Type': basic.get('FriendlyType', basic.get('Type', '')),
-                            'State': basic.get('State', {}).get('Code', ''),
-                            'Scheme': basic.get('Scheme', ''),
-                            'DNS_Name': basic.get('DNSName', ''),
-                            'VPC_ID': basic.get('VpcId', ''),
-                            'Has_WAF': 'Yes' if waf.get('has_waf') else 'No',
-                            'WAF_Name': waf.get('WebACL', {}).get('Name', '') if waf.get('has_waf') else '',
-                            'WAF_ID': waf.get('WebACL', {}).get('Id', '') if waf.get('has_waf') else '',
-                            'WAF_ARN': waf.get('WebACL', {}).get('ARN', '') if waf.get('has_waf') else '',
-                            'Listener_Count': len(alb.get('listeners', [])),
-                            'TargetGroup_Count': len(alb.get('target_groups', []))
-                        }
-
-                        writer.writerow(row)
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            writer.writerows(row.as_csv_row() for row in self._rows)
 
         print(f"✓ 已导出 CSV 文件")
 
@@ -445,13 +571,29 @@ def main():
                         help='显示高级统计（监听器、目标组、健康状态等，需要 Standard/Full 模式）')
     parser.add_argument('--by-type', action='store_true', help='按类型统计')
     parser.add_argument('--by-region', action='store_true', help='按区域统计')
-    parser.add_argument('--search', help='搜索指定名称的 ALB')
+    parser.add_argument('--search', nargs='+', help='搜索指定名称的 ALB（可指定多个关键字）')
     parser.add_argument('--csv', help='导出为 CSV 文件')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式解析 JSON（需要 ijson，适合超大扫描结果）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'不使用解析结果缓存（缓存目录: {CACHE_DIR}）')
 
     args = parser.parse_args()
 
+    if args.stream and ijson is None:
+        print("✗ --stream 需要安装 ijson: pip install ijson")
+        return 1
+
     # 加载分析器
-    analyzer = ALBConfigAnalyzer(args.json_file)
+    analyzer = ALBConfigAnalyzer(args.json_file, stream=args.stream, use_cache=not args.no_cache)
+
+    # 没有任何 ALB 时跳过所有分析（CSV 仍然导出，只包含表头）
+    if not analyzer.has_albs():
+        analyzer.show_scan_info()
+        print("\n未找到任何 ALB，跳过分析")
+        if args.csv:
+            analyzer.export_csv(args.csv)
+        return 0
 
     # 如果没有指定任何选项，执行全部分析
     if not any([args.list, args.waf_coverage, args.no_waf, args.stats, args.by_type,
@@ -9,255 +9,431 @@ Route53 配置分析工具
 import json
 import argparse
 import csv
-from collections import defaultdict
-from typing import Dict, List, Any
+import re
+import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, Iterator, Optional
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，未安装时一次性加载整个文件
+    ijson = None
+
+from core.file_utils import load_json_file
+
+# 流式解析过程中可能出现的 JSON 格式错误
+JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson else ())
+
+
+@lru_cache(maxsize=32)
+def _compile_search_pattern(pattern: str):
+    """编译忽略大小写的字面量搜索正则（按 pattern 缓存）"""
+    return re.compile(re.escape(pattern), re.IGNORECASE)
+
+
+# 应配置健康检查的高级路由策略
+HEALTH_CHECK_POLICIES = frozenset(('Failover', 'Weighted', 'Latency', 'Multivalue'))
 
 
 class Route53ConfigAnalyzer:
     """Route53 配置分析器"""
 
-    def __init__(self, json_file: str):
-        """加载 JSON 数据"""
-        with open(json_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+    def __init__(self, json_file: str, stream: bool = True):
+        """
+        加载 JSON 数据
+
+        Args:
+            json_file: Route53 配置 JSON 文件
+            stream: 是否使用 ijson 流式解析（默认开启，每次只在内存中保留一个账户；
+                    未安装 ijson 时自动回退到一次性加载）
+        """
+        self.json_file = json_file
+        self.stream = stream and ijson is not None
+
+        if self.stream:
+            # 只检查文件可读，数据在各分析方法中按账户流式读取
+            with open(json_file, 'rb'):
+                pass
+            self.data = None
+        else:
+            self.data = load_json_file(json_file)
+
+    def iter_accounts(self) -> Iterator[Dict[str, Any]]:
+        """逐个返回账户数据（流式模式下每次调用都会重新读取文件）"""
+        if self.data is not None:
+            yield from self.data
+            return
+
+        with open(self.json_file, 'rb') as f:
+            yield from ijson.items(f, 'item')
+
+    @staticmethod
+    def _write_lines(lines: List[str]):
+        """一次性输出缓冲的行并清空缓冲区"""
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            lines.clear()
+
+    @staticmethod
+    def _append_zone_lines(zone: Dict, lines: List[str]):
+        """追加单个 Hosted Zone 的清单行"""
+        basic = zone['basic_info']
+        zone_name = basic['Name']
+        zone_type = "私有" if basic['Config']['PrivateZone'] else "公有"
+        record_count = basic['ResourceRecordSetCount']
+
+        lines.append(f"  • {zone_name} ({zone_type}, {record_count} 条记录)")
+
+        if basic['Config'].get('Comment'):
+            lines.append(f"    注释: {basic['Config']['Comment']}")
+
+        # 如果是私有 Zone，显示 VPC 关联
+        vpcs = zone.get('vpcs', [])
+        if vpcs:
+            lines.append(f"    关联 VPC: {len(vpcs)} 个")
+            for vpc in vpcs[:3]:  # 最多显示前 3 个
+                vpc_id = vpc.get('VPCId', 'Unknown')
+                vpc_name = vpc.get('VPCName', 'N/A')
+                vpc_region = vpc.get('VPCRegion', 'Unknown')
+                lines.append(f"      - {vpc_id} ({vpc_name}) @ {vpc_region}")
+            if len(vpcs) > 3:
+                lines.append(f"      ... 还有 {len(vpcs) - 3} 个")
+
+    @staticmethod
+    def _count_zone_type(basic: Dict, zone_stats: Dict[str, int]):
+        """累计公有/私有 Zone 数量及记录数"""
+        kind = 'private' if basic['Config']['PrivateZone'] else 'public'
+        zone_stats[kind] += 1
+        zone_stats[f'{kind}_records'] += basic['ResourceRecordSetCount']
+
+    @staticmethod
+    def _missing_health_check(record: Dict) -> bool:
+        """故障转移、加权、延迟等高级路由策略记录是否缺少健康检查"""
+        routing = record.get('RoutingPolicy')
+        return (routing is not None
+                and routing.get('Type') in HEALTH_CHECK_POLICIES
+                and not record.get('HealthCheckId'))
+
+    @staticmethod
+    def _health_check_issue_lines(zone_name: str, record: Dict) -> List[str]:
+        """缺少健康检查的记录的告警行"""
+        return [
+            f"  ⚠️  Zone: {zone_name}",
+            f"      记录: {record['Name']} ({record['Type']})",
+            f"      路由策略: {record['RoutingPolicy']['Type']}",
+            f"      ✗ 缺少健康检查配置",
+        ]
+
+    def _print_record_type_stats(self, global_type_stats: Counter):
+        lines = ["\n" + "="*80, "DNS 记录类型统计", "="*80, "\n全局记录类型分布:"]
+        for record_type, count in global_type_stats.most_common():
+            lines.append(f"  {record_type:10s}: {count:5d}")
+
+        total_records = sum(global_type_stats.values())
+        lines.append(f"\n总记录数: {total_records}")
+        self._write_lines(lines)
+
+    def _print_zone_type_stats(self, zone_stats: Dict[str, int]):
+        public_count = zone_stats['public']
+        private_count = zone_stats['private']
+        public_records = zone_stats['public_records']
+        private_records = zone_stats['private_records']
+
+        total_zones = public_count + private_count
+        total_records = public_records + private_records
+
+        self._write_lines([
+            "\n" + "="*80,
+            "Hosted Zone 类型统计",
+            "="*80,
+            f"\n总计:",
+            f"  公有 Zone: {public_count} ({public_count/total_zones*100:.1f}%), {public_records} 条记录",
+            f"  私有 Zone: {private_count} ({private_count/total_zones*100:.1f}%), {private_records} 条记录",
+            f"  总 Zone: {total_zones}",
+            f"  总记录: {total_records}",
+        ])
+
+    def _print_routing_policy_stats(self, policy_stats: Counter):
+        lines = ["\n" + "="*80, "路由策略统计", "="*80, "\n路由策略分布:"]
+        for policy, count in policy_stats.most_common():
+            lines.append(f"  {policy:15s}: {count:5d}")
+
+        total_records = sum(policy_stats.values())
+        lines.append(f"\n总记录数: {total_records}")
+        self._write_lines(lines)
+
+    def _print_missing_health_checks(self, issue_lines: List[str]):
+        lines = ["\n" + "="*80, "缺少健康检查的高级路由策略记录（安全审计）", "="*80]
+        if issue_lines:
+            lines.extend(issue_lines)
+        else:
+            lines.append("\n✓ 所有高级路由策略记录都已配置健康检查（或未使用高级路由策略）")
+        self._write_lines(lines)
 
     def list_all_zones(self):
         """列出所有 Hosted Zones"""
-        print("\n" + "="*80)
-        print("所有 Hosted Zones")
-        print("="*80)
+        lines = ["\n" + "="*80, "所有 Hosted Zones", "="*80]
 
-        for account in self.data:
+        for account in self.iter_accounts():
             account_id = account.get('account_info', {}).get('account_id', 'Unknown')
             profile = account.get('profile', 'Unknown')
 
-            print(f"\n账户: {account_id} ({profile})")
+            lines.append(f"\n账户: {account_id} ({profile})")
 
             for zone in account.get('hosted_zones', []):
-                basic = zone['basic_info']
-                zone_name = basic['Name']
-                zone_type = "私有" if basic['Config']['PrivateZone'] else "公有"
-                record_count = basic['ResourceRecordSetCount']
-
-                print(f"  • {zone_name} ({zone_type}, {record_count} 条记录)")
-
-                if basic['Config'].get('Comment'):
-                    print(f"    注释: {basic['Config']['Comment']}")
-
-                # 如果是私有 Zone，显示 VPC 关联
-                vpcs = zone.get('vpcs', [])
-                if vpcs:
-                    print(f"    关联 VPC: {len(vpcs)} 个")
-                    for vpc in vpcs[:3]:  # 最多显示前 3 个
-                        vpc_id = vpc.get('VPCId', 'Unknown')
-                        vpc_name = vpc.get('VPCName', 'N/A')
-                        vpc_region = vpc.get('VPCRegion', 'Unknown')
-                        print(f"      - {vpc_id} ({vpc_name}) @ {vpc_region}")
-                    if len(vpcs) > 3:
-                        print(f"      ... 还有 {len(vpcs) - 3} 个")
+                self._append_zone_lines(zone, lines)
+
+            self._write_lines(lines)
+
+        self._write_lines(lines)
 
     def analyze_by_record_type(self):
         """按 DNS 记录类型统计"""
-        print("\n" + "="*80)
-        print("DNS 记录类型统计")
-        print("="*80)
+        global_type_stats = Counter()
 
-        global_type_stats = defaultdict(int)
-
-        for account in self.data:
+        for account in self.iter_accounts():
             for zone in account.get('hosted_zones', []):
-                for record_type, count in zone.get('record_type_summary', {}).items():
-                    global_type_stats[record_type] += count
+                global_type_stats.update(zone.get('record_type_summary', {}))
 
-        print("\n全局记录类型分布:")
-        for record_type, count in sorted(global_type_stats.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {record_type:10s}: {count:5d}")
-
-        total_records = sum(global_type_stats.values())
-        print(f"\n总记录数: {total_records}")
+        self._print_record_type_stats(global_type_stats)
 
     def analyze_by_zone_type(self):
         """按公有/私有 Zone 统计"""
-        print("\n" + "="*80)
-        print("Hosted Zone 类型统计")
-        print("="*80)
-
-        public_count = 0
-        private_count = 0
-        public_records = 0
-        private_records = 0
+        zone_stats = Counter()
 
-        for account in self.data:
+        for account in self.iter_accounts():
             for zone in account.get('hosted_zones', []):
-                is_private = zone['basic_info']['Config']['PrivateZone']
-                record_count = zone['basic_info']['ResourceRecordSetCount']
-
-                if is_private:
-                    private_count += 1
-                    private_records += record_count
-                else:
-                    public_count += 1
-                    public_records += record_count
-
-        total_zones = public_count + private_count
-        total_records = public_records + private_records
+                self._count_zone_type(zone['basic_info'], zone_stats)
 
-        print(f"\n总计:")
-        print(f"  公有 Zone: {public_count} ({public_count/total_zones*100:.1f}%), {public_records} 条记录")
-        print(f"  私有 Zone: {private_count} ({private_count/total_zones*100:.1f}%), {private_records} 条记录")
-        print(f"  总 Zone: {total_zones}")
-        print(f"  总记录: {total_records}")
+        self._print_zone_type_stats(zone_stats)
 
     def analyze_routing_policies(self):
         """分析路由策略使用情况"""
-        print("\n" + "="*80)
-        print("路由策略统计")
-        print("="*80)
-
-        policy_stats = defaultdict(int)
-
-        for account in self.data:
-            for zone in account.get('hosted_zones', []):
-                for record in zone.get('records', []):
-                    policy_type = record.get('RoutingPolicy', {}).get('Type', 'Simple')
-                    policy_stats[policy_type] += 1
-
-        print("\n路由策略分布:")
-        for policy, count in sorted(policy_stats.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {policy:15s}: {count:5d}")
+        policy_stats = Counter(
+            record.get('RoutingPolicy', {}).get('Type', 'Simple')
+            for account in self.iter_accounts()
+            for zone in account.get('hosted_zones', [])
+            for record in zone.get('records', [])
+        )
 
-        total_records = sum(policy_stats.values())
-        print(f"\n总记录数: {total_records}")
+        self._print_routing_policy_stats(policy_stats)
 
     def find_missing_health_checks(self):
         """查找缺少健康检查的故障转移/加权记录（安全审计）"""
-        print("\n" + "="*80)
-        print("缺少健康检查的高级路由策略记录（安全审计）")
-        print("="*80)
-
-        found_any = False
+        issue_lines = []
 
-        for account in self.data:
+        for account in self.iter_accounts():
             account_id = account.get('account_info', {}).get('account_id', 'Unknown')
             profile = account.get('profile', 'Unknown')
 
-            account_has_issues = False
-
-            for zone in account.get('hosted_zones', []):
-                zone_name = zone['basic_info']['Name']
-
-                for record in zone.get('records', []):
-                    routing = record.get('RoutingPolicy', {})
-
-                    # 故障转移、加权、延迟路由策略应该配置健康检查
-                    if routing.get('Type') in ['Failover', 'Weighted', 'Latency', 'Multivalue']:
-                        if not record.get('HealthCheckId'):
-                            if not account_has_issues:
-                                print(f"\n账户: {account_id} ({profile})")
-                                account_has_issues = True
-                                found_any = True
-
-                            print(f"  ⚠️  Zone: {zone_name}")
-                            print(f"      记录: {record['Name']} ({record['Type']})")
-                            print(f"      路由策略: {routing['Type']}")
-                            print(f"      ✗ 缺少健康检查配置")
-
-        if not found_any:
-            print("\n✓ 所有高级路由策略记录都已配置健康检查（或未使用高级路由策略）")
-
-    def search_by_name(self, pattern: str):
-        """按 Zone 名称或记录名称搜索"""
-        print("\n" + "="*80)
-        print(f"搜索结果: '{pattern}'")
-        print("="*80)
-
-        found_any = False
+            # 先筛出有问题的记录，只有存在问题时才输出账户标题
+            issues = [
+                (zone['basic_info']['Name'], record)
+                for zone in account.get('hosted_zones', [])
+                for record in zone.get('records', [])
+                if self._missing_health_check(record)
+            ]
 
-        for account in self.data:
+            if issues:
+                issue_lines.append(f"\n账户: {account_id} ({profile})")
+                for zone_name, record in issues:
+                    issue_lines.extend(self._health_check_issue_lines(zone_name, record))
+
+        self._print_missing_health_checks(issue_lines)
+
+    def run_full_analysis(self, jobs: int = 1):
+        """
+        完整分析：单次遍历所有账户/Zone/记录，同时完成 Zone 清单、记录类型、
+        Zone 类型、路由策略及健康检查审计，输出与依次调用各分析方法一致
+
+        Args:
+            jobs: 并行分析账户的进程数（默认 1，即在当前进程内逐个账户分析）
+        """
+        if jobs > 1:
+            # 各账户相互独立：子进程返回部分结果，按账户原始顺序合并。
+            # 不用 executor.map：它会一次性提交所有账户，读完整个流式输入并把全部账户留在内存中
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                self._merge_full_analysis(
+                    _map_bounded(executor, _analyze_account, self.iter_accounts(), 2 * jobs)
+                )
+        else:
+            self._merge_full_analysis(map(_analyze_account, self.iter_accounts()))
+
+    def _merge_full_analysis(self, partials: Iterator[Dict[str, Any]]):
+        """合并各账户的部分结果并输出完整分析"""
+        lines = ["\n" + "="*80, "所有 Hosted Zones", "="*80]
+
+        global_type_stats = Counter()
+        zone_stats = Counter()
+        policy_stats = Counter()
+        issue_lines = []
+
+        for partial in partials:
+            global_type_stats.update(partial['record_types'])
+            zone_stats.update(partial['zone_stats'])
+            policy_stats.update(partial['policies'])
+            issue_lines.extend(partial['issue_lines'])
+
+            # Zone 清单按账户输出，流式模式下不必缓存整个文件的文本
+            lines.extend(partial['zone_lines'])
+            self._write_lines(lines)
+
+        self._write_lines(lines)
+        self._print_record_type_stats(global_type_stats)
+        self._print_zone_type_stats(zone_stats)
+        self._print_routing_policy_stats(policy_stats)
+        self._print_missing_health_checks(issue_lines)
+
+    @staticmethod
+    def _append_name_matches(zone: Dict, account_label: str, matcher, lines: List[str]) -> bool:
+        """追加单个 Zone 中名称匹配的 Zone/记录，返回是否有匹配"""
+        found = False
+        basic = zone['basic_info']
+        zone_name = basic['Name']
+
+        # 搜索 Zone 名称
+        if matcher(zone_name):
+            found = True
+            lines.append(f"\n✓ Zone: {zone_name}")
+            lines.append(f"  账户: {account_label}")
+            lines.append(f"  记录数: {basic['ResourceRecordSetCount']}")
+            lines.append(f"  类型: {'私有' if basic['Config']['PrivateZone'] else '公有'}")
+
+        # 搜索记录名称
+        for record in zone.get('records', []):
+            record_name = record['Name']
+            if not matcher(record_name):
+                continue
+
+            found = True
+            lines.append(f"\n✓ 记录: {record_name} ({record['Type']})")
+            lines.append(f"  所属 Zone: {zone_name}")
+            lines.append(f"  账户: {account_label}")
+
+            if record.get('AliasTarget'):
+                alias = record['AliasTarget']
+                lines.append(f"  Alias 目标: {alias['DNSName']}")
+                lines.append(f"  目标类型: {alias.get('TargetType', 'Unknown')}")
+            elif record.get('ResourceRecords'):
+                values = [rr['Value'] for rr in record['ResourceRecords']]
+                lines.append(f"  值: {', '.join(values[:3])}")
+                if len(values) > 3:
+                    lines.append(f"       ... 还有 {len(values) - 3} 个值")
+
+            routing = record.get('RoutingPolicy', {})
+            if routing.get('Type') != 'Simple':
+                lines.append(f"  路由策略: {routing['Type']}")
+
+        return found
+
+    @staticmethod
+    def _append_value_matches(zone: Dict, account_label: str, matcher, lines: List[str]) -> bool:
+        """追加单个 Zone 中记录值匹配的记录，返回是否有匹配"""
+        found = False
+        zone_name = zone['basic_info']['Name']
+
+        for record in zone.get('records', []):
+            record_name = record['Name']
+            record_type = record['Type']
+
+            # 搜索 ResourceRecords 的值
+            if record.get('ResourceRecords'):
+                for rr in record['ResourceRecords']:
+                    value = rr['Value']
+                    if matcher(value):
+                        found = True
+                        lines.append(f"\n✓ {record_name} ({record_type})")
+                        lines.append(f"  Zone: {zone_name}")
+                        lines.append(f"  账户: {account_label}")
+                        lines.append(f"  匹配值: {value}")
+
+            # 搜索 Alias 目标
+            alias = record.get('AliasTarget')
+            if alias:
+                dns_name = alias['DNSName']
+                if matcher(dns_name):
+                    found = True
+                    lines.append(f"\n✓ {record_name} ({record_type}) [Alias]")
+                    lines.append(f"  Zone: {zone_name}")
+                    lines.append(f"  账户: {account_label}")
+                    lines.append(f"  Alias 目标: {dns_name}")
+                    lines.append(f"  目标类型: {alias.get('TargetType', 'Unknown')}")
+
+        return found
+
+    def search(self, name_pattern: Optional[str] = None, value_pattern: Optional[str] = None):
+        """
+        按名称和/或记录值搜索
+
+        两种搜索同时指定时只遍历一次数据（流式模式下也只解析一次文件），
+        记录值搜索的结果缓存到名称搜索结果之后输出
+        """
+        name_lines = ["\n" + "="*80, f"搜索结果: '{name_pattern}'", "="*80]
+        value_lines = ["\n" + "="*80, f"按记录值搜索: '{value_pattern}'", "="*80]
+        name_matcher = _compile_search_pattern(name_pattern).search if name_pattern else None
+        value_matcher = _compile_search_pattern(value_pattern).search if value_pattern else None
+        name_found = value_found = False
+
+        for account in self.iter_accounts():
             account_id = account.get('account_info', {}).get('account_id', 'Unknown')
             profile = account.get('profile', 'Unknown')
+            account_label = f"{account_id} ({profile})"
 
             for zone in account.get('hosted_zones', []):
-                zone_name = zone['basic_info']['Name']
-
-                # 搜索 Zone 名称
-                if pattern.lower() in zone_name.lower():
-                    found_any = True
-                    print(f"\n✓ Zone: {zone_name}")
-                    print(f"  账户: {account_id} ({profile})")
-                    print(f"  记录数: {zone['basic_info']['ResourceRecordSetCount']}")
-                    print(f"  类型: {'私有' if zone['basic_info']['Config']['PrivateZone'] else '公有'}")
-
-                # 搜索记录名称
-                for record in zone.get('records', []):
-                    if pattern.lower() in record['Name'].lower():
-                        found_any = True
-                        print(f"\n✓ 记录: {record['Name']} ({record['Type']})")
-                        print(f"  所属 Zone: {zone_name}")
-                        print(f"  账户: {account_id} ({profile})")
-
-                        if record.get('AliasTarget'):
-                            alias = record['AliasTarget']
-                            print(f"  Alias 目标: {alias['DNSName']}")
-                            print(f"  目标类型: {alias.get('TargetType', 'Unknown')}")
-                        elif record.get('ResourceRecords'):
-                            values = [rr['Value'] for rr in record['ResourceRecords']]
-                            print(f"  值: {', '.join(values[:3])}")
-                            if len(values) > 3:
-                                print(f"       ... 还有 {len(values) - 3} 个值")
-
-                        routing = record.get('RoutingPolicy', {})
-                        if routing.get('Type') != 'Simple':
-                            print(f"  路由策略: {routing['Type']}")
+                if name_matcher and self._append_name_matches(zone, account_label, name_matcher, name_lines):
+                    name_found = True
+                if value_matcher and self._append_value_matches(zone, account_label, value_matcher, value_lines):
+                    value_found = True
+
+            # 名称搜索结果按账户输出；记录值结果仅在单独搜索时按账户输出
+            if name_matcher:
+                self._write_lines(name_lines)
+            else:
+                self._write_lines(value_lines)
+
+        if name_matcher:
+            if not name_found:
+                name_lines.append(f"\n未找到匹配 '{name_pattern}' 的 Zone 或记录")
+            self._write_lines(name_lines)
+
+        if value_matcher:
+            if not value_found:
+                value_lines.append(f"\n未找到匹配 '{value_pattern}' 的记录值")
+            self._write_lines(value_lines)
 
-        if not found_any:
-            print(f"\n未找到匹配 '{pattern}' 的 Zone 或记录")
+    def search_by_name(self, pattern: str):
+        """按 Zone 名称或记录名称搜索"""
+        self.search(name_pattern=pattern)
 
     def search_by_record_value(self, pattern: str):
         """按记录值搜索（IP 地址、CNAME 目标等）"""
-        print("\n" + "="*80)
-        print(f"按记录值搜索: '{pattern}'")
-        print("="*80)
+        self.search(value_pattern=pattern)
 
-        found_any = False
+    @staticmethod
+    def _dumps_routing_details(details: Dict, cache: Dict) -> str:
+        """序列化路由策略详情，按内容缓存结果"""
+        if not details:
+            return ''
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile', 'Unknown')
+        key = tuple(details.items())
+        try:
+            cached = cache.get(key)
+        except TypeError:
+            # GeoLocation 等嵌套详情不可哈希，直接序列化
+            return json.dumps(details)
 
-            for zone in account.get('hosted_zones', []):
-                zone_name = zone['basic_info']['Name']
-
-                for record in zone.get('records', []):
-                    # 搜索 ResourceRecords 的值
-                    if record.get('ResourceRecords'):
-                        for rr in record['ResourceRecords']:
-                            if pattern.lower() in rr['Value'].lower():
-                                found_any = True
-                                print(f"\n✓ {record['Name']} ({record['Type']})")
-                                print(f"  Zone: {zone_name}")
-                                print(f"  账户: {account_id} ({profile})")
-                                print(f"  匹配值: {rr['Value']}")
-
-                    # 搜索 Alias 目标
-                    if record.get('AliasTarget'):
-                        dns_name = record['AliasTarget']['DNSName']
-                        if pattern.lower() in dns_name.lower():
-                            found_any = True
-                            print(f"\n✓ {record['Name']} ({record['Type']}) [Alias]")
-                            print(f"  Zone: {zone_name}")
-                            print(f"  账户: {account_id} ({profile})")
-                            print(f"  Alias 目标: {dns_name}")
-                            print(f"  目标类型: {record['AliasTarget'].get('TargetType', 'Unknown')}")
-
-        if not found_any:
-            print(f"\n未找到匹配 '{pattern}' 的记录值")
+        if cached is None:
+            cached = cache[key] = json.dumps(details)
+        return cached
 
     def export_csv(self, output_file: str):
         """导出为 CSV"""
         print(f"\n导出到 CSV: {output_file}")
 
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        # 使用较大的写缓冲，减少逐行写入时的系统调用
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
             fieldnames = [
                 'Account_ID', 'Profile', 'Zone_Name', 'Zone_Type',
                 'Record_Name', 'Record_Type', 'TTL',
@@ -266,10 +442,13 @@ class Route53ConfigAnalyzer:
                 'Health_Check_ID', 'Set_Identifier'
             ]
 
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+
+            # 路由策略详情序列化缓存（加权/延迟记录集的详情大量重复）
+            details_cache = {}
 
-            for account in self.data:
+            for account in self.iter_accounts():
                 account_id = account.get('account_info', {}).get('account_id', 'Unknown')
                 profile = account.get('profile', 'Unknown')
 
@@ -277,56 +456,109 @@ class Route53ConfigAnalyzer:
                     zone_name = zone['basic_info']['Name']
                     zone_type = "Private" if zone['basic_info']['Config']['PrivateZone'] else "Public"
 
+                    # 每个 Zone 的行先收集为元组（字段顺序同 fieldnames），再一次性 writerows
+                    rows = []
+
                     for record in zone.get('records', []):
                         routing = record.get('RoutingPolicy', {})
                         routing_policy = routing.get('Type', 'Simple')
-                        routing_details = json.dumps(routing.get('Details', {})) if routing.get('Details') else ''
+                        routing_details = self._dumps_routing_details(routing.get('Details'), details_cache)
+
+                        record_name = record['Name']
+                        record_type = record['Type']
+                        health_check_id = record.get('HealthCheckId', '')
+                        set_identifier = record.get('SetIdentifier', '')
 
                         # 处理多值记录（一条记录有多个 ResourceRecords）
                         if record.get('ResourceRecords'):
+                            ttl = record.get('TTL', '')
                             for rr in record['ResourceRecords']:
-                                row = {
-                                    'Account_ID': account_id,
-                                    'Profile': profile,
-                                    'Zone_Name': zone_name,
-                                    'Zone_Type': zone_type,
-                                    'Record_Name': record['Name'],
-                                    'Record_Type': record['Type'],
-                                    'TTL': record.get('TTL', ''),
-                                    'Value': rr['Value'],
-                                    'Alias_Target': '',
-                                    'Alias_Target_Type': '',
-                                    'Routing_Policy': routing_policy,
-                                    'Routing_Details': routing_details,
-                                    'Health_Check_ID': record.get('HealthCheckId', ''),
-                                    'Set_Identifier': record.get('SetIdentifier', '')
-                                }
-                                writer.writerow(row)
+                                rows.append((
+                                    account_id, profile, zone_name, zone_type,
+                                    record_name, record_type, ttl,
+                                    rr['Value'], '', '',
+                                    routing_policy, routing_details,
+                                    health_check_id, set_identifier
+                                ))
 
                         # Alias 记录
                         elif record.get('AliasTarget'):
                             alias = record['AliasTarget']
-                            row = {
-                                'Account_ID': account_id,
-                                'Profile': profile,
-                                'Zone_Name': zone_name,
-                                'Zone_Type': zone_type,
-                                'Record_Name': record['Name'],
-                                'Record_Type': record['Type'],
-                                'TTL': '',
-                                'Value': '',
-                                'Alias_Target': alias['DNSName'],
-                                'Alias_Target_Type': alias.get('TargetType', 'Unknown'),
-                                'Routing_Policy': routing_policy,
-                                'Routing_Details': routing_details,
-                                'Health_Check_ID': record.get('HealthCheckId', ''),
-                                'Set_Identifier': record.get('SetIdentifier', '')
-                            }
-                            writer.writerow(row)
+                            rows.append((
+                                account_id, profile, zone_name, zone_type,
+                                record_name, record_type, '',
+                                '', alias['DNSName'], alias.get('TargetType', 'Unknown'),
+                                routing_policy, routing_details,
+                                health_check_id, set_identifier
+                            ))
+
+                    writer.writerows(rows)
 
         print(f"✓ 已导出 CSV 文件")
 
 
+def _map_bounded(executor, func, items, window: int) -> Iterator:
+    """
+    用 executor 执行 func(item)，按 items 顺序逐个返回结果
+
+    同时最多有 window 个任务在执行或等待，items 按需读取，内存占用只与 window 有关。
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, item))
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _analyze_account(account: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    完整分析中单个账户的部分结果（模块级函数，便于在子进程中执行）
+
+    Returns:
+        包含 Zone 清单行、记录类型/Zone 类型/路由策略计数及健康检查告警行的字典
+    """
+    account_id = account.get('account_info', {}).get('account_id', 'Unknown')
+    profile = account.get('profile', 'Unknown')
+
+    zone_lines = [f"\n账户: {account_id} ({profile})"]
+    record_types = Counter()
+    zone_stats = Counter()
+    policies = Counter()
+    account_issues = []
+
+    for zone in account.get('hosted_zones', []):
+        basic = zone['basic_info']
+        zone_name = basic['Name']
+
+        Route53ConfigAnalyzer._append_zone_lines(zone, zone_lines)
+        Route53ConfigAnalyzer._count_zone_type(basic, zone_stats)
+
+        record_types.update(zone.get('record_type_summary', {}))
+
+        for record in zone.get('records', []):
+            policy_type = record.get('RoutingPolicy', {}).get('Type', 'Simple')
+            policies[policy_type] += 1
+
+            if policy_type in HEALTH_CHECK_POLICIES and not record.get('HealthCheckId'):
+                account_issues.extend(Route53ConfigAnalyzer._health_check_issue_lines(zone_name, record))
+
+    issue_lines = []
+    if account_issues:
+        issue_lines.append(f"\n账户: {account_id} ({profile})")
+        issue_lines.extend(account_issues)
+
+    return {
+        'zone_lines': zone_lines,
+        'record_types': record_types,
+        'zone_stats': zone_stats,
+        'policies': policies,
+        'issue_lines': issue_lines,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='分析 Route53 配置 JSON 文件'
@@ -359,29 +591,45 @@ def main():
     parser.add_argument('--csv',
                        help='导出为 CSV 文件')
 
+    parser.add_argument('--in-memory', action='store_true',
+                       help='一次性加载整个 JSON 文件（默认使用 ijson 流式解析）')
+
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='完整分析时并行分析账户的进程数（默认: 1）')
+
     args = parser.parse_args()
 
+    if args.jobs < 1:
+        print(f"✗ --jobs 必须大于等于 1: {args.jobs}")
+        return 1
+
     try:
-        analyzer = Route53ConfigAnalyzer(args.json_file)
+        analyzer = Route53ConfigAnalyzer(args.json_file, stream=not args.in_memory)
     except FileNotFoundError:
         print(f"✗ 文件不存在: {args.json_file}")
         return 1
-    except json.JSONDecodeError as e:
+    except JSON_ERRORS as e:
         print(f"✗ JSON 解析失败: {str(e)}")
         return 1
     except Exception as e:
         print(f"✗ 加载文件失败: {str(e)}")
         return 1
 
+    try:
+        return run_analysis(analyzer, args)
+    except JSON_ERRORS as e:
+        # 流式模式下格式错误在读取过程中才会发现
+        print(f"✗ JSON 解析失败: {str(e)}")
+        return 1
+
+
+def run_analysis(analyzer: Route53ConfigAnalyzer, args) -> int:
+    """根据命令行参数执行分析"""
     # 如果没有指定任何选项，执行完整分析
     if not any([args.list, args.by_record_type, args.by_zone_type,
                 args.routing_policies, args.missing_health_checks,
                 args.search, args.search_value, args.csv]):
-        analyzer.list_all_zones()
-        analyzer.analyze_by_record_type()
-        analyzer.analyze_by_zone_type()
-        analyzer.analyze_routing_policies()
-        analyzer.find_missing_health_checks()
+        analyzer.run_full_analysis(jobs=args.jobs)
     else:
         # 执行指定的分析
         if args.list:
@@ -399,11 +647,8 @@ def main():
         if args.missing_health_checks:
             analyzer.find_missing_health_checks()
 
-        if args.search:
-            analyzer.search_by_name(args.search)
-
-        if args.search_value:
-            analyzer.search_by_record_value(args.search_value)
+        if args.search or args.search_value:
+            analyzer.search(args.search, args.search_value)
 
         if args.csv:
             analyzer.export_csv(args.csv)
@@ -6,10 +6,86 @@ WAF 配置分析工具
 生成可读的报告和统计信息
 """
 
-import json
 import argparse
-from collections import defaultdict
-from typing import Dict, List, Any
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterator, Optional
+
+from core.file_utils import load_json_file
+
+# 规则 Statement 判别键 -> 规则类型（ManagedRuleGroupStatement 需要额外信息，单独处理）
+STATEMENT_TYPES = {
+    'RateBasedStatement': "Rate-based",
+    'IPSetReferenceStatement': "IP Set",
+    'GeoMatchStatement': "Geo Match",
+    'ByteMatchStatement': "Byte Match",
+    'SizeConstraintStatement': "Size Constraint",
+    'SqliMatchStatement': "SQLi Match",
+    'XssMatchStatement': "XSS Match",
+    'AndStatement': "AND Logic",
+    'OrStatement': "OR Logic",
+    'NotStatement': "NOT Logic",
+}
+
+# 规则动作键 -> 统计标签（未列出的动作不计入统计）
+ACTION_LABELS = {
+    'Allow': 'Allow',
+    'Block': 'Block',
+    'Count': 'Count',
+    'Captcha': 'Captcha',
+}
+OVERRIDE_ACTION_LABELS = {
+    'None': 'None (规则组默认)',
+    'Count': 'Count (覆盖)',
+}
+
+@dataclass
+class ACLEntry:
+    """单个 Web ACL 的扁平化索引条目（加载时一次性提取常用字段，原始数据保留在 acl 中）"""
+
+    __slots__ = (
+        'account_id', 'region', 'scope', 'name', 'name_lower', 'acl_id',
+        'capacity', 'rule_count', 'resource_count', 'acl'
+    )
+
+    account_id: str
+    region: str
+    scope: str
+    name: str
+    name_lower: str
+    acl_id: str
+    capacity: int
+    rule_count: int
+    resource_count: int
+    acl: Dict
+
+    @classmethod
+    def from_acl(cls, account_id: str, region: str, scope: str, acl: Dict) -> 'ACLEntry':
+        summary = acl.get('summary', {})
+        detail = acl.get('detail', {})
+        name = summary.get('Name', '')
+
+        return cls(
+            account_id=account_id,
+            region=region,
+            scope=scope,
+            name=name,
+            name_lower=name.lower(),
+            acl_id=summary.get('Id', ''),
+            capacity=detail.get('Capacity', 0),
+            rule_count=len(detail.get('Rules', ())),
+            # 使用新的关联资源数据结构
+            resource_count=len(acl.get('associated_resources', ())),
+            acl=acl,
+        )
+
+    def as_csv_row(self) -> tuple:
+        """按 export_csv 的列顺序返回一行"""
+        return (
+            self.account_id, self.region, self.scope, self.name, self.acl_id,
+            self.capacity, self.rule_count, self.resource_count
+        )
 
 
 class WAFConfigAnalyzer:
@@ -17,138 +93,149 @@ class WAFConfigAnalyzer:
 
     def __init__(self, json_file: str):
         """加载 JSON 数据"""
-        with open(json_file, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        self.data = load_json_file(json_file)
+        self._build_acl_index()
 
-    def analyze_rules(self):
-        """分析所有规则"""
-        print("\n" + "="*80)
-        print("规则分析")
-        print("="*80)
+    def _build_acl_index(self):
+        """
+        遍历一次嵌套数据，建立扁平 ACL 索引，后续各分析方法直接遍历索引
 
-        rule_types = defaultdict(int)
-        rule_actions = defaultdict(int)
+        self._accounts: [(account_id, [ACLEntry, ...]), ...]，保留没有 ACL 的账户
+        self._flat_acls: 所有 ACLEntry，顺序与原始数据一致
+        """
+        self._accounts = []
+        self._flat_acls = []
 
         for account in self.data:
             account_id = account.get('account_info', {}).get('account_id', 'Unknown')
+            entries = []
 
-            for region_data in account.get('regions', []):
-                # 分析 CloudFront ACLs
-                for acl in region_data.get('cloudfront_acls', []):
-                    self._analyze_acl_rules(acl, rule_types, rule_actions)
+            for region_data in account.get('regions', ()):
+                region = region_data['region']
 
-                # 分析 Regional ACLs
-                for acl in region_data.get('regional_acls', []):
-                    self._analyze_acl_rules(acl, rule_types, rule_actions)
+                for scope, key in (('CLOUDFRONT', 'cloudfront_acls'), ('REGIONAL', 'regional_acls')):
+                    for acl in region_data.get(key, ()):
+                        entries.append(ACLEntry.from_acl(account_id, region, scope, acl))
 
-        print("\n规则类型分布:")
-        for rule_type, count in sorted(rule_types.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {rule_type}: {count}")
+            self._accounts.append((account_id, entries))
+            self._flat_acls.extend(entries)
 
-        print("\n规则动作分布:")
-        for action, count in sorted(rule_actions.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {action}: {count}")
+    def _iter_acls(self) -> Iterator[Dict]:
+        """遍历所有账户、区域的 Web ACL（CloudFront 与 Regional）"""
+        for entry in self._flat_acls:
+            yield entry.acl
+
+    def analyze_rules(self):
+        """分析所有规则"""
+        rule_types = Counter()
+        rule_actions = Counter()
+
+        for acl in self._iter_acls():
+            self._analyze_acl_rules(acl, rule_types, rule_actions)
+
+        self._print_rule_stats(rule_types, rule_actions)
 
     def analyze_resources(self):
         """分析关联资源"""
+        resource_stats = Counter()
+        resource_types = Counter()
+
+        for acl in self._iter_acls():
+            self._analyze_acl_resources(acl, resource_stats, resource_types)
+
+        self._print_resource_stats(resource_stats, resource_types)
+
+    def analyze_rules_and_resources(self):
+        """单次遍历 ACL 同时完成规则分析与关联资源分析"""
+        rule_types = Counter()
+        rule_actions = Counter()
+        resource_stats = Counter()
+        resource_types = Counter()
+
+        for acl in self._iter_acls():
+            self._analyze_acl_rules(acl, rule_types, rule_actions)
+            self._analyze_acl_resources(acl, resource_stats, resource_types)
+
+        self._print_rule_stats(rule_types, rule_actions)
+        self._print_resource_stats(resource_stats, resource_types)
+
+    def _print_rule_stats(self, rule_types: Counter, rule_actions: Counter):
         print("\n" + "="*80)
-        print("关联资源分析")
+        print("规则分析")
         print("="*80)
 
-        resource_types = defaultdict(int)
-        total_resources = 0
-        acls_with_resources = 0
-        acls_without_resources = 0
+        print("\n规则类型分布:")
+        for rule_type, count in rule_types.most_common():
+            print(f"  {rule_type}: {count}")
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
+        print("\n规则动作分布:")
+        for action, count in rule_actions.most_common():
+            print(f"  {action}: {count}")
 
-            for region_data in account.get('regions', []):
-                # 分析所有 ACL 的关联资源
-                all_acls = region_data.get('cloudfront_acls', []) + region_data.get('regional_acls', [])
+    def _analyze_acl_resources(self, acl: Dict, resource_stats: Counter, resource_types: Counter):
+        """累计单个 ACL 的关联资源统计"""
+        resources = acl.get('associated_resources', ())
+        if resources:
+            resource_stats['acls_with_resources'] += 1
+            resource_stats['total_resources'] += len(resources)
 
-                for acl in all_acls:
-                    resources = acl.get('associated_resources', [])
-                    if resources:
-                        acls_with_resources += 1
-                        total_resources += len(resources)
+            # 统计资源类型
+            resource_types.update(resource.get('friendly_type', 'Unknown') for resource in resources)
+        else:
+            resource_stats['acls_without_resources'] += 1
 
-                        # 统计资源类型
-                        for resource in resources:
-                            friendly_type = resource.get('friendly_type', 'Unknown')
-                            resource_types[friendly_type] += 1
-                    else:
-                        acls_without_resources += 1
+    def _print_resource_stats(self, resource_stats: Counter, resource_types: Counter):
+        print("\n" + "="*80)
+        print("关联资源分析")
+        print("="*80)
 
+        acls_with_resources = resource_stats['acls_with_resources']
+        acls_without_resources = resource_stats['acls_without_resources']
         total_acls = acls_with_resources + acls_without_resources
 
         print(f"\n资源统计:")
         print(f"  Web ACL 总数: {total_acls}")
         print(f"  有关联资源的 ACL: {acls_with_resources}")
         print(f"  无关联资源的 ACL: {acls_without_resources}")
-        print(f"  关联资源总数: {total_resources}")
+        print(f"  关联资源总数: {resource_stats['total_resources']}")
 
         if resource_types:
             print(f"\n资源类型分布:")
-            for resource_type, count in sorted(resource_types.items(), key=lambda x: x[1], reverse=True):
+            for resource_type, count in resource_types.most_common():
                 print(f"  {resource_type}: {count}")
 
-    def _analyze_acl_rules(self, acl: Dict, rule_types: Dict, rule_actions: Dict):
+    def _analyze_acl_rules(self, acl: Dict, rule_types: Counter, rule_actions: Counter):
         """分析单个 ACL 的规则"""
         detail = acl.get('detail', {})
-        rules = detail.get('Rules', [])
+        rules = detail.get('Rules', ())
 
-        for rule in rules:
-            # 规则类型
-            statement = rule.get('Statement', {})
-            rule_type = self._get_rule_type(statement)
-            rule_types[rule_type] += 1
-
-            # 规则动作（支持 Action 和 OverrideAction）
-            action = rule.get('Action', {})
-            override_action = rule.get('OverrideAction', {})
-
-            if 'Allow' in action:
-                rule_actions['Allow'] += 1
-            elif 'Block' in action:
-                rule_actions['Block'] += 1
-            elif 'Count' in action:
-                rule_actions['Count'] += 1
-            elif 'Captcha' in action:
-                rule_actions['Captcha'] += 1
-            elif 'None' in override_action:
-                rule_actions['None (规则组默认)'] += 1
-            elif 'Count' in override_action:
-                rule_actions['Count (覆盖)'] += 1
+        rule_types.update(self._get_rule_type(rule.get('Statement', {})) for rule in rules)
+        rule_actions.update(filter(None, map(self._get_action_label, rules)))
+
+    @staticmethod
+    def _get_action_label(rule: Dict) -> Optional[str]:
+        """规则动作的统计标签（支持 Action 和 OverrideAction），不计入统计时返回 None"""
+        action = rule.get('Action', {})
+        override_action = rule.get('OverrideAction', {})
+
+        # Action / OverrideAction 只有一个键，直接按首个键查表
+        return (ACTION_LABELS.get(next(iter(action), None))
+                or OVERRIDE_ACTION_LABELS.get(next(iter(override_action), None)))
 
     def _get_rule_type(self, statement: Dict) -> str:
         """识别规则类型"""
-        if 'ManagedRuleGroupStatement' in statement:
-            vendor = statement['ManagedRuleGroupStatement'].get('VendorName', 'Unknown')
-            name = statement['ManagedRuleGroupStatement'].get('Name', 'Unknown')
+        managed = statement.get('ManagedRuleGroupStatement')
+        if managed is not None:
+            vendor = managed.get('VendorName', 'Unknown')
+            name = managed.get('Name', 'Unknown')
             return f"Managed: {vendor}/{name}"
-        elif 'RateBasedStatement' in statement:
-            return "Rate-based"
-        elif 'IPSetReferenceStatement' in statement:
-            return "IP Set"
-        elif 'GeoMatchStatement' in statement:
-            return "Geo Match"
-        elif 'ByteMatchStatement' in statement:
-            return "Byte Match"
-        elif 'SizeConstraintStatement' in statement:
-            return "Size Constraint"
-        elif 'SqliMatchStatement' in statement:
-            return "SQLi Match"
-        elif 'XssMatchStatement' in statement:
-            return "XSS Match"
-        elif 'AndStatement' in statement:
-            return "AND Logic"
-        elif 'OrStatement' in statement:
-            return "OR Logic"
-        elif 'NotStatement' in statement:
-            return "NOT Logic"
-        else:
-            return "Other"
+
+        # Statement 通常只有一个判别键，直接查表
+        for key in statement:
+            rule_type = STATEMENT_TYPES.get(key)
+            if rule_type is not None:
+                return rule_type
+        return "Other"
 
     def list_all_acls(self):
         """列出所有 Web ACL"""
@@ -156,20 +243,11 @@ class WAFConfigAnalyzer:
         print("Web ACL 清单")
         print("="*80)
 
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
+        for account_id, entries in self._accounts:
             print(f"\n账户: {account_id}")
 
-            for region_data in account.get('regions', []):
-                region = region_data['region']
-
-                # CloudFront ACLs
-                for acl in region_data.get('cloudfront_acls', []):
-                    self._print_acl_info(acl, region, 'CLOUDFRONT')
-
-                # Regional ACLs
-                for acl in region_data.get('regional_acls', []):
-                    self._print_acl_info(acl, region, 'REGIONAL')
+            for entry in entries:
+                self._print_acl_info(entry.acl, entry.region, entry.scope)
 
     def _print_acl_info(self, acl: Dict, region: str, scope: str):
         """打印单个 ACL 信息"""
@@ -182,31 +260,31 @@ class WAFConfigAnalyzer:
         rules = detail.get('Rules', [])
         rule_count = len(rules)
 
-        print(f"\n  [{scope}] {name}")
-        print(f"    区域: {region}")
-        print(f"    ID: {acl_id}")
-        print(f"    容量: {capacity} WCU")
-        print(f"    规则数: {rule_count}")
+        lines = [f"\n  [{scope}] {name}"]
+        lines.append(f"    区域: {region}")
+        lines.append(f"    ID: {acl_id}")
+        lines.append(f"    容量: {capacity} WCU")
+        lines.append(f"    规则数: {rule_count}")
 
         # 关联资源 - 使用新的数据结构
         resources = acl.get('associated_resources', [])
         if resources:
-            print(f"    关联资源: {len(resources)} 个")
+            lines.append(f"    关联资源: {len(resources)} 个")
             for resource in resources[:5]:  # 只显示前5个
                 friendly_type = resource.get('friendly_type', 'Unknown')
                 resource_id = resource.get('resource_id', resource.get('arn', 'Unknown'))
                 # 如果资源 ID 太长，截断显示
                 if len(resource_id) > 60:
                     resource_id = resource_id[:57] + '...'
-                print(f"      - [{friendly_type}] {resource_id}")
+                lines.append(f"      - [{friendly_type}] {resource_id}")
             if len(resources) > 5:
-                print(f"      ... 还有 {len(resources) - 5} 个资源")
+                lines.append(f"      ... 还有 {len(resources) - 5} 个资源")
         else:
-            print(f"    关联资源: 无")
+            lines.append(f"    关联资源: 无")
 
         # 显示规则列表
         if rules:
-            print(f"\n    规则集:")
+            lines.append(f"\n    规则集:")
             for rule in rules:
                 rule_name = rule.get('Name', 'Unnamed')
                 priority = rule.get('Priority', -1)
@@ -222,16 +300,18 @@ class WAFConfigAnalyzer:
                 )
 
                 # 格式化输出
-                print(f"      [{priority:3d}] {rule_name}")
-                print(f"            类型: {rule_type}")
-                print(f"            动作: {action}")
+                lines.append(f"      [{priority:3d}] {rule_name}")
+                lines.append(f"            类型: {rule_type}")
+                lines.append(f"            动作: {action}")
         else:
-            print(f"\n    规则集: 无")
+            lines.append(f"\n    规则集: 无")
 
         # 显示默认动作
         default_action = detail.get('DefaultAction', {})
         default_action_name = self._get_action_name(default_action)
-        print(f"    默认动作: {default_action_name}")
+        lines.append(f"    默认动作: {default_action_name}")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def find_by_name(self, name_pattern: str):
         """根据名称查找 Web ACL"""
@@ -239,20 +319,15 @@ class WAFConfigAnalyzer:
         print("="*80)
 
         found = False
-        for account in self.data:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-
-            for region_data in account.get('regions', []):
-                region = region_data['region']
+        pattern_lower = name_pattern.lower()
 
-                for acl in region_data.get('cloudfront_acls', []) + region_data.get('regional_acls', []):
-                    acl_name = acl.get('summary', {}).get('Name', '')
-                    if name_pattern.lower() in acl_name.lower():
-                        found = True
-                        print(f"\n✓ 找到: {acl_name}")
-                        print(f"  账户: {account_id}")
-                        print(f"  区域: {region}")
-                        self._print_detailed_rules(acl)
+        for entry in self._flat_acls:
+            if pattern_lower in entry.name_lower:
+                found = True
+                print(f"\n✓ 找到: {entry.name}")
+                print(f"  账户: {entry.account_id}")
+                print(f"  区域: {entry.region}")
+                self._print_detailed_rules(entry.acl)
 
         if not found:
             print("  未找到匹配的 Web ACL")
@@ -314,39 +389,10 @@ class WAFConfigAnalyzer:
                 'Capacity', 'Rule Count', 'Associated Resources'
             ])
 
-            for account in self.data:
-                account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-
-                for region_data in account.get('regions', []):
-                    region = region_data['region']
-
-                    for acl in region_data.get('cloudfront_acls', []):
-                        self._write_acl_row(writer, account_id, region, 'CLOUDFRONT', acl)
-
-                    for acl in region_data.get('regional_acls', []):
-                        self._write_acl_row(writer, account_id, region, 'REGIONAL', acl)
+            writer.writerows(entry.as_csv_row() for entry in self._flat_acls)
 
         print(f"\n✓ CSV 已导出到: {output_file}")
 
-    def _write_acl_row(self, writer, account_id: str, region: str, scope: str, acl: Dict):
-        """写入 CSV 行"""
-        summary = acl.get('summary', {})
-        detail = acl.get('detail', {})
-
-        # 使用新的关联资源数据结构
-        associated_resources = acl.get('associated_resources', [])
-
-        writer.writerow([
-            account_id,
-            region,
-            scope,
-            summary.get('Name', ''),
-            summary.get('Id', ''),
-            detail.get('Capacity', 0),
-            len(detail.get('Rules', [])),
-            len(associated_resources)
-        ])
-
 
 def main():
     parser = argparse.ArgumentParser(description='分析 WAF 配置数据')
@@ -393,10 +439,11 @@ def main():
     if args.list:
         analyzer.list_all_acls()
 
-    if args.analyze:
+    if args.analyze and args.resources:
+        analyzer.analyze_rules_and_resources()
+    elif args.analyze:
         analyzer.analyze_rules()
-
-    if args.resources:
+    elif args.resources:
         analyzer.analyze_resources()
 
     if args.search:
@@ -408,8 +455,7 @@ def main():
     # 如果没有指定任何操作，显示所有
     if not any([args.list, args.analyze, args.resources, args.search, args.csv]):
         analyzer.list_all_acls()
-        analyzer.analyze_rules()
-        analyzer.analyze_resources()
+        analyzer.analyze_rules_and_resources()
 
 
 if __name__ == '__main__':
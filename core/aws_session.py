@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+AWS 会话工具模块
+
+提供按 profile 创建 boto3 会话的统一入口，所有会话共用同一个 botocore 服务模型加载器。
+"""
+
+import threading
+
+import boto3
+import botocore.session
+
+# 所有会话共用的服务模型加载器（首个会话创建后设置），读写时加锁
+_shared_loader = None
+_loader_lock = threading.Lock()
+
+
+def create_session(profile_name: str) -> boto3.Session:
+    """
+    创建 profile 的 boto3 会话
+
+    每个 boto3.Session 默认有自己的服务模型加载器，扫描多个 profile 时同一个服务的模型 JSON
+    会被每个会话重复读取和解析。这里让所有会话共用第一个会话的加载器（及其缓存）。
+    SSO token 由 botocore 缓存在 ~/.aws/sso/cache，多个 profile 共用同一个 sso_session 时本身就会复用。
+
+    依赖的 boto3/botocore 行为（boto3 1.x）：
+    - boto3.Session 初始化时把 boto3 自带的数据目录追加到 botocore 会话的 data_loader 搜索路径，
+      因此第一个会话的加载器已经包含全部搜索路径；
+    - botocore 在 create_client 时才通过 get_component('data_loader') 获取加载器。
+    所以这里在 boto3.Session 初始化完成之后才替换组件，不修改任何加载器的内部状态
+    （之后创建的会话自带的加载器不再被客户端使用）。
+
+    Args:
+        profile_name: AWS CLI profile 名称
+
+    Returns:
+        boto3 会话
+    """
+    global _shared_loader
+
+    botocore_session = botocore.session.Session(profile=profile_name)
+    session = boto3.Session(botocore_session=botocore_session)
+
+    with _loader_lock:
+        if _shared_loader is None:
+            _shared_loader = botocore_session.get_component('data_loader')
+        else:
+            botocore_session.register_component('data_loader', _shared_loader)
+
+    return session
@@ -6,9 +6,143 @@
 """
 
 import json
+import mmap
 import os
 from datetime import datetime
-from typing import Any, Optional, Tuple
+from typing import Any, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时回退到标准库 json
+    orjson = None
+
+
+def load_json_file(path: str) -> Any:
+    """
+    读取 JSON 文件
+
+    安装了 orjson 时使用 orjson 解析（更快、内存占用更低），否则回退到标准库 json。
+    orjson 直接解析内存映射（mmap）的文件内容，避免先把整个文件复制到一个 bytes 对象中。
+
+    Args:
+        path: JSON 文件路径
+
+    Returns:
+        解析后的数据
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # 空文件无法映射，交给 orjson 报告解析错误
+                return orjson.loads(f.read())
+
+            with mm:
+                # 整个文件按顺序解析一遍，提示内核加大预读（madvise 需要 Python 3.8+ 且仅部分平台提供）
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                view = memoryview(mm)
+                try:
+                    return orjson.loads(view)
+                finally:
+                    view.release()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump_json_bytes(data: Any, indent: bool = True) -> bytes:
+    """
+    将数据序列化为 JSON（UTF-8 编码，保留非 ASCII 字符）
+
+    安装了 orjson 时使用 orjson 序列化，否则回退到标准库 json。两种实现输出格式一致：
+    datetime 等无法直接序列化的对象统一通过 str() 转换。
+
+    Args:
+        data: 要序列化的数据
+        indent: True 时缩进 2 空格（便于阅读），False 时输出无空白的紧凑格式（供程序读取）
+
+    Returns:
+        JSON 字节串
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=str, option=option)
+
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+
+
+def write_file_atomic(path: str, content: bytes):
+    """
+    写入文件：先写临时文件再通过 os.replace 原子替换
+
+    读取 path 的程序不会看到写了一半的文件；旧文件只是被替换，不会被原地改写。
+
+    Args:
+        path: 目标文件路径
+        content: 文件内容
+    """
+    tmp_file = f'{path}.tmp{os.getpid()}'
+    with open(tmp_file, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_file, path)
+
+
+def _read_lines_at(src, line_offsets: Iterable[Tuple[int, int]]):
+    """按 (偏移, 长度) 依次读取文件中的行"""
+    for offset, length in line_offsets:
+        src.seek(offset)
+        yield src.read(length)
+
+
+def jsonl_to_json(jsonl_file: str, output_file: str, indent: bool = True,
+                  line_offsets: Optional[List[Tuple[int, int]]] = None):
+    """
+    将 JSONL 文件（每行一个 JSON 对象）转换为 JSON 数组文件
+
+    逐行读取、逐项写出，内存占用只与单行大小有关。输出与对整个列表调用 dump_json_bytes 的结果一致，
+    并通过临时文件 + os.replace 原子替换目标文件。
+
+    Args:
+        jsonl_file: JSONL 文件路径
+        output_file: 输出的 JSON 文件路径
+        indent: True 时缩进 2 空格，False 时输出紧凑格式
+        line_offsets: 各行在 JSONL 文件中的 (偏移, 长度)，按此顺序输出数组元素；None 时按文件中的行顺序输出。
+                      用于写入顺序与期望的输出顺序不同的情况（如并行扫描按完成顺序写入）
+    """
+    tmp_file = f'{output_file}.tmp{os.getpid()}'
+    loads = orjson.loads if orjson is not None else json.loads
+
+    with open(jsonl_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+        dst.write(b'[')
+        empty = True
+
+        lines = src if line_offsets is None else _read_lines_at(src, line_offsets)
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            if indent:
+                # 数组元素比顶层多缩进一级（JSON 字符串中的换行已转义，可以直接按行加前缀）
+                item = dump_json_bytes(loads(line), indent=True)
+                dst.write(b'\n  ' if empty else b',\n  ')
+                dst.write(item.replace(b'\n', b'\n  '))
+            else:
+                if not empty:
+                    dst.write(b',')
+                dst.write(line)
+            empty = False
+
+        dst.write(b'\n]' if indent and not empty else b']')
+
+    os.replace(tmp_file, output_file)
 
 
 def get_timestamped_filename(prefix: str) -> str:
@@ -51,17 +185,22 @@ def save_scan_results(
     prefix: str,
     output_file: Optional[str] = None,
     save_latest: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    jsonl_file: Optional[str] = None,
+    jsonl_line_offsets: Optional[List[Tuple[int, int]]] = None
 ) -> Tuple[str, Optional[str]]:
     """
     保存扫描结果到 JSON 文件，支持双文件输出
 
     Args:
-        data: 要保存的数据（通常是字典或列表）
+        data: 要保存的数据（通常是字典或列表）；指定 jsonl_file 时忽略
         prefix: 文件名前缀（如 'waf_config', 'alb_config', 'route53_config'）
         output_file: 主输出文件名（可选）。如果为 None，自动生成带时间戳的文件名
         save_latest: 是否同时保存固定名称的 latest 文件（默认 True）
         verbose: 是否显示详细输出信息（默认 True）
+        jsonl_file: 逐行写出的扫描结果（JSONL）文件。指定时从该文件流式转换为 JSON 数组，
+                    不需要把全部结果加载到内存
+        jsonl_line_offsets: 按输出顺序排列的各行 (偏移, 长度)，见 jsonl_to_json 的 line_offsets
 
     Returns:
         元组 (主文件名, latest 文件名或None)
@@ -88,9 +227,11 @@ def save_scan_results(
     latest_file = None
 
     try:
-        # 保存主文件（带时间戳）
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        # 保存主文件（带时间戳，缩进格式便于查阅和存档）
+        if jsonl_file:
+            jsonl_to_json(jsonl_file, output_file, line_offsets=jsonl_line_offsets)
+        else:
+            write_file_atomic(output_file, dump_json_bytes(data))
 
         if verbose:
             print(f"\n{'='*80}")
@@ -99,8 +240,13 @@ def save_scan_results(
         # 保存 latest 文件（固定名称）
         if save_latest:
             latest_file = get_latest_filename(prefix)
-            with open(latest_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+
+            # latest 文件主要供关联分析等工具读取，使用紧凑格式（体积更小，解析更快）
+            if os.path.abspath(latest_file) != os.path.abspath(output_file):
+                if jsonl_file:
+                    jsonl_to_json(jsonl_file, latest_file, indent=False, line_offsets=jsonl_line_offsets)
+                else:
+                    write_file_atomic(latest_file, dump_json_bytes(data, indent=False))
 
             if verbose:
                 print(f"✓ Latest 文件已保存到: {latest_file}")
@@ -119,6 +265,15 @@ def save_scan_results(
         raise Exception(error_msg)
 
 
+def _list_file_names(directory: str) -> set:
+    """列出目录下的文件名（目录不存在时返回空集合）"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
 def check_latest_files_exist(prefixes: list) -> dict:
     """
     检查指定前缀的 latest 文件是否存在
@@ -134,10 +289,15 @@ def check_latest_files_exist(prefixes: list) -> dict:
         >>> print(result)
         {'waf_config': True, 'alb_config': False}
     """
+    # 每个目录只读取一次文件列表，代替逐个文件 stat
+    names_by_dir = {}
     result = {}
     for prefix in prefixes:
-        latest_file = get_latest_filename(prefix)
-        result[prefix] = os.path.exists(latest_file)
+        directory, name = os.path.split(get_latest_filename(prefix))
+        names = names_by_dir.get(directory)
+        if names is None:
+            names = names_by_dir[directory] = _list_file_names(directory or '.')
+        result[prefix] = name in names
     return result
 
 
@@ -156,11 +316,10 @@ def get_latest_file_paths(prefixes: list) -> dict:
         >>> print(paths['waf_config'])
         '/path/to/waf_config_latest.json'
     """
-    result = {}
-    for prefix in prefixes:
-        latest_file = get_latest_filename(prefix)
-        result[prefix] = os.path.abspath(latest_file)
-    return result
+    # 只获取一次当前目录，代替每个前缀调用 os.path.abspath
+    cwd = os.getcwd()
+    return {prefix: os.path.normpath(os.path.join(cwd, get_latest_filename(prefix)))
+            for prefix in prefixes}
 
 
 if __name__ == '__main__':
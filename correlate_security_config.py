@@ -5,18 +5,303 @@ AWS Security Configuration Correlator
 关联分析 WAF、ALB 和 Route53 的配置，识别安全漏洞。
 """
 
+import hashlib
 import json
+import os
+import pickle
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-import networkx as nx
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import networkx as nx
+except ImportError:  # networkx 为可选依赖，仅 SecurityGraph.to_networkx() 需要
+    nx = None
+
+try:
+    import rustworkx as rx
+except ImportError:  # rustworkx 为可选依赖，仅 SecurityGraph.to_rustworkx() 需要
+    rx = None
+
+from core.file_utils import load_json_file
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，未安装时一次性加载整个文件
+    ijson = None
+
+# ijson 流式解析时的格式错误（未安装 ijson 时为空元组）
+IJSON_ERRORS = (ijson.JSONError,) if ijson else ()
+
+# 索引缓存目录（按三个输入文件的路径 + 修改时间 + 大小命中）
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'waf-correlator')
+CACHE_VERSION = 4
+
+# 嵌套字段缺失时的只读默认值，避免每次 .get(key, {}) 都新建字典
+_EMPTY = {}
+
+
+# 索引中保留的字段（关联分析和可视化只读取这些字段，其余字段在建索引时丢弃）
+ALB_BASIC_FIELDS = ('LoadBalancerArn', 'LoadBalancerName', 'DNSName', 'Scheme', 'Type')
+ALB_WAF_FIELDS = ('has_waf', 'error')
+ALB_WEBACL_FIELDS = ('ARN', 'Name', 'Id')
+WAF_NAME_FIELDS = ('ARN', 'Name')
+WAF_RESOURCE_FIELDS = ('arn', 'resource_type_api')
+# 关联资源查询失败的标记（有这些字段时 associated_resources 不完整，不能判定为未使用）
+WAF_ERROR_FIELDS = ('error', 'associated_resources_error')
+
+
+def _pick(obj, fields: Tuple[str, ...]):
+    """只保留 fields 中存在的键（非字典原样返回，缺失字段的默认值行为不变）"""
+    if not isinstance(obj, dict):
+        return obj
+    return {key: obj[key] for key in fields if key in obj}
+
+
+def _slim_alb(alb: Dict, account_id: str, region: str) -> Dict:
+    """裁剪 ALB 记录，只保留 basic_info 的关键字段和 WAF 关联的标识信息"""
+    slim = {'account_id': account_id, 'region': region}
+    if 'basic_info' in alb:
+        slim['basic_info'] = _pick(alb['basic_info'], ALB_BASIC_FIELDS)
+
+    if 'waf_association' in alb:
+        association = alb['waf_association']
+        if isinstance(association, dict):
+            slim_association = _pick(association, ALB_WAF_FIELDS)
+            if 'WebACL' in association:
+                # WebACL 为完整的 ACL 定义（含全部规则），只保留标识字段
+                slim_association['WebACL'] = _pick(association['WebACL'], ALB_WEBACL_FIELDS)
+            association = slim_association
+        slim['waf_association'] = association
+
+    return slim
+
+
+def _slim_waf(waf: Dict, account_id: str, region: str, scope: str) -> Dict:
+    """裁剪 WAF 记录，只保留 ARN、名称和关联资源"""
+    slim = {'account_id': account_id, 'region': region, 'scope': scope}
+    for key in ('summary', 'detail'):
+        if key in waf:
+            slim[key] = _pick(waf[key], WAF_NAME_FIELDS)
+
+    if 'associated_resources' in waf:
+        resources = waf['associated_resources']
+        if isinstance(resources, list):
+            resources = [_pick(resource, WAF_RESOURCE_FIELDS) for resource in resources]
+        slim['associated_resources'] = resources
+
+    for key in WAF_ERROR_FIELDS:
+        if key in waf:
+            slim[key] = waf[key]
+
+    return slim
+
+
+def _is_unassociated_waf(waf: Dict) -> bool:
+    """WAF 确认没有关联资源（关联资源查询失败的 ACL 结果未知，不算在内）"""
+    if waf.get('associated_resources', []):
+        return False
+    return not any(key in waf for key in WAF_ERROR_FIELDS)
+
+
+@lru_cache(maxsize=8192)
+def _normalize_dns(dns_name: str) -> str:
+    """
+    规范化 ELB DNS 名称
+
+    Route53 Alias 的 DNSName 通常带有 "dualstack." 前缀和结尾的 "."，且大小写可能不同，
+    而 ALB 的 DNSName 没有。统一为小写、去掉结尾的 "." 和 "dualstack." 前缀后再匹配。
+    """
+    dns_name = dns_name.rstrip('.').lower()
+    if dns_name.startswith('dualstack.'):
+        dns_name = dns_name[len('dualstack.'):]
+    return dns_name
+
+
+@lru_cache(maxsize=128)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """拆分 safe_get 的字段路径（调用方使用的路径只有少数几个常量，按路径缓存）"""
+    return tuple(path.split('.'))
+
+
+@dataclass
+class WafAlbCorrelation:
+    """WAF → ALB 关联记录"""
+
+    __slots__ = ('waf', 'alb', 'match_type', 'consistent')
+
+    waf: Dict
+    alb: Dict
+    match_type: str
+    consistent: bool
+
+
+@dataclass
+class Route53AlbCorrelation:
+    """Route53 DNS 记录 → ALB 关联记录"""
+
+    __slots__ = ('dns_record', 'alb', 'waf', 'match_type')
+
+    dns_record: Dict
+    alb: Dict
+    waf: Optional[Dict]
+    match_type: str
+
+
+# 警告类型
+WARNING_INCONSISTENT = 'WAF-ALB Inconsistency'
+WARNING_MISSING_ALB = 'Missing ALB'
+
+
+@dataclass
+class CorrelationWarning:
+    """关联分析过程中发现的不一致（只保存引用，message 在显示时才格式化）"""
+
+    __slots__ = ('type', 'waf_arn', 'alb_arn', 'waf', 'alb')
+
+    type: str
+    waf_arn: str
+    alb_arn: str
+    waf: Dict
+    alb: Optional[Dict]
+
+    @property
+    def message(self) -> str:
+        waf_name = self.waf.get('summary', {}).get('Name') or self.waf.get('detail', {}).get('Name', 'unknown')
+        if self.type == WARNING_INCONSISTENT:
+            alb_name = self.alb.get('basic_info', {}).get('LoadBalancerName')
+            return f"WAF {waf_name} declares ALB {alb_name}, but ALB references different WAF"
+        return f"WAF {waf_name} references missing ALB: {self.alb_arn}"
+
+    def as_dict(self) -> Dict[str, str]:
+        """转换为字典（用于 JSON 输出）"""
+        return {
+            'type': self.type,
+            'message': self.message,
+            'waf_arn': self.waf_arn,
+            'alb_arn': self.alb_arn
+        }
+
+
+class SecurityGraph:
+    """
+    轻量有向图（DNS → ALB → WAF）
+
+    节点属性按列存储在平行列表中，边为 (source, target, label) 列表，避免 networkx
+    每个节点/边的多层字典开销。nodes()/edges() 与 networkx 的 data=True 迭代接口兼容；
+    需要图算法时可通过 to_rustworkx()（原生实现，适合大图）或 to_networkx() 转换。
+    """
+
+    __slots__ = (
+        '_node_index', 'node_ids', 'node_types', 'node_labels', 'node_colors', 'node_details',
+        '_edge_index', 'edge_list'
+    )
+
+    def __init__(self):
+        self._node_index = {}  # 节点 ID -> 列下标
+        self.node_ids = []
+        self.node_types = []   # 仅作为边端点隐式添加的节点为 None（无属性）
+        self.node_labels = []
+        self.node_colors = []
+        self.node_details = []
+
+        self._edge_index = {}  # (source, target) -> edge_list 下标
+        self.edge_list = []
+
+    def add_node(self, node_id: str, type: str, label: str, color: str, details: Dict):
+        """添加节点；节点已存在时更新其属性（与 networkx 一致）"""
+        idx = self._ensure_node(node_id)
+        self.node_types[idx] = type
+        self.node_labels[idx] = label
+        self.node_colors[idx] = color
+        self.node_details[idx] = details
+
+    def _ensure_node(self, node_id: str) -> int:
+        idx = self._node_index.get(node_id)
+        if idx is None:
+            idx = self._node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.node_types.append(None)
+            self.node_labels.append(None)
+            self.node_colors.append(None)
+            self.node_details.append(None)
+        return idx
+
+    def add_edge(self, source: str, target: str, label: str):
+        """添加边；端点不存在时隐式添加无属性节点，重复的边只更新标签（与 networkx 一致）"""
+        self._ensure_node(source)
+        self._ensure_node(target)
+
+        key = (source, target)
+        idx = self._edge_index.get(key)
+        if idx is None:
+            self._edge_index[key] = len(self.edge_list)
+            self.edge_list.append((source, target, label))
+        else:
+            self.edge_list[idx] = (source, target, label)
+
+    def nodes(self, data: bool = False) -> Iterator:
+        """按添加顺序迭代节点 ID，data=True 时迭代 (节点 ID, 属性字典)"""
+        if not data:
+            return iter(self.node_ids)
+        return (
+            (node_id, {} if node_type is None else
+             {'type': node_type, 'label': label, 'color': color, 'details': details})
+            for node_id, node_type, label, color, details in zip(
+                self.node_ids, self.node_types, self.node_labels, self.node_colors, self.node_details)
+        )
+
+    def edges(self, data: bool = False) -> Iterator:
+        """按添加顺序迭代边 (source, target)，data=True 时迭代 (source, target, 属性字典)"""
+        if not data:
+            return ((source, target) for source, target, _ in self.edge_list)
+        return ((source, target, {'label': label}) for source, target, label in self.edge_list)
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.edge_list)
+
+    def to_networkx(self):
+        """转换为 networkx.DiGraph（需要安装 networkx）"""
+        if nx is None:
+            raise ImportError("networkx is required for to_networkx() (pip install networkx)")
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self.nodes(data=True))
+        G.add_edges_from(self.edges(data=True))
+        return G
+
+    def to_rustworkx(self):
+        """
+        转换为 rustworkx.PyDiGraph（需要安装 rustworkx）
+
+        节点下标与 node_ids 的下标一致，节点数据为 {'id': 节点 ID, **属性}，边数据为边标签
+        """
+        if rx is None:
+            raise ImportError("rustworkx is required for to_rustworkx() (pip install rustworkx)")
+
+        G = rx.PyDiGraph()
+        G.add_nodes_from([dict(attrs, id=node_id) for node_id, attrs in self.nodes(data=True)])
+
+        node_index = self._node_index
+        G.add_edges_from([(node_index[source], node_index[target], label)
+                          for source, target, label in self.edge_list])
+        return G
 
 
 class SecurityConfigCorrelator:
     """安全配置关联分析器"""
 
-    def __init__(self, waf_json_path: str, alb_json_path: str, route53_json_path: str, debug: bool = False):
+    def __init__(self, waf_json_path: str, alb_json_path: str, route53_json_path: str, debug: bool = False,
+                 use_cache: bool = True):
         """
         初始化关联分析器
 
@@ -25,21 +310,21 @@ class SecurityConfigCorrelator:
             alb_json_path: ALB 配置 JSON 文件路径
             route53_json_path: Route53 配置 JSON 文件路径
             debug: 是否启用调试模式
+            use_cache: 是否使用索引缓存（三个文件均未变化时跳过 JSON 解析和索引构建）
         """
         self.waf_json_path = waf_json_path
         self.alb_json_path = alb_json_path
         self.route53_json_path = route53_json_path
         self.debug = debug
+        self.use_cache = use_cache
 
-        # 原始数据
-        self.waf_data = []
-        self.alb_data = []
-        self.route53_data = []
-
-        # 索引
+        # 索引（加载时逐个账户流式构建，不保留完整的原始数据）
         self.alb_arn_index = {}  # ALB ARN -> ALB 详情
-        self.alb_dns_index = {}  # ALB DNS Name -> ALB 详情
+        self.alb_dns_index = {}  # 规范化后的 ALB DNS Name -> ALB 详情
         self.waf_arn_index = {}  # WAF ARN -> WAF 详情
+        self.route53_alias_records = []  # 指向 ELB 的 Route53 Alias 记录
+        self.albs_by_location = {}  # (账户 ID, 区域) -> ALB 列表
+        self.wafs_by_location = {}  # (账户 ID, 区域) -> WAF 列表
 
         # 关联结果
         self.waf_alb_correlations = []
@@ -50,6 +335,9 @@ class SecurityConfigCorrelator:
         self.orphan_dns_records = []
         self.unused_waf_acls = []
 
+        # correlate_waf_alb 遍历关联资源时顺便记录的无关联 WAF ARN（未执行关联时为 None）
+        self._unassociated_waf_arns = None
+
         # 警告信息
         self.warnings = []
 
@@ -61,28 +349,15 @@ class SecurityConfigCorrelator:
         self._load_data()
 
     def _load_data(self):
-        """加载三个 JSON 文件"""
+        """加载三个 JSON 文件并构建索引（逐个账户处理，峰值内存约为单个账户的数据量）"""
         try:
-            # 加载 WAF 配置
-            if self.debug:
-                print(f"Loading WAF config from: {self.waf_json_path}")
-            with open(self.waf_json_path, 'r') as f:
-                self.waf_data = json.load(f)
-
-            # 加载 ALB 配置
-            if self.debug:
-                print(f"Loading ALB config from: {self.alb_json_path}")
-            with open(self.alb_json_path, 'r') as f:
-                self.alb_data = json.load(f)
-
-            # 加载 Route53 配置
-            if self.debug:
-                print(f"Loading Route53 config from: {self.route53_json_path}")
-            with open(self.route53_json_path, 'r') as f:
-                self.route53_data = json.load(f)
-
-            # 构建索引
-            self._build_indices()
+            if self.use_cache and self._load_cache():
+                if self.debug:
+                    print("Loaded indices from cache")
+            else:
+                self._parse_and_index()
+                if self.use_cache:
+                    self._save_cache()
 
         except FileNotFoundError as e:
             print(f"\n✗ Error: File not found: {e.filename}", file=sys.stderr)
@@ -92,86 +367,209 @@ class SecurityConfigCorrelator:
             print(f"\n✗ Error: Invalid JSON", file=sys.stderr)
             print(f"  Line {e.lineno}, Column {e.colno}: {e.msg}", file=sys.stderr)
             sys.exit(1)
+        except IJSON_ERRORS as e:
+            print(f"\n✗ Error: Invalid JSON", file=sys.stderr)
+            print(f"  {e}", file=sys.stderr)
+            sys.exit(1)
+
+        self._build_location_index()
 
-    def _build_indices(self):
-        """构建索引以加速查找"""
         if self.debug:
-            print("Building indices...")
+            print(f"  Found {len(self.alb_arn_index)} ALBs")
+            print(f"  Found {len(self.waf_arn_index)} WAF ACLs")
+            print(f"  Accounts: {len(self.accounts)}")
+            print(f"  Regions: {len(self.regions)}")
 
-        # 构建 ALB 索引
-        for account_data in self.alb_data:
-            account_id = account_data.get('account_info', {}).get('account_id', 'unknown')
-            self.accounts.add(account_id)
+    def _parse_and_index(self):
+        """解析三个 JSON 文件并构建索引（三个文件互不依赖，写入不同的索引，并发读取和解析）"""
+        loaders = (
+            ('WAF', self.waf_json_path, self._index_waf_accounts),
+            ('ALB', self.alb_json_path, self._index_alb_accounts),
+            ('Route53', self.route53_json_path, self._index_route53_accounts)
+        )
 
-            for region_data in account_data.get('regions', []):
-                region = region_data.get('region', 'unknown')
-                self.regions.add(region)
+        if self.debug:
+            for name, path, _ in loaders:
+                print(f"Loading {name} config from: {path}")
+
+        with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+            futures = [executor.submit(index, self._iter_accounts(path)) for _, path, index in loaders]
+
+        # 按顺序取结果，任一文件的解析错误在此重新抛出
+        for future in futures:
+            future.result()
+
+    def _build_location_index(self):
+        """按 (账户, 区域) 分组 ALB 和 WAF（保持索引中的顺序），供统计和树状图直接按组取用"""
+        for index, buckets in ((self.alb_arn_index, self.albs_by_location),
+                               (self.waf_arn_index, self.wafs_by_location)):
+            for resource in index.values():
+                location = (resource.get('account_id'), resource.get('region'))
+                bucket = buckets.get(location)
+                if bucket is None:
+                    buckets[location] = [resource]
+                else:
+                    bucket.append(resource)
+
+    def _cache_path(self) -> str:
+        """根据三个输入文件的路径、修改时间和大小计算缓存文件路径"""
+        parts = []
+        for path in (self.waf_json_path, self.alb_json_path, self.route53_json_path):
+            stat = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}")
+        key = "|".join(parts) + f"|{CACHE_VERSION}"
+        return os.path.join(CACHE_DIR, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '.pkl')
+
+    def _load_cache(self) -> bool:
+        """尝试从缓存加载索引，成功返回 True"""
+        try:
+            with open(self._cache_path(), 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # 缓存不存在或已损坏，重新解析
+            return False
+
+        self.alb_arn_index = cached['alb_arn_index']
+        self.alb_dns_index = cached['alb_dns_index']
+        self.waf_arn_index = cached['waf_arn_index']
+        self.route53_alias_records = cached['route53_alias_records']
+        self.accounts = cached['accounts']
+        self.regions = cached['regions']
+        return True
+
+    def _save_cache(self):
+        """保存索引到缓存（失败不影响分析）"""
+        cached = {
+            'alb_arn_index': self.alb_arn_index,
+            'alb_dns_index': self.alb_dns_index,
+            'waf_arn_index': self.waf_arn_index,
+            'route53_alias_records': self.route53_alias_records,
+            'accounts': self.accounts,
+            'regions': self.regions
+        }
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(self._cache_path(), 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
 
-                for alb in region_data.get('load_balancers', []):
-                    alb_info = alb.get('basic_info', {})
-                    alb_arn = alb_info.get('LoadBalancerArn', '')
-                    alb_dns = alb_info.get('DNSName', '')
+    @staticmethod
+    def _iter_accounts(path: str) -> Iterator[Dict]:
+        """逐个读取扫描结果中的账户数据（安装 ijson 时流式解析，否则一次性加载）"""
+        if ijson is None:
+            yield from load_json_file(path)
+            return
 
-                    # 添加账户和区域信息
-                    alb['account_id'] = account_id
-                    alb['region'] = region
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item', use_float=True)
 
-                    if alb_arn:
-                        self.alb_arn_index[alb_arn] = alb
-                    if alb_dns:
-                        self.alb_dns_index[alb_dns] = alb
+    def _iter_albs(self, accounts: Iterator[Dict]) -> Iterator[Tuple[str, str, Dict]]:
+        """展开为 (account_id, region, alb)，同时记录出现过的账户和区域"""
+        add_account = self.accounts.add
+        add_region = self.regions.add
 
-        # 构建 WAF 索引
-        for account_data in self.waf_data:
-            account_id = account_data.get('account_info', {}).get('account_id', 'unknown')
-            self.accounts.add(account_id)
+        for account_data in accounts:
+            account_id = account_data.get('account_info', _EMPTY).get('account_id', 'unknown')
+            add_account(account_id)
+
+            for region_data in account_data.get('regions', ()):
+                region = region_data.get('region', 'unknown')
+                add_region(region)
+
+                for alb in region_data.get('load_balancers', ()):
+                    yield account_id, region, alb
+
+    def _iter_wafs(self, accounts: Iterator[Dict]) -> Iterator[Tuple[str, str, str, Dict]]:
+        """展开为 (account_id, region, scope, waf)，同时记录出现过的账户和区域"""
+        add_account = self.accounts.add
+        add_region = self.regions.add
+
+        for account_data in accounts:
+            account_id = account_data.get('account_info', _EMPTY).get('account_id', 'unknown')
+            add_account(account_id)
 
             # Regional ACLs
-            for region_data in account_data.get('regions', []):
+            for region_data in account_data.get('regions', ()):
                 region = region_data.get('region', 'unknown')
-                self.regions.add(region)
+                add_region(region)
 
-                for waf in region_data.get('regional_acls', []):
-                    # WAF 数据格式: summary.ARN 而不是 webacl_arn
-                    waf_arn = waf.get('summary', {}).get('ARN', '') or waf.get('detail', {}).get('ARN', '')
+                for waf in region_data.get('regional_acls', ()):
+                    yield account_id, region, 'REGIONAL', waf
 
-                    # 添加账户和区域信息
-                    waf['account_id'] = account_id
-                    waf['region'] = region
-                    waf['scope'] = 'REGIONAL'
+            # CloudFront ACLs（CloudFront is always in us-east-1）
+            for waf in account_data.get('cloudfront_acls', ()):
+                yield account_id, 'us-east-1', 'CLOUDFRONT', waf
 
-                    if waf_arn:
-                        self.waf_arn_index[waf_arn] = waf
+    def _index_alb_accounts(self, accounts: Iterator[Dict]):
+        """构建 ALB 索引（只保留裁剪后的记录）"""
+        alb_arn_index = self.alb_arn_index
+        alb_dns_index = self.alb_dns_index
 
-            # CloudFront ACLs
-            for waf in account_data.get('cloudfront_acls', []):
-                # WAF 数据格式: summary.ARN 而不是 webacl_arn
-                waf_arn = waf.get('summary', {}).get('ARN', '') or waf.get('detail', {}).get('ARN', '')
+        for account_id, region, alb in self._iter_albs(accounts):
+            alb_info = alb.get('basic_info', _EMPTY)
+            alb_arn = alb_info.get('LoadBalancerArn')
+            alb_dns = alb_info.get('DNSName')
 
-                # 添加账户和区域信息
-                waf['account_id'] = account_id
-                waf['region'] = 'us-east-1'  # CloudFront is always in us-east-1
-                waf['scope'] = 'CLOUDFRONT'
+            # 裁剪字段并添加账户和区域信息
+            alb = _slim_alb(alb, account_id, region)
 
-                if waf_arn:
-                    self.waf_arn_index[waf_arn] = waf
+            if alb_arn:
+                alb_arn_index[alb_arn] = alb
+            if alb_dns:
+                alb_dns_index[_normalize_dns(alb_dns)] = alb
 
-        # 收集 Route53 账户信息
-        for account_data in self.route53_data:
-            account_id = account_data.get('account_info', {}).get('account_id', 'unknown')
-            self.accounts.add(account_id)
+    def _index_waf_accounts(self, accounts: Iterator[Dict]):
+        """构建 WAF 索引（只保留裁剪后的记录）"""
+        waf_arn_index = self.waf_arn_index
 
-        if self.debug:
-            print(f"  Found {len(self.alb_arn_index)} ALBs")
-            print(f"  Found {len(self.waf_arn_index)} WAF ACLs")
-            print(f"  Accounts: {len(self.accounts)}")
-            print(f"  Regions: {len(self.regions)}")
+        for account_id, region, scope, waf in self._iter_wafs(accounts):
+            # WAF 数据格式: summary.ARN 而不是 webacl_arn
+            waf_arn = waf.get('summary', _EMPTY).get('ARN') or waf.get('detail', _EMPTY).get('ARN')
+
+            # 裁剪字段并添加账户和区域信息
+            waf = _slim_waf(waf, account_id, region, scope)
+
+            if waf_arn:
+                waf_arn_index[waf_arn] = waf
+
+    def _index_route53_accounts(self, accounts: Iterator[Dict]):
+        """收集 Route53 账户信息及指向 ELB 的 Alias 记录（其余记录不保留）"""
+        # 记录数远多于 ALB/WAF，循环内用到的方法预先绑定为局部变量
+        add_account = self.accounts.add
+        append_alias = self.route53_alias_records.append
+
+        for account_data in accounts:
+            account_id = account_data.get('account_info', _EMPTY).get('account_id', 'unknown')
+            add_account(account_id)
+
+            for zone in account_data.get('hosted_zones', ()):
+                zone_name = zone.get('basic_info', _EMPTY).get('Name', 'unknown')
+
+                for record in zone.get('records', ()):
+                    alias_target = record.get('AliasTarget')
+
+                    # 只处理 ELB 类型
+                    if alias_target and 'ELB' in alias_target.get('TargetType', ''):
+                        append_alias({
+                            'name': record.get('Name', ''),
+                            'type': record.get('Type', ''),
+                            'zone': zone_name,
+                            'account_id': account_id,
+                            'alias_dns': alias_target.get('DNSName', '')
+                        })
 
     @staticmethod
     def safe_get(obj, path, default=None):
-        """安全获取嵌套字段，避免 KeyError"""
+        """
+        安全获取嵌套字段，避免 KeyError
+
+        path 可以是以 '.' 分隔的字符串（拆分结果会被缓存），也可以是键的元组
+        """
+        keys = _split_path(path) if isinstance(path, str) else path
         try:
-            for key in path.split('.'):
+            for key in keys:
                 obj = obj[key]
             return obj
         except (KeyError, TypeError, AttributeError):
@@ -182,9 +580,13 @@ class SecurityConfigCorrelator:
         if self.debug:
             print("\nCorrelating WAF ↔ ALB...")
 
+        unassociated_waf_arns = []
+
         # 正向匹配：WAF → ALB
         for waf_arn, waf in self.waf_arn_index.items():
             associated_resources = waf.get('associated_resources', [])
+            if _is_unassociated_waf(waf):
+                unassociated_waf_arns.append(waf_arn)
 
             for resource in associated_resources:
                 resource_arn = resource.get('arn', '')
@@ -194,37 +596,35 @@ class SecurityConfigCorrelator:
                     alb = self.alb_arn_index.get(resource_arn)
 
                     if alb:
-                        # 匹配成功
-                        correlation = {
-                            'waf': waf,
-                            'alb': alb,
-                            'match_type': 'waf_to_alb',
-                            'consistent': False  # 待验证
-                        }
-
-                        # 验证反向关联
+                        # 匹配成功，验证反向关联
                         alb_waf_arn = self.safe_get(alb, 'waf_association.WebACL.ARN')
-                        if alb_waf_arn == waf_arn:
-                            correlation['consistent'] = True
-                        else:
-                            waf_name = waf.get('summary', {}).get('Name') or waf.get('detail', {}).get('Name', 'unknown')
-                            self.warnings.append({
-                                'type': 'WAF-ALB Inconsistency',
-                                'message': f"WAF {waf_name} declares ALB {alb.get('basic_info', {}).get('LoadBalancerName')}, but ALB references different WAF",
-                                'waf_arn': waf_arn,
-                                'alb_arn': resource_arn
-                            })
-
-                        self.waf_alb_correlations.append(correlation)
+                        consistent = alb_waf_arn == waf_arn
+                        if not consistent:
+                            self.warnings.append(CorrelationWarning(
+                                type=WARNING_INCONSISTENT,
+                                waf_arn=waf_arn,
+                                alb_arn=resource_arn,
+                                waf=waf,
+                                alb=alb
+                            ))
+
+                        self.waf_alb_correlations.append(WafAlbCorrelation(
+                            waf=waf,
+                            alb=alb,
+                            match_type='waf_to_alb',
+                            consistent=consistent
+                        ))
                     else:
                         # WAF 声称有 ALB，但 ALB 不存在
-                        waf_name = waf.get('summary', {}).get('Name') or waf.get('detail', {}).get('Name', 'unknown')
-                        self.warnings.append({
-                            'type': 'Missing ALB',
-                            'message': f"WAF {waf_name} references missing ALB: {resource_arn}",
-                            'waf_arn': waf_arn,
-                            'alb_arn': resource_arn
-                        })
+                        self.warnings.append(CorrelationWarning(
+                            type=WARNING_MISSING_ALB,
+                            waf_arn=waf_arn,
+                            alb_arn=resource_arn,
+                            waf=waf,
+                            alb=None
+                        ))
+
+        self._unassociated_waf_arns = unassociated_waf_arns
 
         if self.debug:
             print(f"  Found {len(self.waf_alb_correlations)} WAF-ALB correlations")
@@ -235,49 +635,34 @@ class SecurityConfigCorrelator:
         if self.debug:
             print("\nCorrelating Route53 → ALB...")
 
-        for account_data in self.route53_data:
-            account_id = account_data.get('account_info', {}).get('account_id', 'unknown')
-
-            for zone in account_data.get('hosted_zones', []):
-                zone_name = zone.get('basic_info', {}).get('Name', 'unknown')
-
-                for record in zone.get('records', []):
-                    alias_target = record.get('AliasTarget')
-
-                    if alias_target:
-                        alias_dns = alias_target.get('DNSName', '')
-                        target_type = alias_target.get('TargetType', '')
-
-                        # 只处理 ELB 类型
-                        if 'ELB' in target_type:
-                            alb = self.alb_dns_index.get(alias_dns)
-
-                            if alb:
-                                # 匹配成功：DNS → ALB
-                                correlation = {
-                                    'dns_record': {
-                                        'name': record.get('Name', ''),
-                                        'type': record.get('Type', ''),
-                                        'zone': zone_name,
-                                        'account_id': account_id
-                                    },
-                                    'alb': alb,
-                                    'waf': alb.get('waf_association'),
-                                    'match_type': 'dns_to_alb'
-                                }
-
-                                self.route53_alb_correlations.append(correlation)
-                            else:
-                                # 孤儿 DNS 记录
-                                self.orphan_dns_records.append({
-                                    'severity': 'MEDIUM',
-                                    'type': 'Orphan DNS Record',
-                                    'resource': record.get('Name', ''),
-                                    'target': alias_dns,
-                                    'zone': zone_name,
-                                    'account_id': account_id,
-                                    'description': 'DNS record points to non-existent ALB'
-                                })
+        for alias_record in self.route53_alias_records:
+            alias_dns = alias_record['alias_dns']
+            alb = self.alb_dns_index.get(_normalize_dns(alias_dns))
+
+            if alb:
+                # 匹配成功：DNS → ALB
+                self.route53_alb_correlations.append(Route53AlbCorrelation(
+                    dns_record={
+                        'name': alias_record['name'],
+                        'type': alias_record['type'],
+                        'zone': alias_record['zone'],
+                        'account_id': alias_record['account_id']
+                    },
+                    alb=alb,
+                    waf=alb.get('waf_association'),
+                    match_type='dns_to_alb'
+                ))
+            else:
+                # 孤儿 DNS 记录
+                self.orphan_dns_records.append({
+                    'severity': 'MEDIUM',
+                    'type': 'Orphan DNS Record',
+                    'resource': alias_record['name'],
+                    'target': alias_dns,
+                    'zone': alias_record['zone'],
+                    'account_id': alias_record['account_id'],
+                    'description': 'DNS record points to non-existent ALB'
+                })
 
         if self.debug:
             print(f"  Found {len(self.route53_alb_correlations)} DNS-ALB correlations")
@@ -317,36 +702,40 @@ class SecurityConfigCorrelator:
         if self.debug:
             print("\nDetecting unused WAF ACLs...")
 
-        for waf_arn, waf in self.waf_arn_index.items():
-            associated_resources = waf.get('associated_resources', [])
+        # 已执行 correlate_waf_alb 时只需处理其记录的无关联 WAF，否则完整遍历一次
+        unassociated_waf_arns = self._unassociated_waf_arns
+        if unassociated_waf_arns is None:
+            unassociated_waf_arns = [waf_arn for waf_arn, waf in self.waf_arn_index.items()
+                                     if _is_unassociated_waf(waf)]
 
-            if len(associated_resources) == 0:
-                waf_name = waf.get('summary', {}).get('Name') or waf.get('detail', {}).get('Name', 'unknown')
-                self.unused_waf_acls.append({
-                    'severity': 'LOW',
-                    'type': 'Unused WAF ACL',
-                    'resource': waf_name,
-                    'arn': waf_arn,
-                    'account_id': waf.get('account_id', 'unknown'),
-                    'region': waf.get('region', 'unknown'),
-                    'description': 'WAF ACL with no associated resources (potential cost waste)'
-                })
+        for waf_arn in unassociated_waf_arns:
+            waf = self.waf_arn_index[waf_arn]
+            waf_name = waf.get('summary', {}).get('Name') or waf.get('detail', {}).get('Name', 'unknown')
+            self.unused_waf_acls.append({
+                'severity': 'LOW',
+                'type': 'Unused WAF ACL',
+                'resource': waf_name,
+                'arn': waf_arn,
+                'account_id': waf.get('account_id', 'unknown'),
+                'region': waf.get('region', 'unknown'),
+                'description': 'WAF ACL with no associated resources (potential cost waste)'
+            })
 
         if self.debug:
             print(f"  Found {len(self.unused_waf_acls)} unused WAF ACLs")
 
         return self.unused_waf_acls
 
-    def build_graph(self) -> nx.DiGraph:
+    def build_graph(self) -> SecurityGraph:
         """构建网络图数据结构"""
         if self.debug:
             print("\nBuilding network graph...")
 
-        G = nx.DiGraph()
+        G = SecurityGraph()
 
         # 添加 DNS 记录节点
         for correlation in self.route53_alb_correlations:
-            dns_record = correlation['dns_record']
+            dns_record = correlation.dns_record
             dns_id = f"dns:{dns_record['name']}"
 
             G.add_node(dns_id,
@@ -401,8 +790,8 @@ class SecurityConfigCorrelator:
 
         # 添加 DNS → ALB 边
         for correlation in self.route53_alb_correlations:
-            dns_record = correlation['dns_record']
-            alb = correlation['alb']
+            dns_record = correlation.dns_record
+            alb = correlation.alb
             alb_arn = self.safe_get(alb, 'basic_info.LoadBalancerArn', '')
 
             if alb_arn:
@@ -431,49 +820,53 @@ class SecurityConfigCorrelator:
         if self.debug:
             print("\nGenerating statistics...")
 
-        # ALB 统计
+        # 单次遍历 ALB：WAF 覆盖和类型
         total_albs = len(self.alb_arn_index)
-        albs_with_waf = sum(1 for alb in self.alb_arn_index.values()
-                           if self.safe_get(alb, 'waf_association.has_waf', False))
+        albs_with_waf = 0
+        type_counts = Counter()
+
+        for alb in self.alb_arn_index.values():
+            if (alb.get('waf_association') or _EMPTY).get('has_waf'):
+                albs_with_waf += 1
+            type_counts[(alb.get('basic_info') or _EMPTY).get('Type')] += 1
+
         albs_without_waf = total_albs - albs_with_waf
         waf_coverage_rate = round(albs_with_waf / total_albs * 100, 2) if total_albs > 0 else 0
 
+        # 按账户/区域的数量直接由分组大小汇总
+        albs_by_account = Counter()
+        albs_by_region = Counter()
+        for (account_id, region), albs in self.albs_by_location.items():
+            albs_by_account[account_id] += len(albs)
+            albs_by_region[region] += len(albs)
+
+        wafs_by_account = Counter()
+        wafs_by_region = Counter()
+        for (account_id, region), wafs in self.wafs_by_location.items():
+            wafs_by_account[account_id] += len(wafs)
+            wafs_by_region[region] += len(wafs)
+
+        dns_by_account = Counter(corr.dns_record['account_id']
+                                 for corr in self.route53_alb_correlations)
+
         # 按账户统计
-        by_account = []
-        for account_id in self.accounts:
-            account_albs = [alb for alb in self.alb_arn_index.values()
-                           if alb.get('account_id') == account_id]
-            account_wafs = [waf for waf in self.waf_arn_index.values()
-                           if waf.get('account_id') == account_id]
-            account_dns = sum(1 for corr in self.route53_alb_correlations
-                             if corr['dns_record']['account_id'] == account_id)
-
-            by_account.append({
-                'account_id': account_id,
-                'alb_count': len(account_albs),
-                'waf_count': len(account_wafs),
-                'dns_count': account_dns
-            })
+        by_account = [{
+            'account_id': account_id,
+            'alb_count': albs_by_account[account_id],
+            'waf_count': wafs_by_account[account_id],
+            'dns_count': dns_by_account[account_id]
+        } for account_id in self.accounts]
 
         # 按区域统计
-        by_region = []
-        for region in self.regions:
-            region_albs = [alb for alb in self.alb_arn_index.values()
-                          if alb.get('region') == region]
-            region_wafs = [waf for waf in self.waf_arn_index.values()
-                          if waf.get('region') == region]
-
-            by_region.append({
-                'region': region,
-                'alb_count': len(region_albs),
-                'waf_count': len(region_wafs)
-            })
+        by_region = [{
+            'region': region,
+            'alb_count': albs_by_region[region],
+            'waf_count': wafs_by_region[region]
+        } for region in self.regions]
 
         # 按类型统计
-        application_count = sum(1 for alb in self.alb_arn_index.values()
-                               if self.safe_get(alb, 'basic_info.Type') == 'application')
-        network_count = sum(1 for alb in self.alb_arn_index.values()
-                           if self.safe_get(alb, 'basic_info.Type') == 'network')
+        application_count = type_counts['application']
+        network_count = type_counts['network']
 
         stats = {
             'total_albs': total_albs,
@@ -507,6 +900,8 @@ def main():
     parser.add_argument('alb_json', help='ALB configuration JSON file')
     parser.add_argument('route53_json', help='Route53 configuration JSON file')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not use the index cache (cache directory: {CACHE_DIR})')
 
     args = parser.parse_args()
 
@@ -519,7 +914,8 @@ def main():
             args.waf_json,
             args.alb_json,
             args.route53_json,
-            debug=args.debug
+            debug=args.debug,
+            use_cache=not args.no_cache
         )
 
         # 执行关联分析
@@ -544,8 +940,8 @@ def main():
 
         if correlator.warnings:
             print(f"\n⚠️  Warnings: {len(correlator.warnings)}")
-            for warning in correlator.warnings[:5]:  # 只显示前 5 个
-                print(f"    - {warning['message']}")
+            for warning in islice(correlator.warnings, 5):  # 只显示前 5 个
+                print(f"    - {warning.message}")
 
         print("\n✓ Analysis complete")
 
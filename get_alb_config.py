@@ -7,19 +7,79 @@ AWS Multi-Account ALB Configuration Extractor
 """
 
 import boto3
-import json
+import logging
+import queue
+import sys
+from botocore.config import Config
+import hashlib
 import os
+import shutil
+import threading
+import time
+from collections import Counter, defaultdict
 from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
-from core.file_utils import save_scan_results
+from core.aws_session import create_session
+from core.file_utils import save_scan_results, load_json_file, dump_json_bytes, write_file_atomic
 
+logger = logging.getLogger('alb_scanner')
 
+# ALB 详情缓存目录
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'alb_scanner')
+# 缓存格式版本（ALB 详情的字段变化时递增，使旧缓存失效）
+CACHE_VERSION = 2
+
+# 输出中保留的 Web ACL 字段（完整的规则定义可能很大，下游的 WAF 覆盖分析只用到这些字段）
+WEBACL_KEEP = ('Name', 'Id', 'ARN', 'Description')
+# 输出中保留的可用区字段
+AVAILABILITY_ZONE_KEEP = ('ZoneName', 'SubnetId')
+
+
+def _pick(item: Dict, keys) -> Dict:
+    """只保留字典中的指定字段"""
+    return {key: item[key] for key in keys if key in item}
+
+
+def setup_logging(debug: bool = False) -> QueueListener:
+    """
+    配置扫描进度输出（alb_scanner 日志）
+
+    扫描线程只把日志记录放入队列，由 QueueListener 的后台线程统一写到标准输出，
+    工作线程不会因等待终端输出而阻塞。调试模式下输出 DEBUG 日志，并在每行前加上时间和线程名。
+
+    Args:
+        debug: 是否启用调试模式
+
+    Returns:
+        已启动的 QueueListener；输出其他内容前调用 stop()，把队列中剩余的日志全部写出
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(threadName)s %(message)s' if debug else '%(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+
+    # 重复调用（如 alb_cli 在同一进程内多次运行）时替换而不是叠加 handler
+    logger.handlers[:] = [QueueHandler(log_queue)]
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    logger.propagate = False
+
+    listener.start()
+    return listener
+
+
+@lru_cache(maxsize=4)
 def load_config_file(config_path: str = 'alb_scan_config.json') -> Optional[Dict]:
     """
     从配置文件加载扫描配置（支持独立配置文件和统一配置文件）
 
+    结果按 config_path 缓存，同一进程内重复调用不再检查和读取文件；返回的字典是共用的，调用方不要修改。
+    配置文件变更后（或切换工作目录后）需要重新读取时调用 load_config_file.cache_clear()。
+
     Args:
         config_path: 配置文件路径
 
@@ -29,9 +89,7 @@ def load_config_file(config_path: str = 'alb_scan_config.json') -> Optional[Dict
     # 优先尝试独立配置文件（向后兼容）
     if os.path.exists(config_path):
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
+            return load_json_file(config_path)
         except Exception as e:
             print(f"⚠️  警告: 无法读取配置文件 {config_path}: {str(e)}")
 
@@ -39,8 +97,7 @@ def load_config_file(config_path: str = 'alb_scan_config.json') -> Optional[Dict
     unified_config_path = 'aws_multi_account_scan_config.json'
     if os.path.exists(unified_config_path):
         try:
-            with open(unified_config_path, 'r', encoding='utf-8') as f:
-                unified_config = json.load(f)
+            unified_config = load_json_file(unified_config_path)
 
             # 提取 alb 特定配置，并合并公共配置
             if 'alb' in unified_config:
@@ -58,6 +115,65 @@ def load_config_file(config_path: str = 'alb_scan_config.json') -> Optional[Dict
     return None
 
 
+class ALBDetailsCache:
+    """
+    ALB 详情的磁盘缓存
+
+    每个 ALB 一个文件，按 ALB ARN + 扫描模式存储。超过 TTL，或 ALB 被删除重建（CreatedTime 变化）后失效。
+    命中时跳过该 ALB 的全部明细查询（WAF 关联、监听器、目标组、安全组等）。
+    """
+
+    def __init__(self, ttl: int, cache_dir: str = CACHE_DIR):
+        """
+        Args:
+            ttl: 缓存有效期（秒）
+            cache_dir: 缓存目录
+        """
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+
+    def _path(self, alb_arn: str, scan_mode: str) -> str:
+        key = f"{CACHE_VERSION}|{alb_arn}|{scan_mode}"
+        return os.path.join(self.cache_dir, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '.json')
+
+    @staticmethod
+    def _created_time(alb: Dict) -> Optional[str]:
+        created_time = alb.get('CreatedTime')
+        return created_time.isoformat() if created_time else None
+
+    def get(self, alb: Dict, scan_mode: str) -> Optional[Dict]:
+        """读取缓存的 ALB 详情，未命中或已失效时返回 None"""
+        try:
+            cached = load_json_file(self._path(alb['LoadBalancerArn'], scan_mode))
+        except Exception:
+            # 缓存不存在或已损坏
+            return None
+
+        if time.time() - cached.get('cached_at', 0) > self.ttl:
+            return None
+        if cached.get('created_time') != self._created_time(alb):
+            return None
+        return cached.get('details')
+
+    def put(self, alb: Dict, scan_mode: str, details: Dict):
+        """保存 ALB 详情（失败不影响扫描）"""
+        cached = {
+            'cached_at': time.time(),
+            'created_time': self._created_time(alb),
+            'details': details
+        }
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_file_atomic(self._path(alb['LoadBalancerArn'], scan_mode), dump_json_bytes(cached, indent=False))
+        except OSError:
+            pass
+
+    def clear(self):
+        """清空缓存目录"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
 class ALBConfigExtractor:
     """ALB 配置提取器"""
 
@@ -71,8 +187,28 @@ class ALBConfigExtractor:
         'eu-central-1',   # 欧洲（法兰克福）
     ]
 
+    # 默认并行扫描的账户数上限
+    MAX_ACCOUNT_WORKERS = 16
+    # 每个账户内并行扫描的区域数上限
+    MAX_REGION_WORKERS = 8
+    # 每个区域内并行获取详情的 ALB 数上限
+    MAX_ALB_WORKERS = 10
+    # 所有账户/区域共用的明细查询线程数（full 模式的监听器规则/目标健康状态）
+    MAX_DETAIL_WORKERS = 32
+    # 所有账户、区域、ALB 和明细线程共用的同时进行的 API 请求上限。账户/区域/ALB 线程池层层嵌套，
+    # 线程数可达 MAX_ACCOUNT_WORKERS x MAX_REGION_WORKERS x MAX_ALB_WORKERS，实际发出的请求数由此统一限制
+    MAX_IN_FLIGHT_REQUESTS = 48
+    # 每个客户端的 HTTP 连接池大小（不小于 MAX_IN_FLIGHT_REQUESTS），
+    # 默认的 10 个连接会让多出的请求等待连接或频繁新建连接
+    MAX_POOL_CONNECTIONS = 50
+    # API 调用遇到限流等可重试错误时的最多重试次数。并发扫描容易触发 API 限流，adaptive 模式在限流时由客户端自动降低请求速率
+    MAX_ATTEMPTS = 10
+    # ELBv2 describe_load_balancers/describe_target_groups 单页最大条数（默认每页较少，需要更多次请求）
+    PAGE_SIZE = 400
+
     def __init__(self, profile_names: List[str], regions: List[str] = None,
-                 scan_mode: str = 'standard', debug: bool = False):
+                 scan_mode: str = 'standard', debug: bool = False, cache_ttl: int = 0,
+                 profile_regions: Optional[Dict[str, List[str]]] = None, full_webacl: bool = False):
         """
         初始化提取器
 
@@ -80,19 +216,109 @@ class ALBConfigExtractor:
             profile_names: SSO profile 名称列表
             regions: 要扫描的区域列表，默认使用 COMMON_REGIONS
             scan_mode: 扫描模式 ('quick', 'standard', 'full')
-            debug: 是否启用调试模式
+            debug: 是否启用调试模式（alb_scanner 日志级别设为 DEBUG）
+            cache_ttl: ALB 详情磁盘缓存的有效期（秒），0 表示不使用缓存
+            profile_regions: 按 profile 指定的扫描区域（未列出的 profile 使用 regions），
+                             用于跳过已知没有负载均衡器的区域
+            full_webacl: 是否在 waf_association 中保留完整的 Web ACL（含规则定义），默认只保留 WEBACL_KEEP 字段
         """
         self.profile_names = profile_names
         self.regions = regions or self.COMMON_REGIONS
         self.scan_mode = scan_mode
         self.results = []
+        # 扫描过程中累计的摘要计数：profile -> 区域 -> Counter(with_waf, without_waf)，供 print_summary 使用
+        self._counts: Dict[str, Dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+        self._counts_lock = threading.Lock()
+        # profile -> 账户 ID
+        self._account_ids = {}
+        # 流式写出扫描结果时的 JSONL 文件（此时 self.results 为空），
+        # 以及按 profile 顺序排列的每个账户在文件中的 (偏移, 长度)
+        self.jsonl_file = None
+        self._jsonl_offsets = None
         self.debug = debug
+        if debug:
+            logger.setLevel(logging.DEBUG)
+        self.cache = ALBDetailsCache(cache_ttl) if cache_ttl > 0 else None
+        self.profile_regions = profile_regions or {}
+        self.full_webacl = full_webacl
+        # 缓存按扫描模式区分；完整 Web ACL 的结果单独缓存
+        self._cache_mode = f'{scan_mode}+webacl' if full_webacl else scan_mode
+
+        # boto3.Session 创建客户端不是线程安全的
+        self._client_lock = threading.Lock()
+
+        # (session, 服务, 区域) -> 客户端。键直接使用 session 对象而不是 id()，
+        # 缓存持有 session 引用，不会因 id 被新 session 复用而拿到其他账户凭证的客户端
+        self._clients = {}
+
+        # 明细查询共用的线程池（首次使用时创建，scan_all_accounts 结束时关闭）
+        self._detail_executor = None
+
+        # 同时进行的 API 请求数上限。只在单次 API 调用（或一次分页遍历）期间持有，
+        # 等待子任务结果时不持有，因此嵌套的线程池之间不会互相等待而死锁
+        self._api_slots = threading.BoundedSemaphore(self.MAX_IN_FLIGHT_REQUESTS)
+
+        self._boto_config = Config(
+            max_pool_connections=self.MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={'mode': 'adaptive', 'max_attempts': self.MAX_ATTEMPTS}
+        )
+
+    def _client(self, session: boto3.Session, service: str, region: Optional[str] = None):
+        """获取 boto3 客户端（按 session、服务和区域缓存，客户端本身可以在线程间共用）"""
+        key = (session, service, region)
+        with self._client_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = session.client(
+                    service, region_name=region, config=self._boto_config
+                )
+            return client
+
+    @staticmethod
+    def _map_concurrently(func, items: List, max_workers: int) -> List:
+        """并发执行 func(item)，按 items 顺序返回结果（只有一项时直接调用）"""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(len(items), max_workers)) as executor:
+            return list(executor.map(func, items))
+
+    def _map_details(self, func, items: List) -> List:
+        """
+        在共用的明细线程池中并发执行 func(item)，按 items 顺序返回结果
+
+        提交到该线程池的任务只做单次 API 调用、不再向线程池提交任务，因此不会出现线程池内互相等待的死锁；
+        所有 ALB 共用一个线程池，明细查询线程总数不超过 MAX_DETAIL_WORKERS。
+        """
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        with self._client_lock:
+            if self._detail_executor is None:
+                self._detail_executor = ThreadPoolExecutor(max_workers=self.MAX_DETAIL_WORKERS)
+            executor = self._detail_executor
+
+        return list(executor.map(func, items))
+
+    def _shutdown_detail_executor(self):
+        """关闭共用的明细线程池"""
+        with self._client_lock:
+            executor, self._detail_executor = self._detail_executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    @staticmethod
+    def _log_lines(lines: List[str]):
+        """多行输出作为一条日志记录，避免并行扫描时不同区域的输出交错"""
+        logger.info("\n".join(lines))
 
     def get_account_info(self, session: boto3.Session) -> Dict[str, str]:
         """获取账户信息"""
         try:
-            sts = session.client('sts')
-            identity = sts.get_caller_identity()
+            sts = self._client(session, 'sts')
+            with self._api_slots:
+                identity = sts.get_caller_identity()
             return {
                 'account_id': identity['Account'],
                 'arn': identity['Arn'],
@@ -131,30 +357,76 @@ class ALBConfigExtractor:
             WAF 关联信息字典
         """
         try:
-            if self.debug:
-                print(f"      [DEBUG] 查询 WAF 关联: {alb_arn}")
+            logger.debug(f"      [DEBUG] 查询 WAF 关联: {alb_arn}")
 
-            wafv2 = session.client('wafv2', region_name=region)
-            response = wafv2.get_web_acl_for_resource(ResourceArn=alb_arn)
+            wafv2 = self._client(session, 'wafv2', region)
+            with self._api_slots:
+                response = wafv2.get_web_acl_for_resource(ResourceArn=alb_arn)
 
             web_acl = response.get('WebACL', {})
-            if self.debug:
-                print(f"      [DEBUG] 找到 WAF: {web_acl.get('Name', 'Unknown')}")
+            logger.debug(f"      [DEBUG] 找到 WAF: {web_acl.get('Name', 'Unknown')}")
 
             return {
                 'has_waf': True,
-                'WebACL': web_acl
+                'WebACL': web_acl if self.full_webacl else _pick(web_acl, WEBACL_KEEP)
             }
         except wafv2.exceptions.WAFNonexistentItemException:
             # 没有关联 WAF 是正常情况
-            if self.debug:
-                print(f"      [DEBUG] 未关联 WAF")
+            logger.debug(f"      [DEBUG] 未关联 WAF")
             return {'has_waf': False, 'WebACL': None}
         except Exception as e:
-            if self.debug:
-                print(f"      [DEBUG] 查询 WAF 失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 查询 WAF 失败: {str(e)}")
             return {'has_waf': False, 'error': str(e)}
 
+    def get_web_acls_by_alb(self, session: boto3.Session, region: str) -> Optional[Dict[str, Dict]]:
+        """
+        查询区域内所有 Web ACL 关联的 ALB，按 ALB ARN 建立 Web ACL 索引
+
+        代替逐个 ALB 调用 get_web_acl_for_resource：W 个 Web ACL 只需 1 次 list_web_acls
+        加 W 次 list_resources_for_web_acl（通常 W 远小于 ALB 数）。
+
+        Args:
+            session: boto3 会话
+            region: AWS 区域
+
+        Returns:
+            ALB ARN -> Web ACL 摘要（Name、Id、ARN 等）的字典；查询失败时返回 None（调用方逐个 ALB 查询）
+        """
+        try:
+            wafv2 = self._client(session, 'wafv2', region)
+
+            web_acls = []
+            params = {'Scope': 'REGIONAL', 'Limit': 100}
+            with self._api_slots:
+                while True:
+                    response = wafv2.list_web_acls(**params)
+                    web_acls.extend(response.get('WebACLs', []))
+                    if not response.get('NextMarker'):
+                        break
+                    params['NextMarker'] = response['NextMarker']
+
+            def list_alb_arns(web_acl: Dict) -> List[str]:
+                with self._api_slots:
+                    return wafv2.list_resources_for_web_acl(
+                        WebACLArn=web_acl['ARN'], ResourceType='APPLICATION_LOAD_BALANCER'
+                    ).get('ResourceArns', [])
+
+            # 各 Web ACL 的关联资源并发查询
+            resources = self._map_details(list_alb_arns, web_acls)
+
+            web_acls_by_alb = {}
+            for web_acl, resource_arns in zip(web_acls, resources):
+                web_acl = _pick(web_acl, WEBACL_KEEP)
+                for resource_arn in resource_arns:
+                    web_acls_by_alb[resource_arn] = web_acl
+
+            logger.debug(f"      [DEBUG] {region}: {len(web_acls)} 个 Web ACL 关联了 {len(web_acls_by_alb)} 个 ALB")
+
+            return web_acls_by_alb
+        except Exception as e:
+            logger.debug(f"      [DEBUG] 查询 Web ACL 关联资源失败: {str(e)}")
+            return None
+
     def get_security_groups(self, ec2_client, sg_ids: List[str]) -> List[Dict]:
         """
         获取安全组详情
@@ -170,11 +442,11 @@ class ALBConfigExtractor:
             return []
 
         try:
-            response = ec2_client.describe_security_groups(GroupIds=sg_ids)
+            with self._api_slots:
+                response = ec2_client.describe_security_groups(GroupIds=sg_ids)
             return response.get('SecurityGroups', [])
         except Exception as e:
-            if self.debug:
-                print(f"      [DEBUG] 获取安全组失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 获取安全组失败: {str(e)}")
             return []
 
     def get_alb_listeners(self, elbv2_client, alb_arn: str) -> List[Dict]:
@@ -189,11 +461,11 @@ class ALBConfigExtractor:
             监听器列表
         """
         try:
-            response = elbv2_client.describe_listeners(LoadBalancerArn=alb_arn)
+            with self._api_slots:
+                response = elbv2_client.describe_listeners(LoadBalancerArn=alb_arn)
             return response.get('Listeners', [])
         except Exception as e:
-            if self.debug:
-                print(f"      [DEBUG] 获取监听器失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 获取监听器失败: {str(e)}")
             return []
 
     def get_listener_rules(self, elbv2_client, listener_arn: str) -> List[Dict]:
@@ -208,11 +480,11 @@ class ALBConfigExtractor:
             规则列表
         """
         try:
-            response = elbv2_client.describe_rules(ListenerArn=listener_arn)
+            with self._api_slots:
+                response = elbv2_client.describe_rules(ListenerArn=listener_arn)
             return response.get('Rules', [])
         except Exception as e:
-            if self.debug:
-                print(f"      [DEBUG] 获取监听器规则失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 获取监听器规则失败: {str(e)}")
             return []
 
     def get_target_groups(self, elbv2_client, alb_arn: str) -> List[Dict]:
@@ -227,13 +499,37 @@ class ALBConfigExtractor:
             目标组列表
         """
         try:
-            response = elbv2_client.describe_target_groups(LoadBalancerArn=alb_arn)
+            with self._api_slots:
+                response = elbv2_client.describe_target_groups(LoadBalancerArn=alb_arn)
             return response.get('TargetGroups', [])
         except Exception as e:
-            if self.debug:
-                print(f"      [DEBUG] 获取目标组失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 获取目标组失败: {str(e)}")
             return []
 
+    def get_target_groups_by_alb(self, elbv2_client) -> Optional[Dict[str, List[Dict]]]:
+        """
+        一次列出区域内所有目标组，并按所属 ALB 分组（代替逐个 ALB 查询）
+
+        Args:
+            elbv2_client: ELBv2 客户端
+
+        Returns:
+            字典，键为 ALB ARN，值为目标组列表；查询失败时返回 None（调用方回退为逐个查询）
+        """
+        target_groups_by_alb = {}
+        try:
+            paginator = elbv2_client.get_paginator('describe_target_groups')
+            with self._api_slots:
+                for page in paginator.paginate(PaginationConfig={'PageSize': self.PAGE_SIZE}):
+                    for tg in page.get('TargetGroups', []):
+                        for alb_arn in tg.get('LoadBalancerArns', []):
+                            target_groups_by_alb.setdefault(alb_arn, []).append(tg)
+        except Exception as e:
+            logger.debug(f"      [DEBUG] 批量获取目标组失败: {str(e)}")
+            return None
+
+        return target_groups_by_alb
+
     def get_target_health(self, elbv2_client, target_group_arn: str) -> List[Dict]:
         """
         获取目标健康状态
@@ -246,14 +542,16 @@ class ALBConfigExtractor:
             目标健康状态列表
         """
         try:
-            response = elbv2_client.describe_target_health(TargetGroupArn=target_group_arn)
+            with self._api_slots:
+                response = elbv2_client.describe_target_health(TargetGroupArn=target_group_arn)
             return response.get('TargetHealthDescriptions', [])
         except Exception as e:
-            if self.debug:
-                print(f"      [DEBUG] 获取目标健康状态失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 获取目标健康状态失败: {str(e)}")
             return []
 
-    def get_alb_details(self, session: boto3.Session, alb: Dict, region: str) -> Dict[str, Any]:
+    def get_alb_details(self, session: boto3.Session, alb: Dict, region: str,
+                        target_groups_by_alb: Optional[Dict[str, List[Dict]]] = None,
+                        web_acls_by_alb: Optional[Dict[str, Dict]] = None) -> Dict[str, Any]:
         """
         获取单个 ALB 的详细信息
 
@@ -261,6 +559,8 @@ class ALBConfigExtractor:
             session: boto3 会话
             alb: describe_load_balancers 返回的 ALB 信息
             region: AWS 区域
+            target_groups_by_alb: 区域内按 ALB 分组的目标组（为 None 时单独查询该 ALB 的目标组）
+            web_acls_by_alb: 区域内 ALB ARN -> Web ACL 的索引（为 None 时单独查询该 ALB 的 WAF 关联）
 
         Returns:
             ALB 详细信息字典
@@ -268,8 +568,7 @@ class ALBConfigExtractor:
         alb_arn = alb['LoadBalancerArn']
         alb_name = alb['LoadBalancerName']
 
-        if self.debug:
-            print(f"    [DEBUG] 处理 ALB: {alb_name}")
+        logger.debug(f"    [DEBUG] 处理 ALB: {alb_name}")
 
         # 基本信息
         alb_details = {
@@ -284,16 +583,20 @@ class ALBConfigExtractor:
                 'VpcId': alb.get('VpcId'),
                 'Scheme': alb.get('Scheme'),
                 'IpAddressType': alb.get('IpAddressType'),
-                'AvailabilityZones': alb.get('AvailabilityZones', []),
+                'AvailabilityZones': [_pick(az, AVAILABILITY_ZONE_KEEP) for az in alb.get('AvailabilityZones', [])],
                 'SecurityGroups': alb.get('SecurityGroups', [])
             }
         }
 
-        # WAF 关联（所有模式都获取）
-        alb_details['waf_association'] = self.get_waf_association(session, alb_arn, region)
+        # WAF 关联（所有模式都获取；索引只覆盖 Application Load Balancer，其他类型仍逐个查询）
+        if web_acls_by_alb is not None and alb.get('Type') == 'application':
+            web_acl = web_acls_by_alb.get(alb_arn)
+            alb_details['waf_association'] = {'has_waf': web_acl is not None, 'WebACL': web_acl}
+        else:
+            alb_details['waf_association'] = self.get_waf_association(session, alb_arn, region)
 
         # 创建客户端
-        elbv2 = session.client('elbv2', region_name=region)
+        elbv2 = self._client(session, 'elbv2', region)
 
         # standard 和 full 模式获取更多信息
         if self.scan_mode in ['standard', 'full']:
@@ -301,68 +604,118 @@ class ALBConfigExtractor:
             listeners = self.get_alb_listeners(elbv2, alb_arn)
             alb_details['listeners'] = listeners
 
-            # full 模式获取监听器规则
-            if self.scan_mode == 'full' and listeners:
-                for listener in listeners:
-                    listener['Rules'] = self.get_listener_rules(elbv2, listener['ListenerArn'])
-
-            # 目标组
-            target_groups = self.get_target_groups(elbv2, alb_arn)
+            # 目标组（优先使用区域级批量查询的结果；复制一份，避免多个 ALB 共用的目标组互相影响）
+            if target_groups_by_alb is not None:
+                target_groups = [dict(tg) for tg in target_groups_by_alb.get(alb_arn, [])]
+            else:
+                target_groups = self.get_target_groups(elbv2, alb_arn)
             alb_details['target_groups'] = target_groups
 
-            # full 模式获取目标健康状态
-            if self.scan_mode == 'full' and target_groups:
+            # 其余明细互不依赖，合并为一批并发查询，每项为 (查询函数, 结果写入的字典, 键)：
+            # full 模式的各监听器规则、各目标组健康状态，以及安全组详情
+            lookups = []
+            if self.scan_mode == 'full':
+                for listener in listeners:
+                    lookups.append((
+                        lambda arn=listener['ListenerArn']: self.get_listener_rules(elbv2, arn),
+                        listener, 'Rules'
+                    ))
+
                 for tg in target_groups:
-                    tg['target_health'] = self.get_target_health(elbv2, tg['TargetGroupArn'])
+                    lookups.append((
+                        lambda arn=tg['TargetGroupArn']: self.get_target_health(elbv2, arn),
+                        tg, 'target_health'
+                    ))
 
-            # 安全组详情
             if alb.get('SecurityGroups'):
-                ec2 = session.client('ec2', region_name=region)
-                alb_details['security_groups_detail'] = self.get_security_groups(
-                    ec2, alb.get('SecurityGroups', [])
-                )
+                ec2 = self._client(session, 'ec2', region)
+                lookups.append((
+                    lambda: self.get_security_groups(ec2, alb.get('SecurityGroups', [])),
+                    alb_details, 'security_groups_detail'
+                ))
+
+            results = self._map_details(lambda lookup: lookup[0](), lookups)
+            for (_, target, key), result in zip(lookups, results):
+                target[key] = result
 
         return alb_details
 
-    def scan_region(self, session: boto3.Session, region: str) -> List[Dict]:
+    def scan_region(self, session: boto3.Session, region: str, profile_name: Optional[str] = None) -> List[Dict]:
         """
         在指定区域扫描所有 ALB
 
         Args:
             session: boto3 会话
             region: AWS 区域
+            profile_name: 所属 profile（用于累计扫描摘要）
 
         Returns:
             ALB 列表
         """
         albs = []
+        lines = [f"\n  扫描区域: {region}"]
 
         try:
-            elbv2 = session.client('elbv2', region_name=region)
+            elbv2 = self._client(session, 'elbv2', region)
 
             # 列出所有负载均衡器
             paginator = elbv2.get_paginator('describe_load_balancers')
-
-            for page in paginator.paginate():
-                for alb in page.get('LoadBalancers', []):
-                    # 可以根据配置过滤类型（application/network/gateway）
-                    alb_type = alb.get('Type', '')
-
-                    # 获取详细信息
-                    alb_details = self.get_alb_details(session, alb, region)
-
-                    # 打印摘要
-                    waf_status = "有 WAF" if alb_details['waf_association']['has_waf'] else "无 WAF"
-                    print(f"    ✓ {alb['LoadBalancerName']} ({self.parse_alb_type(alb_type)}, {waf_status})")
-
-                    albs.append(alb_details)
+            with self._api_slots:
+                load_balancers = paginator.paginate(
+                    PaginationConfig={'PageSize': self.PAGE_SIZE}
+                ).build_full_result().get('LoadBalancers', [])
+
+            # 先查磁盘缓存，只有未命中的 ALB 需要查询明细
+            details = [self.cache.get(alb, self._cache_mode) for alb in load_balancers] if self.cache \
+                else [None] * len(load_balancers)
+            missing = [alb for alb, alb_details in zip(load_balancers, details) if alb_details is None]
+
+            # standard/full 模式一次查询区域内所有目标组，代替逐个 ALB 查询
+            target_groups_by_alb = None
+            if missing and self.scan_mode in ['standard', 'full']:
+                target_groups_by_alb = self.get_target_groups_by_alb(elbv2)
+
+            # 按 Web ACL 反查关联的 ALB，代替逐个 ALB 查询 WAF 关联（反查只能得到 Web ACL 摘要，
+            # 需要完整 Web ACL 时仍逐个查询）
+            web_acls_by_alb = None
+            if missing and not self.full_webacl:
+                web_acls_by_alb = self.get_web_acls_by_alb(session, region)
+
+            # 并发获取详细信息（每个 ALB 需要多次 API 调用），结果按列表顺序返回
+            fetched = iter(self._map_concurrently(
+                lambda alb: self.get_alb_details(session, alb, region, target_groups_by_alb, web_acls_by_alb),
+                missing, self.MAX_ALB_WORKERS
+            ))
+            for i, alb in enumerate(load_balancers):
+                if details[i] is None:
+                    details[i] = next(fetched)
+                    if self.cache:
+                        self.cache.put(alb, self._cache_mode, details[i])
+
+            with_waf = 0
+            for alb, alb_details in zip(load_balancers, details):
+                # 可以根据配置过滤类型（application/network/gateway）
+                alb_type = alb.get('Type', '')
+
+                # 打印摘要
+                has_waf = alb_details['waf_association']['has_waf']
+                with_waf += bool(has_waf)
+                waf_status = "有 WAF" if has_waf else "无 WAF"
+                lines.append(f"    ✓ {alb['LoadBalancerName']} ({self.parse_alb_type(alb_type)}, {waf_status})")
+
+                albs.append(alb_details)
+
+            if albs:
+                with self._counts_lock:
+                    counts = self._counts[profile_name][region]
+                    counts['with_waf'] += with_waf
+                    counts['without_waf'] += len(albs) - with_waf
 
         except Exception as e:
-            print(f"    ✗ 扫描区域 {region} 失败: {str(e)}")
-            if self.debug:
-                import traceback
-                traceback.print_exc()
+            lines.append(f"    ✗ 扫描区域 {region} 失败: {str(e)}")
+            logger.debug(f"    [DEBUG] 扫描区域 {region} 失败", exc_info=True)
 
+        self._log_lines(lines)
         return albs
 
     def scan_account(self, profile_name: str) -> Dict[str, Any]:
@@ -375,9 +728,7 @@ class ALBConfigExtractor:
         Returns:
             账户扫描结果字典
         """
-        print(f"\n{'='*80}")
-        print(f"正在扫描账户: {profile_name}")
-        print(f"{'='*80}")
+        self._log_lines(['', '=' * 80, f"正在扫描账户: {profile_name}", '=' * 80])
 
         account_result = {
             'profile': profile_name,
@@ -388,24 +739,28 @@ class ALBConfigExtractor:
 
         try:
             # 创建会话
-            session = boto3.Session(profile_name=profile_name)
+            session = create_session(profile_name)
 
             # 获取账户信息
             account_info = self.get_account_info(session)
             account_result['account_info'] = account_info
 
             if 'error' in account_info:
-                print(f"✗ 无法获取账户信息: {account_info['error']}")
+                logger.info(f"✗ 无法获取账户信息: {account_info['error']}")
                 return account_result
 
-            print(f"✓ 账户 ID: {account_info['account_id']}")
-
-            # 扫描所有区域
-            for region in self.regions:
-                print(f"\n  扫描区域: {region}")
+            logger.info(f"✓ 账户 ID: {account_info['account_id']}")
+            self._account_ids[profile_name] = account_info['account_id']
 
-                albs = self.scan_region(session, region)
+            # 并行扫描该账户的所有区域（耗时主要在等待 API 响应），结果按区域顺序收集
+            regions = self.profile_regions.get(profile_name, self.regions)
+            max_workers = max(1, min(len(regions), self.MAX_REGION_WORKERS))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                region_albs = list(executor.map(
+                    lambda region: self.scan_region(session, region, profile_name), regions
+                ))
 
+            for region, albs in zip(regions, region_albs):
                 if albs:
                     region_result = {
                         'region': region,
@@ -414,49 +769,73 @@ class ALBConfigExtractor:
                     account_result['regions'].append(region_result)
 
         except Exception as e:
-            print(f"✗ 扫描账户失败: {str(e)}")
-            if self.debug:
-                import traceback
-                traceback.print_exc()
+            logger.info(f"✗ 扫描账户失败: {str(e)}")
+            logger.debug(f"[DEBUG] 扫描账户 {profile_name} 失败", exc_info=True)
 
         return account_result
 
-    def scan_all_accounts(self, parallel: bool = True) -> List[Dict]:
+    def scan_all_accounts(self, parallel: bool = True, max_workers: Optional[int] = None,
+                          jsonl_file: Optional[str] = None) -> List[Dict]:
         """
         扫描所有账户
 
         Args:
             parallel: 是否并行扫描
+            max_workers: 并行扫描的账户数，默认为 min(账户数, MAX_ACCOUNT_WORKERS)
+            jsonl_file: 流式输出文件。指定时每个账户扫描完成后立即以一行 JSON 写入该文件（按完成顺序），
+                        内存中只保留该行在文件中的位置，self.results 为空；
+                        save_results 再按 profile 顺序从该文件转换为 JSON（与不流式输出时的结果一致）
 
         Returns:
-            所有账户的扫描结果
-        """
-        if parallel and len(self.profile_names) > 1:
-            # 并行扫描
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                futures = {
-                    executor.submit(self.scan_account, profile): profile
-                    for profile in self.profile_names
-                }
+            所有账户的扫描结果（按 profile 顺序；流式输出时为空列表）
+        """
+        account_results = [None] * len(self.profile_names)
+        line_offsets = [None] * len(self.profile_names)
+        stream = open(jsonl_file, 'wb') if jsonl_file else None
+
+        def collect(index: int, result: Dict):
+            if stream is not None:
+                line = dump_json_bytes(result, indent=False) + b'\n'
+                line_offsets[index] = (stream.tell(), len(line))
+                stream.write(line)
+                stream.flush()
+            else:
+                account_results[index] = result
 
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        self.results.append(result)
-                    except Exception as e:
-                        profile = futures[future]
-                        print(f"✗ 扫描账户 {profile} 失败: {str(e)}")
-        else:
-            # 串行扫描
-            for profile in self.profile_names:
-                result = self.scan_account(profile)
-                self.results.append(result)
+        try:
+            if parallel and len(self.profile_names) > 1:
+                # 并行扫描：每个 future 的结果写入各自的位置，完成顺序不影响结果顺序
+                workers = max_workers or min(len(self.profile_names), self.MAX_ACCOUNT_WORKERS)
+
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(self.scan_account, profile): index
+                        for index, profile in enumerate(self.profile_names)
+                    }
 
+                    for future in as_completed(futures):
+                        index = futures[future]
+                        try:
+                            collect(index, future.result())
+                        except Exception as e:
+                            logger.info(f"✗ 扫描账户 {self.profile_names[index]} 失败: {str(e)}")
+            else:
+                # 串行扫描
+                for index, profile in enumerate(self.profile_names):
+                    collect(index, self.scan_account(profile))
+        finally:
+            self._shutdown_detail_executor()
+            if stream is not None:
+                stream.close()
+
+        self.jsonl_file = jsonl_file
+        self._jsonl_offsets = [offset for offset in line_offsets if offset is not None] if jsonl_file else None
+        self.results = [result for result in account_results if result is not None]
         return self.results
 
     def save_results(self, output_file: Optional[str] = None, save_latest: bool = True):
         """
-        保存扫描结果到 JSON 文件
+        保存扫描结果到 JSON 文件（流式扫描时从 JSONL 文件逐行转换）
 
         Args:
             output_file: 输出文件名，如果为 None 则自动生成带时间戳的文件名
@@ -470,36 +849,35 @@ class ALBConfigExtractor:
             prefix='alb_config',
             output_file=output_file,
             save_latest=save_latest,
-            verbose=True
+            verbose=True,
+            jsonl_file=self.jsonl_file,
+            jsonl_line_offsets=self._jsonl_offsets
         )
         return main_file
 
     def print_summary(self):
         """打印扫描摘要"""
-        print(f"\n{'='*80}")
-        print("扫描摘要")
-        print(f"{'='*80}")
+        lines = ['', '=' * 80, "扫描摘要", '=' * 80]
 
         total_albs = 0
         total_with_waf = 0
         total_without_waf = 0
 
-        for account in self.results:
-            account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            profile = account.get('profile')
-
-            if account.get('regions'):
-                print(f"\n账户 {account_id} ({profile}):")
+        for profile in self.profile_names:
+            region_counts = self._counts.get(profile)
 
-                for region_data in account['regions']:
-                    region = region_data['region']
-                    albs = region_data.get('load_balancers', [])
-                    alb_count = len(albs)
+            if region_counts:
+                lines.append(f"\n账户 {self._account_ids.get(profile, 'Unknown')} ({profile}):")
 
-                    with_waf = sum(1 for alb in albs if alb['waf_association']['has_waf'])
-                    without_waf = alb_count - with_waf
+                # 按扫描区域的顺序输出
+                for region in self.profile_regions.get(profile, self.regions):
+                    if region not in region_counts:
+                        continue
+                    with_waf = region_counts[region]['with_waf']
+                    without_waf = region_counts[region]['without_waf']
+                    alb_count = with_waf + without_waf
 
-                    print(f"  - {region}: {alb_count} 个 ALB ({with_waf} 个有 WAF, {without_waf} 个无 WAF)")
+                    lines.append(f"  - {region}: {alb_count} 个 ALB ({with_waf} 个有 WAF, {without_waf} 个无 WAF)")
 
                     total_albs += alb_count
                     total_with_waf += with_waf
@@ -507,7 +885,8 @@ class ALBConfigExtractor:
 
         waf_coverage = (total_with_waf / total_albs * 100) if total_albs > 0 else 0
 
-        print(f"\n总计: {total_albs} 个 ALB, {total_with_waf} 个有 WAF ({waf_coverage:.1f}%), {total_without_waf} 个无 WAF ({100-waf_coverage:.1f}%)")
+        lines.append(f"\n总计: {total_albs} 个 ALB, {total_with_waf} 个有 WAF ({waf_coverage:.1f}%), {total_without_waf} 个无 WAF ({100-waf_coverage:.1f}%)")
+        self._log_lines(lines)
 
 
 def main():
@@ -526,11 +905,33 @@ def main():
     parser.add_argument('-o', '--output', help='输出文件路径')
     parser.add_argument('--debug', action='store_true', help='启用调试模式')
     parser.add_argument('--no-parallel', action='store_true', help='禁用并行扫描')
+    parser.add_argument('--max-account-workers', type=int, default=None, metavar='N',
+                        help=f'并行扫描的账户数（默认: min(账户数, {ALBConfigExtractor.MAX_ACCOUNT_WORKERS})）')
     parser.add_argument('--no-latest', action='store_true',
                         help='只生成带时间戳的文件，不生成 latest 文件')
+    parser.add_argument('--jsonl', metavar='FILE',
+                        help='每个账户扫描完成后立即追加一行到该 JSONL 文件（内存中不保留完整结果，扫描结束后再转换为 JSON 文件）')
+    parser.add_argument('--cache-ttl', type=int, default=0, metavar='SECONDS',
+                        help=f'缓存 ALB 详情的有效期（秒），有效期内重复扫描跳过明细查询；默认 0 不使用缓存（缓存目录: {CACHE_DIR}）')
+    parser.add_argument('--invalidate-cache', action='store_true',
+                        help='扫描前清空 ALB 详情缓存')
+    parser.add_argument('--full-webacl', action='store_true',
+                        help='在 waf_association 中保留完整的 Web ACL（含规则定义），默认只保留 Name/Id/ARN/Description')
 
     args = parser.parse_args()
 
+    if args.cache_ttl < 0:
+        print("错误: --cache-ttl 不能为负数")
+        return 1
+
+    if args.max_account_workers is not None and args.max_account_workers < 1:
+        print("错误: --max-account-workers 必须大于等于 1")
+        return 1
+
+    if args.invalidate_cache:
+        ALBDetailsCache(0).clear()
+        print(f"✓ 已清空 ALB 详情缓存: {CACHE_DIR}")
+
     # 尝试从配置文件加载
     config = load_config_file()
 
@@ -544,11 +945,13 @@ def main():
         print("请使用 -p 参数指定，或在 alb_scan_config.json 中配置")
         return 1
 
-    # 确定 regions
+    # 确定 regions（命令行指定区域时忽略配置文件中的 per_profile）
     regions = args.regions
+    profile_regions = None
     if not regions and config:
         region_config = config.get('regions', {})
         regions = region_config.get('common', ALBConfigExtractor.COMMON_REGIONS)
+        profile_regions = region_config.get('per_profile')
     elif not regions:
         regions = ALBConfigExtractor.COMMON_REGIONS
 
@@ -558,20 +961,30 @@ def main():
 
     print(f"\n开始扫描 {len(profiles)} 个账户...")
     print(f"扫描区域: {', '.join(regions)}")
+    if profile_regions:
+        print(f"按 profile 指定区域: {len(profile_regions)} 个 profile")
 
     # 创建提取器
     extractor = ALBConfigExtractor(
         profile_names=profiles,
         regions=regions,
         scan_mode=args.mode,
-        debug=args.debug
+        debug=args.debug,
+        cache_ttl=args.cache_ttl,
+        profile_regions=profile_regions,
+        full_webacl=args.full_webacl
     )
 
-    # 扫描所有账户
-    extractor.scan_all_accounts(parallel=not args.no_parallel)
+    # 扫描所有账户（扫描进度通过日志队列输出）
+    listener = setup_logging(args.debug)
+    try:
+        extractor.scan_all_accounts(parallel=not args.no_parallel, max_workers=args.max_account_workers,
+                                    jsonl_file=args.jsonl)
 
-    # 打印摘要
-    extractor.print_summary()
+        # 打印摘要
+        extractor.print_summary()
+    finally:
+        listener.stop()
 
     # 保存结果
     extractor.save_results(args.output, save_latest=not args.no_latest)
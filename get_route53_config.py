@@ -9,16 +9,120 @@ AWS Multi-Account Route53 Configuration Extractor
 """
 
 import boto3
+from botocore.config import Config
 import json
+import logging
 import os
-import time
+import queue
+import sys
+import threading
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import defaultdict
+from collections import Counter
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 import argparse
 from botocore.exceptions import ClientError
-from core.file_utils import save_scan_results
+from core.aws_session import create_session
+from core.file_utils import save_scan_results, dump_json_bytes
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，未安装时一次性加载整个统一配置文件
+    ijson = None
+
+# 扫描进度输出（由 setup_logging 配置）
+logger = logging.getLogger('route53_scanner')
+
+# 统一配置文件中 Route53 扫描需要的顶层键
+UNIFIED_CONFIG_KEYS = ('profiles', 'regions', 'route53')
+
+# 没有 ResourceRecords 的记录（Alias 记录）共用的空值，避免每条记录分配一个新的空列表。
+# 使用不可变的元组，序列化结果与空列表相同（[]）
+NO_RESOURCE_RECORDS = ()
+
+
+@lru_cache(maxsize=4096)
+def classify_alias_target(dns_name: str) -> str:
+    """
+    根据 Alias 目标的 DNS 名称推断目标类型
+
+    按顺序做子串判断：名称同时包含多个模式时（如 ELB 名称中含 "execute-api"）以先判断的类型为准。
+    CPython 中 str 的 in 判断比合并成一个正则（或遍历规则表）更快，因此保留这种写法。
+    结果按 DNS 名称缓存：同一个 ELB/CloudFront 目标通常被多条记录引用（A + AAAA、根域名 + www 等）。
+
+    Args:
+        dns_name: Alias 目标的 DNS 名称
+
+    Returns:
+        目标类型描述
+    """
+    dns_name = dns_name.lower() if dns_name else ''
+
+    if 'elb.amazonaws.com' in dns_name or 'elasticloadbalancing' in dns_name:
+        return 'ELB (Application/Network/Classic Load Balancer)'
+    if 'cloudfront.net' in dns_name:
+        return 'CloudFront Distribution'
+    if 's3-website' in dns_name:
+        return 'S3 Website Endpoint'
+    if 'execute-api' in dns_name:
+        return 'API Gateway'
+    if 'amplifyapp.com' in dns_name:
+        return 'AWS Amplify'
+    if 'apprunner' in dns_name:
+        return 'App Runner'
+    return 'Unknown (possibly another Route53 record)'
+
+
+def setup_logging(debug: bool = False) -> QueueListener:
+    """
+    配置扫描进度输出（route53_scanner 日志）
+
+    账户线程和 Zone 线程只把日志记录放入队列，由 QueueListener 的后台线程统一写到标准输出，
+    工作线程不会因等待终端输出而阻塞。调试模式下输出 DEBUG 日志，并在每行前加上时间和线程名。
+
+    Args:
+        debug: 是否启用调试模式
+
+    Returns:
+        已启动的 QueueListener；输出其他内容前调用 stop()，把队列中剩余的日志全部写出
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(threadName)s %(message)s' if debug else '%(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+
+    # 重复调用（如在同一进程内多次运行）时替换而不是叠加 handler
+    logger.handlers[:] = [QueueHandler(log_queue)]
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    logger.propagate = False
+
+    listener.start()
+    return listener
+
+
+def _load_unified_config(path: str) -> Dict:
+    """
+    读取统一配置文件中 Route53 需要的顶层键
+
+    安装了 ijson 时按顶层键流式解析，只构建 UNIFIED_CONFIG_KEYS 对应的值，
+    其他服务（waf、cloudfront 等）的配置子树不会被构建成 Python 对象；否则回退到 json.load。
+    """
+    if ijson is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            unified_config = json.load(f)
+        return {key: unified_config[key] for key in UNIFIED_CONFIG_KEYS if key in unified_config}
+
+    wanted = {}
+    with open(path, 'rb') as f:
+        for key, value in ijson.kvitems(f, '', use_float=True):
+            if key in UNIFIED_CONFIG_KEYS:
+                wanted[key] = value
+                if len(wanted) == len(UNIFIED_CONFIG_KEYS):
+                    break
+    return wanted
 
 
 def load_config_file(config_path: str = 'route53_scan_config.json') -> Optional[Dict]:
@@ -44,8 +148,7 @@ def load_config_file(config_path: str = 'route53_scan_config.json') -> Optional[
     unified_config_path = 'aws_multi_account_scan_config.json'
     if os.path.exists(unified_config_path):
         try:
-            with open(unified_config_path, 'r', encoding='utf-8') as f:
-                unified_config = json.load(f)
+            unified_config = _load_unified_config(unified_config_path)
 
             # 提取 route53 特定配置，并合并公共配置
             if 'route53' in unified_config:
@@ -69,8 +172,23 @@ class Route53ConfigExtractor:
     # Route53 是全局服务，固定使用 us-east-1 作为客户端区域
     CLIENT_REGION = 'us-east-1'
 
+    # 并行扫描的账户数上限（默认值，可通过 scan_options.account_workers 或 --max-account-workers 调整）。
+    # 每个账户使用各自的凭证和客户端，账户之间没有共享的连接池或限流配额
+    ACCOUNT_WORKERS = 8
+    # 每个账户内并行获取记录的 Hosted Zone 数上限
+    MAX_ZONE_WORKERS = 8
+    # 每个客户端的 HTTP 连接池大小：同一账户的 Route53 客户端被所有 Zone 线程共用，
+    # 连接池不小于并发线程数才不会出现 "Connection pool is full" 而频繁重建 TLS 连接
+    MAX_POOL_CONNECTIONS = max(32, MAX_ZONE_WORKERS)
+    # API 调用遇到限流等可重试错误时的最多重试次数。adaptive 模式按请求退避重试，并在限流时由客户端自动降低请求速率
+    MAX_ATTEMPTS = 10
+    # 单页最大条数（API 上限：list_resource_record_sets 300，list_hosted_zones 100），默认每页较少，需要更多次请求
+    RECORD_PAGE_SIZE = 300
+    ZONE_PAGE_SIZE = 100
+
     def __init__(self, profile_names: List[str], regions: Optional[List[str]] = None,
-                 debug: bool = False):
+                 debug: bool = False, fetch_delegation_set: bool = False,
+                 account_workers: Optional[int] = None):
         """
         初始化提取器
 
@@ -78,21 +196,82 @@ class Route53ConfigExtractor:
             profile_names: SSO profile 名称列表
             regions: 区域列表（Route53 是全局服务，此参数会被忽略但保留接口兼容性）
             debug: 是否启用调试模式
+            fetch_delegation_set: 是否逐个 Zone 调用 get_hosted_zone 获取 DelegationSet（NS 服务器）。
+                                  默认不获取（delegation_set 为 None），每个 Zone 少一次 API 调用
+            account_workers: 并行扫描的账户数上限，默认为 ACCOUNT_WORKERS
 
         注意: 只扫描 Public Hosted Zones（Global level），不扫描 Private Zones（VPC level）
         """
         self.profile_names = profile_names
         self.results = []
+        # 每个账户的统计摘要（total_public_zones、total_records，按 profile 顺序），供 print_summary 使用
+        self.account_summaries = []
+        # 流式写出扫描结果时的 JSONL 文件（此时 self.results 为空），
+        # 以及按 profile 顺序排列的每个账户在文件中的 (偏移, 长度)
+        self.jsonl_file = None
+        self._jsonl_offsets = None
+        # 本次扫描的开始时间（scan_all_accounts 开始时记录），作为所有账户结果的 scan_time
+        self._scan_started_at = None
         self.debug = debug
+        if debug:
+            logger.setLevel(logging.DEBUG)
+        self.fetch_delegation_set = fetch_delegation_set
+        self.account_workers = self.ACCOUNT_WORKERS if account_workers is None else account_workers
+
+        # profile -> boto3.Session，(session, 服务) -> 客户端。客户端可以在线程间共用，
+        # 但 boto3.Session 创建客户端不是线程安全的，创建时加锁
+        self._sessions = {}
+        self._clients = {}
+        self._client_lock = threading.Lock()
+        # 每个账户只有一个 Route53 客户端，被该账户所有 Zone 线程共用：客户端的 urllib3 连接池
+        # 保持 TLS 连接（tcp_keepalive），预热后后续请求不再握手
+        self._boto_config = Config(
+            max_pool_connections=self.MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={'mode': 'adaptive', 'max_attempts': self.MAX_ATTEMPTS}
+        )
 
         # regions 参数被忽略，但保留以兼容配置文件
         if regions and debug:
-            print(f"⚠️  Route53 是全局服务，regions 参数已被忽略: {regions}")
+            logger.info(f"⚠️  Route53 是全局服务，regions 参数已被忽略: {regions}")
+
+    def _session(self, profile_name: str) -> boto3.Session:
+        """获取 profile 的 boto3 会话（每个 profile 只创建一次，凭证只解析一次；所有会话共用服务模型加载器）"""
+        with self._client_lock:
+            session = self._sessions.get(profile_name)
+            if session is None:
+                session = self._sessions[profile_name] = create_session(profile_name)
+            return session
+
+    def _client(self, session: boto3.Session, service: str):
+        """获取 boto3 客户端（按 session 和服务缓存；Route53 是全局服务，客户端固定使用 CLIENT_REGION）"""
+        key = (session, service)
+        with self._client_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = session.client(
+                    service, region_name=self.CLIENT_REGION, config=self._boto_config
+                )
+            return client
+
+    @staticmethod
+    def _log_lines(lines: List[str]):
+        """多行输出作为一条日志记录，避免并行扫描时不同账户的输出交错"""
+        logger.info("\n".join(lines))
+
+    @staticmethod
+    def _map_concurrently(func, items: List, max_workers: int) -> List:
+        """并发执行 func(item)，按 items 顺序返回结果（只有一项时直接调用）"""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(len(items), max_workers)) as executor:
+            return list(executor.map(func, items))
 
     def get_account_info(self, session: boto3.Session) -> Dict[str, str]:
         """获取账户信息"""
         try:
-            sts = session.client('sts')
+            sts = self._client(session, 'sts')
             identity = sts.get_caller_identity()
             return {
                 'account_id': identity['Account'],
@@ -112,43 +291,43 @@ class Route53ConfigExtractor:
         Returns:
             路由策略信息字典
         """
+        # 除 Simple 外的路由策略都要求 SetIdentifier：没有 SetIdentifier 的记录（最常见的情况）直接返回
+        set_identifier = record.get('SetIdentifier')
+        if not set_identifier:
+            return {'Type': 'Simple', 'Details': {}}
+
         policy_info = {
             'Type': 'Simple',  # 默认
             'Details': {}
         }
 
-        # Weighted（加权）
+        # 一条记录只能使用一种路由策略，按常见程度依次判断，命中后不再检查其余字段
         if record.get('Weight') is not None:
+            # Weighted（加权）
             policy_info['Type'] = 'Weighted'
             policy_info['Details']['Weight'] = record['Weight']
-
-        # Latency（延迟）
-        if record.get('Region'):
+        elif record.get('Region'):
+            # Latency（延迟）
             policy_info['Type'] = 'Latency'
             policy_info['Details']['Region'] = record['Region']
-
-        # Failover（故障转移）
-        if record.get('Failover'):
+        elif record.get('Failover'):
+            # Failover（故障转移）
             policy_info['Type'] = 'Failover'
             policy_info['Details']['Failover'] = record['Failover']  # PRIMARY 或 SECONDARY
-
-        # Geolocation（地理位置）
-        if record.get('GeoLocation'):
+        elif record.get('GeoLocation'):
+            # Geolocation（地理位置）
             policy_info['Type'] = 'Geolocation'
             policy_info['Details']['GeoLocation'] = record['GeoLocation']
-
-        # Geoproximity（地理邻近，需要 Traffic Flow）
-        if record.get('GeoProximityLocation'):
+        elif record.get('GeoProximityLocation'):
+            # Geoproximity（地理邻近，需要 Traffic Flow）
             policy_info['Type'] = 'Geoproximity'
             policy_info['Details']['GeoProximityLocation'] = record['GeoProximityLocation']
-
-        # Multivalue Answer（多值应答）
-        if record.get('MultiValueAnswer'):
+        elif record.get('MultiValueAnswer'):
+            # Multivalue Answer（多值应答）
             policy_info['Type'] = 'Multivalue'
 
         # SetIdentifier 用于区分相同名称和类型的记录
-        if record.get('SetIdentifier'):
-            policy_info['SetIdentifier'] = record['SetIdentifier']
+        policy_info['SetIdentifier'] = set_identifier
 
         return policy_info
 
@@ -164,35 +343,45 @@ class Route53ConfigExtractor:
         """
         dns_name_value = alias_target.get('DNSName', '')
 
-        alias_info = {
+        return {
             'DNSName': dns_name_value,
             'HostedZoneId': alias_target.get('HostedZoneId'),
             'EvaluateTargetHealth': alias_target.get('EvaluateTargetHealth'),
+            # 尝试推断目标类型（基于 DNS 名称模式）
+            'TargetType': classify_alias_target(dns_name_value),
         }
 
-        # 尝试推断目标类型（基于 DNS 名称模式）
-        dns_name = dns_name_value.lower() if dns_name_value else ''
-
-        if 'elb.amazonaws.com' in dns_name or 'elasticloadbalancing' in dns_name:
-            alias_info['TargetType'] = 'ELB (Application/Network/Classic Load Balancer)'
-        elif 'cloudfront.net' in dns_name:
-            alias_info['TargetType'] = 'CloudFront Distribution'
-        elif 's3-website' in dns_name:
-            alias_info['TargetType'] = 'S3 Website Endpoint'
-        elif 'execute-api' in dns_name:
-            alias_info['TargetType'] = 'API Gateway'
-        elif 'amplifyapp.com' in dns_name:
-            alias_info['TargetType'] = 'AWS Amplify'
-        elif 'apprunner' in dns_name:
-            alias_info['TargetType'] = 'App Runner'
-        else:
-            alias_info['TargetType'] = 'Unknown (possibly another Route53 record)'
+    def _build_record_info(self, record: Dict) -> Dict[str, Any]:
+        """
+        将 API 返回的记录转换为输出的记录信息
 
-        return alias_info
+        Args:
+            record: list_resource_record_sets 返回的记录对象
+
+        Returns:
+            记录信息字典
+        """
+        get = record.get
+
+        # 解析 Alias 记录
+        alias_target = get('AliasTarget')
+        alias_info = self.parse_alias_target(alias_target) if alias_target else None
+
+        # ResourceRecords 直接引用 API 返回的列表，不复制
+        return {
+            'Name': get('Name'),
+            'Type': get('Type'),
+            'TTL': get('TTL'),  # Alias 记录没有 TTL
+            'ResourceRecords': get('ResourceRecords') or NO_RESOURCE_RECORDS,
+            'AliasTarget': alias_info,
+            'RoutingPolicy': self.parse_routing_policy(record),
+            'HealthCheckId': get('HealthCheckId'),
+            'SetIdentifier': get('SetIdentifier'),
+        }
 
     def get_zone_records(self, session: boto3.Session, zone_id: str, zone_name: str) -> List[Dict]:
         """
-        获取 Hosted Zone 的所有 DNS 记录（支持分页和限流重试）
+        获取 Hosted Zone 的所有 DNS 记录（支持分页；限流由 botocore 的 adaptive 重试按请求处理）
 
         Args:
             session: boto3 会话
@@ -202,66 +391,26 @@ class Route53ConfigExtractor:
         Returns:
             DNS 记录列表
         """
-        route53 = session.client('route53', region_name=self.CLIENT_REGION)
+        route53 = self._client(session, 'route53')
 
         records = []
-        max_retries = 3
-        retry_delay = 2  # 秒
 
         try:
             # 使用 paginator 自动处理分页（最多 300 条/页）
             paginator = route53.get_paginator('list_resource_record_sets')
 
-            for page in paginator.paginate(HostedZoneId=zone_id):
-                for record in page.get('ResourceRecordSets', []):
-                    # 解析路由策略
-                    routing_policy = self.parse_routing_policy(record)
-
-                    # 解析 Alias 记录
-                    alias_info = None
-                    if record.get('AliasTarget'):
-                        alias_info = self.parse_alias_target(record['AliasTarget'])
-
-                    # 构建记录信息
-                    record_info = {
-                        'Name': record.get('Name'),
-                        'Type': record.get('Type'),
-                        'TTL': record.get('TTL'),  # Alias 记录没有 TTL
-                        'ResourceRecords': record.get('ResourceRecords', []),
-                        'AliasTarget': alias_info,
-                        'RoutingPolicy': routing_policy,
-                        'HealthCheckId': record.get('HealthCheckId'),
-                        'SetIdentifier': record.get('SetIdentifier'),
-                    }
-
-                    records.append(record_info)
-
-            if self.debug:
-                print(f"      [DEBUG] 获取到 {len(records)} 条 DNS 记录")
+            for page in paginator.paginate(HostedZoneId=zone_id,
+                                           PaginationConfig={'PageSize': self.RECORD_PAGE_SIZE}):
+                records.extend(map(self._build_record_info, page.get('ResourceRecordSets', [])))
 
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'Throttling':
-                # API 限流，重试
-                retry_count = 0
-                while retry_count < max_retries:
-                    retry_count += 1
-                    wait_time = retry_delay * (2 ** (retry_count - 1))  # 指数退避
-                    print(f"    ⚠️  API 限流，{wait_time} 秒后重试 ({retry_count}/{max_retries})...")
-                    time.sleep(wait_time)
+            logger.debug(f"      [DEBUG] 获取到 {len(records)} 条 DNS 记录")
 
-                    try:
-                        return self.get_zone_records(session, zone_id, zone_name)
-                    except Exception:
-                        if retry_count >= max_retries:
-                            print(f"    ✗ 超过最大重试次数，跳过 Zone: {zone_name}")
-                            break
-            else:
-                print(f"    ✗ 获取 DNS 记录失败: {str(e)}")
+        except ClientError as e:
+            # 可重试的错误（包括限流）已由 botocore 重试到上限，这里只记录一次
+            logger.info(f"    ✗ 获取 Zone {zone_name} 的 DNS 记录失败: {str(e)}")
         except Exception as e:
-            print(f"    ✗ 获取 DNS 记录失败: {str(e)}")
-            if self.debug:
-                import traceback
-                traceback.print_exc()
+            logger.info(f"    ✗ 获取 DNS 记录失败: {str(e)}")
+            logger.debug(f"      [DEBUG] 获取 Zone {zone_name} 的 DNS 记录失败", exc_info=True)
 
         return records
 
@@ -275,11 +424,7 @@ class Route53ConfigExtractor:
         Returns:
             记录类型统计字典
         """
-        summary = defaultdict(int)
-        for record in records:
-            record_type = record.get('Type', 'Unknown')
-            summary[record_type] += 1
-        return dict(summary)
+        return dict(Counter(record.get('Type', 'Unknown') for record in records))
 
     def get_zone_details(self, session: boto3.Session, zone_id: str) -> Dict[str, Any]:
         """
@@ -292,7 +437,7 @@ class Route53ConfigExtractor:
         Returns:
             Zone 详细信息
         """
-        route53 = session.client('route53', region_name=self.CLIENT_REGION)
+        route53 = self._client(session, 'route53')
 
         try:
             response = route53.get_hosted_zone(Id=zone_id)
@@ -305,10 +450,36 @@ class Route53ConfigExtractor:
             return zone_detail
 
         except Exception as e:
-            if self.debug:
-                print(f"    [DEBUG] 获取 Zone 详情失败: {str(e)}")
+            logger.debug(f"    [DEBUG] 获取 Zone 详情失败: {str(e)}")
             return {}
 
+    def _scan_one_zone(self, session: boto3.Session, zone: Dict) -> Dict[str, Any]:
+        """
+        获取单个 Hosted Zone 的详情和 DNS 记录
+
+        Args:
+            session: boto3 会话
+            zone: list_hosted_zones 返回的 Zone 信息
+
+        Returns:
+            Zone 扫描结果
+        """
+        zone_id = zone['Id']
+
+        # 获取详细信息（只用于 DelegationSet；Name/Id/Config/ResourceRecordSetCount 已包含在 zone 中）
+        zone_details = self.get_zone_details(session, zone_id) if self.fetch_delegation_set else {}
+
+        # 获取 DNS 记录
+        records = self.get_zone_records(session, zone_id, zone['Name'])
+
+        return {
+            'basic_info': zone,
+            'delegation_set': zone_details.get('DelegationSet'),
+            'records': records,
+            'record_count': len(records),
+            'record_type_summary': self._summarize_record_types(records)
+        }
+
     def scan_hosted_zones(self, session: boto3.Session) -> List[Dict]:
         """
         扫描所有 Hosted Zones（支持分页）
@@ -319,15 +490,16 @@ class Route53ConfigExtractor:
         Returns:
             Hosted Zones 列表
         """
-        route53 = session.client('route53', region_name=self.CLIENT_REGION)
+        route53 = self._client(session, 'route53')
 
         zones = []
 
         try:
             # 使用 paginator 处理大量 Zone
             paginator = route53.get_paginator('list_hosted_zones')
+            public_zones = []
 
-            for page in paginator.paginate():
+            for page in paginator.paginate(PaginationConfig={'PageSize': self.ZONE_PAGE_SIZE}):
                 for zone in page.get('HostedZones', []):
                     zone_id = zone['Id']
                     zone_name = zone['Name']
@@ -335,40 +507,32 @@ class Route53ConfigExtractor:
 
                     # 只扫描 Public Zones，跳过 Private Zones
                     if is_private:
-                        if self.debug:
-                            print(f"    ⊘ 跳过私有 Zone (VPC level): {zone_name}")
+                        logger.debug(f"    ⊘ 跳过私有 Zone (VPC level): {zone_name}")
                         continue
 
                     if self.debug:
-                        print(f"    处理公有 Zone: {zone_name} ({zone_id})")
+                        logger.debug(f"    处理公有 Zone: {zone_name} ({zone_id})")
                     else:
-                        print(f"    扫描公有 Zone: {zone_name}")
-
-                    # 获取详细信息
-                    zone_details = self.get_zone_details(session, zone_id)
+                        logger.info(f"    扫描公有 Zone: {zone_name}")
 
-                    # 获取 DNS 记录
-                    records = self.get_zone_records(session, zone_id, zone_name)
+                    public_zones.append(zone)
 
-                    # 构建结果
-                    zone_info = {
-                        'basic_info': zone,
-                        'delegation_set': zone_details.get('DelegationSet'),
-                        'records': records,
-                        'record_count': len(records),
-                        'record_type_summary': self._summarize_record_types(records)
-                    }
-
-                    zones.append(zone_info)
+            # 并发获取各 Zone 的详情和 DNS 记录（耗时主要在等待 API 响应），结果按 Zone 列表顺序返回
+            zones = self._map_concurrently(
+                lambda zone: self._scan_one_zone(session, zone),
+                public_zones, self.MAX_ZONE_WORKERS
+            )
 
         except Exception as e:
-            print(f"  ✗ 扫描 Hosted Zones 失败: {str(e)}")
-            if self.debug:
-                import traceback
-                traceback.print_exc()
+            logger.info(f"  ✗ 扫描 Hosted Zones 失败: {str(e)}")
+            logger.debug("    [DEBUG] 扫描 Hosted Zones 失败", exc_info=True)
 
         return zones
 
+    def _scan_time(self) -> str:
+        """账户结果的 scan_time：本次扫描的开始时间（单独调用 scan_account 时为当前时间）"""
+        return self._scan_started_at or datetime.now(timezone.utc).isoformat()
+
     def scan_account(self, profile_name: str) -> Dict[str, Any]:
         """
         扫描单个账户
@@ -379,26 +543,23 @@ class Route53ConfigExtractor:
         Returns:
             账户扫描结果
         """
-        print(f"\n{'='*80}")
-        print(f"扫描账户: {profile_name}")
-        print(f"{'='*80}")
+        self._log_lines(['', '=' * 80, f"扫描账户: {profile_name}", '=' * 80])
 
         try:
             # 创建会话
-            session = boto3.Session(profile_name=profile_name)
+            session = self._session(profile_name)
 
             # 获取账户信息
             account_info = self.get_account_info(session)
             account_id = account_info.get('account_id', 'Unknown')
 
-            print(f"账户 ID: {account_id}")
-            print(f"ARN: {account_info.get('arn', 'Unknown')}")
+            self._log_lines([f"账户 ID: {account_id}", f"ARN: {account_info.get('arn', 'Unknown')}"])
 
             if 'error' in account_info:
                 raise Exception(f"无法获取账户信息: {account_info['error']}")
 
             # 扫描 Hosted Zones（Route53 是全局服务，不需要区域循环）
-            print(f"\n正在扫描 Hosted Zones...")
+            logger.info(f"\n正在扫描 Hosted Zones...")
             zones = self.scan_hosted_zones(session)
 
             # 统计信息（只包含 Public Zones）
@@ -410,15 +571,17 @@ class Route53ConfigExtractor:
                 'total_records': total_records
             }
 
-            print(f"\n✓ 扫描完成:")
-            print(f"  - 公有 Hosted Zones: {total_zones}")
-            print(f"  - 总 DNS 记录: {total_records}")
+            self._log_lines([
+                "\n✓ 扫描完成:",
+                f"  - 公有 Hosted Zones: {total_zones}",
+                f"  - 总 DNS 记录: {total_records}",
+            ])
 
             # 构建账户结果
             account_result = {
                 'profile': profile_name,
                 'account_info': account_info,
-                'scan_time': datetime.now(timezone.utc).isoformat(),
+                'scan_time': self._scan_time(),
                 'hosted_zones': zones,
                 'summary': summary
             }
@@ -426,15 +589,13 @@ class Route53ConfigExtractor:
             return account_result
 
         except Exception as e:
-            print(f"✗ 扫描账户 {profile_name} 失败: {str(e)}")
-            if self.debug:
-                import traceback
-                traceback.print_exc()
+            logger.info(f"✗ 扫描账户 {profile_name} 失败: {str(e)}")
+            logger.debug(f"[DEBUG] 扫描账户 {profile_name} 失败", exc_info=True)
 
             return {
                 'profile': profile_name,
                 'account_info': {'error': str(e)},
-                'scan_time': datetime.now(timezone.utc).isoformat(),
+                'scan_time': self._scan_time(),
                 'hosted_zones': [],
                 'summary': {
                     'total_public_zones': 0,
@@ -442,44 +603,75 @@ class Route53ConfigExtractor:
                 }
             }
 
-    def scan_all_accounts(self, parallel: bool = True) -> List[Dict]:
+    def scan_all_accounts(self, parallel: bool = True, jsonl_file: Optional[str] = None) -> List[Dict]:
         """
         扫描所有账户
 
         Args:
             parallel: 是否并行扫描（账户级别）
+            jsonl_file: 流式输出文件。指定时每个账户扫描完成后立即以一行 JSON 写入该文件（按完成顺序），
+                        内存中只保留账户统计摘要和该行在文件中的位置，self.results 为空；
+                        save_results 再按 profile 顺序从该文件转换为 JSON（与不流式输出时的结果一致）
 
         Returns:
-            所有账户的扫描结果
+            所有账户的扫描结果（按 profile 顺序；流式输出时为空列表）
         """
+        self._scan_started_at = datetime.now(timezone.utc).isoformat()
+        account_results = [None] * len(self.profile_names)
+        account_summaries = [None] * len(self.profile_names)
+        line_offsets = [None] * len(self.profile_names)
+        stream = open(jsonl_file, 'wb') if jsonl_file else None
+
+        def collect(index: int, result: Dict):
+            account_summaries[index] = result.get('summary', {})
+            if stream is not None:
+                line = dump_json_bytes(result, indent=False) + b'\n'
+                line_offsets[index] = (stream.tell(), len(line))
+                stream.write(line)
+                stream.flush()
+            else:
+                account_results[index] = result
+
+        try:
+            self._scan_accounts(parallel, collect)
+        finally:
+            if stream is not None:
+                stream.close()
+
+        self.jsonl_file = jsonl_file
+        self._jsonl_offsets = [offset for offset in line_offsets if offset is not None] if jsonl_file else None
+        self.results = [result for result in account_results if result is not None]
+        self.account_summaries = [summary for summary in account_summaries if summary is not None]
+        return self.results
+
+    def _scan_accounts(self, parallel: bool, collect):
+        """扫描所有账户，每个账户完成后在当前线程调用 collect(账户序号, result)"""
         if parallel and len(self.profile_names) > 1:
             # 并行扫描多个账户
-            print(f"使用并行模式扫描 {len(self.profile_names)} 个账户（最多 3 个并发）")
+            workers = min(len(self.profile_names), self.account_workers)
+            logger.info(f"使用并行模式扫描 {len(self.profile_names)} 个账户（最多 {workers} 个并发）")
 
-            with ThreadPoolExecutor(max_workers=3) as executor:
+            # 每个 future 的结果写入各自的位置，完成顺序不影响结果顺序
+            with ThreadPoolExecutor(max_workers=workers) as executor:
                 futures = {
-                    executor.submit(self.scan_account, profile): profile
-                    for profile in self.profile_names
+                    executor.submit(self.scan_account, profile): index
+                    for index, profile in enumerate(self.profile_names)
                 }
 
                 for future in as_completed(futures):
+                    index = futures[future]
                     try:
-                        result = future.result()
-                        self.results.append(result)
+                        collect(index, future.result())
                     except Exception as e:
-                        profile = futures[future]
-                        print(f"✗ 扫描账户 {profile} 失败: {str(e)}")
+                        logger.info(f"✗ 扫描账户 {self.profile_names[index]} 失败: {str(e)}")
         else:
             # 串行扫描
-            for profile in self.profile_names:
-                result = self.scan_account(profile)
-                self.results.append(result)
-
-        return self.results
+            for index, profile in enumerate(self.profile_names):
+                collect(index, self.scan_account(profile))
 
     def save_results(self, output_file: Optional[str] = None, save_latest: bool = True):
         """
-        保存结果到 JSON 文件
+        保存结果到 JSON 文件（流式扫描时从 JSONL 文件逐行转换）
 
         Args:
             output_file: 输出文件名，如果为 None 则自动生成带时间戳的文件名
@@ -493,29 +685,33 @@ class Route53ConfigExtractor:
             prefix='route53_config',
             output_file=output_file,
             save_latest=save_latest,
-            verbose=True
+            verbose=True,
+            jsonl_file=self.jsonl_file,
+            jsonl_line_offsets=self._jsonl_offsets
         )
         return main_file
 
     def print_summary(self):
         """打印总体统计摘要（只包含 Public Zones）"""
-        if not self.results:
+        if not self.account_summaries:
             return
 
         total_public_zones = 0
         total_records = 0
 
-        for account in self.results:
-            summary = account.get('summary', {})
+        for summary in self.account_summaries:
             total_public_zones += summary.get('total_public_zones', 0)
             total_records += summary.get('total_records', 0)
 
-        print(f"\n{'='*80}")
-        print(f"总体统计")
-        print(f"{'='*80}")
-        print(f"扫描账户数: {len(self.results)}")
-        print(f"公有 Hosted Zones: {total_public_zones}")
-        print(f"总 DNS 记录: {total_records}")
+        self._log_lines([
+            '',
+            '=' * 80,
+            "总体统计",
+            '=' * 80,
+            f"扫描账户数: {len(self.account_summaries)}",
+            f"公有 Hosted Zones: {total_public_zones}",
+            f"总 DNS 记录: {total_records}",
+        ])
 
 
 def main():
@@ -539,6 +735,11 @@ def main():
                         action='store_true',
                         help='禁用并行扫描（串行处理所有账户）')
 
+    parser.add_argument('--max-account-workers',
+                        type=int,
+                        help=f'并行扫描的账户数（默认: 配置文件 scan_options.account_workers，'
+                             f'未配置时为 {Route53ConfigExtractor.ACCOUNT_WORKERS}）')
+
     parser.add_argument('-o', '--output',
                         help='指定输出文件名（默认自动生成）')
 
@@ -546,8 +747,20 @@ def main():
                         action='store_true',
                         help='只生成带时间戳的文件，不生成 latest 文件')
 
+    parser.add_argument('--jsonl',
+                        metavar='FILE',
+                        help='每个账户扫描完成后立即追加一行到该 JSONL 文件（内存中不保留完整结果，扫描结束后再按 profile 顺序转换为 JSON 文件）')
+
+    parser.add_argument('--delegation-set',
+                        action='store_true',
+                        help='获取每个 Zone 的 DelegationSet（NS 服务器），每个 Zone 多一次 get_hosted_zone 调用')
+
     args = parser.parse_args()
 
+    if args.max_account_workers is not None and args.max_account_workers < 1:
+        print("错误: --max-account-workers 必须大于等于 1")
+        return 1
+
     # 加载配置文件
     config = load_config_file()
 
@@ -560,7 +773,7 @@ def main():
         print("错误: 必须提供至少一个 AWS profile")
         print("  方式1: 使用 -p 参数指定")
         print("  方式2: 在 route53_scan_config.json 中配置")
-        return
+        return 1
 
     # 确定 regions（虽然会被忽略）
     regions = args.regions
@@ -568,26 +781,47 @@ def main():
         region_config = config.get('regions', {})
         regions = region_config.get('common', [])
 
+    # 是否获取 DelegationSet（命令行或配置文件 scan_options.fetch_delegation_set）
+    fetch_delegation_set = args.delegation_set
+    if not fetch_delegation_set and config and 'scan_options' in config:
+        fetch_delegation_set = config['scan_options'].get('fetch_delegation_set', False)
+
+    # 并行扫描的账户数（命令行优先，其次配置文件 scan_options.account_workers）
+    account_workers = args.max_account_workers
+    if account_workers is None and config and 'scan_options' in config:
+        account_workers = config['scan_options'].get('account_workers')
+        if account_workers is not None and (
+                not isinstance(account_workers, int) or isinstance(account_workers, bool) or account_workers < 1):
+            print(f"错误: 配置文件 scan_options.account_workers 必须是大于等于 1 的整数（当前: {account_workers!r}）")
+            return 1
+
     # 创建提取器（只扫描 Public Zones）
     extractor = Route53ConfigExtractor(
         profile_names=profiles,
         regions=regions,
-        debug=args.debug
+        debug=args.debug,
+        fetch_delegation_set=fetch_delegation_set,
+        account_workers=account_workers
     )
 
-    # 扫描所有账户
+    # 是否并行扫描（配置文件 scan_options.parallel 优先）
     parallel = not args.no_parallel
     if config and 'scan_options' in config:
         parallel = config['scan_options'].get('parallel', parallel)
 
-    extractor.scan_all_accounts(parallel=parallel)
+    # 扫描所有账户（扫描进度通过日志队列输出）
+    listener = setup_logging(args.debug)
+    try:
+        extractor.scan_all_accounts(parallel=parallel, jsonl_file=args.jsonl)
 
-    # 打印总体统计
-    extractor.print_summary()
+        # 打印总体统计
+        extractor.print_summary()
+    finally:
+        listener.stop()
 
     # 保存结果
     extractor.save_results(args.output, save_latest=not args.no_latest)
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
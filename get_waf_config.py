@@ -7,14 +7,52 @@ AWS Multi-Account WAF Configuration Extractor
 """
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 import json
+import logging
 import os
+import queue
+import sys
+import threading
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
 import argparse
 from core.file_utils import save_scan_results
 
+# 扫描进度输出（由 setup_logging 配置）
+logger = logging.getLogger('waf_scanner')
+
+
+def setup_logging(debug: bool = False) -> QueueListener:
+    """
+    配置扫描进度输出（waf_scanner 日志）
+
+    账户线程和区域线程只把日志记录放入队列，由 QueueListener 的后台线程统一写到标准输出，
+    工作线程不会因等待终端输出而阻塞。调试模式下输出 DEBUG 日志，并在每行前加上时间和线程名。
+
+    Args:
+        debug: 是否启用调试模式
+
+    Returns:
+        已启动的 QueueListener；输出其他内容前调用 stop()，把队列中剩余的日志全部写出
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(threadName)s %(message)s' if debug else '%(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+
+    # 重复调用（如在同一进程内多次运行）时替换而不是叠加 handler
+    logger.handlers[:] = [QueueHandler(log_queue)]
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    logger.propagate = False
+
+    listener.start()
+    return listener
+
 
 def load_config_file(config_path: str = 'waf_scan_config.json') -> Optional[Dict]:
     """
@@ -74,6 +112,19 @@ class WAFConfigExtractor:
         'eu-central-1',   # 欧洲（法兰克福）
     ]
 
+    # 并行扫描的账户数上限
+    MAX_ACCOUNT_WORKERS = 8
+    # 每个账户内并行扫描的 (区域, scope) 数上限：CLOUDFRONT scope 和各区域的 REGIONAL scope 互不依赖
+    MAX_REGION_WORKERS = 8
+    # 每个 Web ACL 并行查询关联资源的 ResourceType 数上限（list_resources_for_web_acl 每次只能查询一种类型）
+    MAX_RESOURCE_TYPE_WORKERS = 7
+    # list_resources_for_web_acl 返回这些错误码时视为无关联资源（Web ACL 已删除 / 该区域不支持此资源类型）
+    NO_RESOURCE_ERROR_CODES = ('WAFNonexistentItemException', 'WAFInvalidParameterException')
+    # 每个客户端的 HTTP 连接池大小（默认 10），避免并发请求时连接池成为瓶颈
+    MAX_POOL_CONNECTIONS = 50
+    # API 调用遇到限流等可重试错误时的最多重试次数。adaptive 模式按请求退避重试，并在限流时由客户端自动降低请求速率
+    MAX_ATTEMPTS = 10
+
     def __init__(self, profile_names: List[str], regions: Optional[List[str]] = None, debug: bool = False):
         """
         初始化提取器
@@ -87,11 +138,48 @@ class WAFConfigExtractor:
         self.regions = regions or self.COMMON_REGIONS
         self.results = []
         self.debug = debug
+        if debug:
+            logger.setLevel(logging.DEBUG)
+
+        # (session, 服务, 区域) -> 客户端。客户端可以在线程间共用，
+        # 但 boto3.Session 创建客户端不是线程安全的，创建时加锁
+        self._clients = {}
+        self._client_lock = threading.Lock()
+        self._boto_config = Config(
+            max_pool_connections=self.MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            retries={'mode': 'adaptive', 'max_attempts': self.MAX_ATTEMPTS}
+        )
+
+    def _client(self, session: boto3.Session, service: str, region: Optional[str] = None):
+        """获取 boto3 客户端（按 session、服务和区域缓存，客户端本身可以在线程间共用）"""
+        key = (session, service, region)
+        with self._client_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = session.client(
+                    service, region_name=region, config=self._boto_config
+                )
+            return client
+
+    @staticmethod
+    def _log_lines(lines: List[str]):
+        """多行输出作为一条日志记录，避免并行扫描时不同账户的输出交错"""
+        logger.info("\n".join(lines))
+
+    @staticmethod
+    def _map_concurrently(func, items: List, max_workers: int) -> List:
+        """并发执行 func(item)，按 items 顺序返回结果（只有一项时直接调用）"""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(len(items), max_workers)) as executor:
+            return list(executor.map(func, items))
 
     def get_account_info(self, session: boto3.Session) -> Dict[str, str]:
         """获取账户信息"""
         try:
-            sts = session.client('sts')
+            sts = self._client(session, 'sts')
             identity = sts.get_caller_identity()
             return {
                 'account_id': identity['Account'],
@@ -181,7 +269,8 @@ class WAFConfigExtractor:
                 'error': f'Failed to parse ARN: {str(e)}'
             }
 
-    def get_associated_resources(self, session: boto3.Session, web_acl_arn: str, scope: str, region: str = 'us-east-1', debug: bool = False) -> List[Dict]:
+    def get_associated_resources(self, session: boto3.Session, web_acl_arn: str, scope: str, region: str = 'us-east-1', debug: bool = False,
+                                 resource_errors: Optional[Dict[str, str]] = None) -> List[Dict]:
         """
         获取 Web ACL 关联的 AWS 资源
 
@@ -191,27 +280,30 @@ class WAFConfigExtractor:
             scope: CLOUDFRONT 或 REGIONAL
             region: AWS 区域（用于创建客户端）
             debug: 是否显示调试信息
+            resource_errors: 可选，记录查询失败的资源类型 {资源类型: 错误信息}
 
         Returns:
-            关联资源列表
+            关联资源列表（某个资源类型查询失败时只包含其余类型的资源）
         """
+        if resource_errors is None:
+            resource_errors = {}
         associated_resources = []
 
         # 如果是 CLOUDFRONT scope，使用 CloudFront API 获取 distributions
         if scope == 'CLOUDFRONT':
             try:
                 if debug:
-                    print(f"      [DEBUG] 使用 CloudFront API 获取关联的 distributions...")
-                    print(f"      [DEBUG] Web ACL ARN: {web_acl_arn}")
+                    logger.debug(f"      [DEBUG] 使用 CloudFront API 获取关联的 distributions...")
+                    logger.debug(f"      [DEBUG] Web ACL ARN: {web_acl_arn}")
 
                 # 从 ARN 中提取 Web ACL ID
                 # ARN 格式: arn:aws:wafv2:region:account-id:global/webacl/name/id
                 web_acl_id = web_acl_arn.split('/')[-1]
                 if debug:
-                    print(f"      [DEBUG] Web ACL ID: {web_acl_id}")
+                    logger.debug(f"      [DEBUG] Web ACL ID: {web_acl_id}")
 
                 # 创建 CloudFront 客户端
-                cloudfront_client = session.client('cloudfront', region_name='us-east-1')
+                cloudfront_client = self._client(session, 'cloudfront', 'us-east-1')
 
                 # 使用 CloudFront API 获取关联的 distributions
                 response = cloudfront_client.list_distributions_by_web_acl_id(
@@ -222,7 +314,7 @@ class WAFConfigExtractor:
                 distributions = distribution_list.get('Items', [])
 
                 if debug:
-                    print(f"      [DEBUG] 找到 {len(distributions)} 个 CloudFront distributions")
+                    logger.debug(f"      [DEBUG] 找到 {len(distributions)} 个 CloudFront distributions")
 
                 # 解析 CloudFront 账户 ID（从 ARN 中提取）
                 arn_parts = web_acl_arn.split(':')
@@ -233,8 +325,8 @@ class WAFConfigExtractor:
                     distribution_arn = f"arn:aws:cloudfront::{account_id}:distribution/{distribution_id}"
 
                     if debug:
-                        print(f"      [DEBUG] 解析 Distribution: {distribution_id}")
-                        print(f"      [DEBUG] 构建的 ARN: {distribution_arn}")
+                        logger.debug(f"      [DEBUG] 解析 Distribution: {distribution_id}")
+                        logger.debug(f"      [DEBUG] 构建的 ARN: {distribution_arn}")
 
                     resource_info = self.parse_resource_arn(distribution_arn)
                     resource_info['resource_type_api'] = 'CLOUDFRONT'
@@ -243,18 +335,17 @@ class WAFConfigExtractor:
                     associated_resources.append(resource_info)
 
                 if debug and len(distributions) == 0:
-                    print(f"      [DEBUG] ⚠️  此 Web ACL 未关联任何 CloudFront 分配")
+                    logger.debug(f"      [DEBUG] ⚠️  此 Web ACL 未关联任何 CloudFront 分配")
 
             except Exception as e:
                 if debug:
-                    print(f"      [DEBUG] 获取 CLOUDFRONT 资源失败: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.debug(f"      [DEBUG] 获取 CLOUDFRONT 资源失败: {str(e)}", exc_info=True)
+                resource_errors['CLOUDFRONT'] = str(e)
 
         # 如果是 REGIONAL scope，获取所有支持的资源类型
         if scope == 'REGIONAL':
             # 创建 WAFv2 客户端
-            wafv2_client = session.client('wafv2', region_name=region)
+            wafv2_client = self._client(session, 'wafv2', region)
 
             resource_types = [
                 'APPLICATION_LOAD_BALANCER',
@@ -266,24 +357,45 @@ class WAFConfigExtractor:
                 'AMPLIFY'  # AWS Amplify apps
             ]
 
-            for resource_type in resource_types:
+            def list_resource_arns(resource_type: str) -> Tuple[List[str], Optional[str]]:
+                """返回 (资源 ARN 列表, 错误信息)，查询失败时错误信息不为 None"""
                 try:
                     if debug:
-                        print(f"      [DEBUG] 尝试获取 {resource_type} 资源...")
+                        logger.debug(f"      [DEBUG] 尝试获取 {resource_type} 资源...")
                     response = wafv2_client.list_resources_for_web_acl(
                         WebACLArn=web_acl_arn,
                         ResourceType=resource_type
                     )
-                    resource_arns = response.get('ResourceArns', [])
-                    if debug and len(resource_arns) > 0:
-                        print(f"      [DEBUG] 找到 {len(resource_arns)} 个 {resource_type} 资源")
-                    for resource_arn in resource_arns:
-                        resource_info = self.parse_resource_arn(resource_arn)
-                        resource_info['resource_type_api'] = resource_type
-                        associated_resources.append(resource_info)
+                    return response.get('ResourceArns', []), None
+                except ClientError as e:
+                    # Web ACL 不存在或该区域不支持此资源类型，视为无关联资源
+                    if e.response.get('Error', {}).get('Code') in self.NO_RESOURCE_ERROR_CODES:
+                        if debug:
+                            logger.debug(f"      [DEBUG] 获取 {resource_type} 资源失败: {str(e)}")
+                        return [], None
+                    error = e
                 except Exception as e:
-                    if debug:
-                        print(f"      [DEBUG] 获取 {resource_type} 资源失败: {str(e)}")
+                    error = e
+
+                # 其他错误（限流已由 botocore 重试到上限、无权限等）不能当作无关联资源，由调用方记录
+                if debug:
+                    logger.debug(f"      [DEBUG] 获取 {resource_type} 资源失败: {str(error)}")
+                return [], str(error)
+
+            # 各 ResourceType 的查询互不依赖，并行发出；结果按 resource_types 顺序返回，全部返回后再解析 ARN
+            arns_by_type = self._map_concurrently(
+                list_resource_arns, resource_types, self.MAX_RESOURCE_TYPE_WORKERS
+            )
+
+            for resource_type, (resource_arns, error) in zip(resource_types, arns_by_type):
+                if error is not None:
+                    resource_errors[resource_type] = error
+                if debug and len(resource_arns) > 0:
+                    logger.debug(f"      [DEBUG] 找到 {len(resource_arns)} 个 {resource_type} 资源")
+                for resource_arn in resource_arns:
+                    resource_info = self.parse_resource_arn(resource_arn)
+                    resource_info['resource_type_api'] = resource_type
+                    associated_resources.append(resource_info)
 
         return associated_resources
 
@@ -299,7 +411,7 @@ class WAFConfigExtractor:
         web_acls = []
 
         try:
-            wafv2 = session.client('wafv2', region_name=region)
+            wafv2 = self._client(session, 'wafv2', region)
 
             # 列出所有 Web ACL
             response = wafv2.list_web_acls(Scope=scope)
@@ -316,9 +428,10 @@ class WAFConfigExtractor:
                     # 获取关联的资源
                     web_acl_arn = acl_summary.get('ARN')
                     associated_resources = []
+                    resource_errors = {}
                     if web_acl_arn:
                         associated_resources = self.get_associated_resources(
-                            session, web_acl_arn, scope, region, self.debug
+                            session, web_acl_arn, scope, region, self.debug, resource_errors
                         )
 
                     web_acl_data = {
@@ -327,18 +440,23 @@ class WAFConfigExtractor:
                         'lock_token': acl_detail.get('LockToken'),
                         'associated_resources': associated_resources
                     }
+                    # 部分资源类型查询失败：保留已获取的资源，并记录失败的类型（关联资源列表不完整）
+                    if resource_errors:
+                        web_acl_data['associated_resources_error'] = resource_errors
+                        for resource_type, error in resource_errors.items():
+                            logger.info(f"    ✗ [{region} {scope}] 获取 Web ACL {acl_summary['Name']} 的 {resource_type} 关联资源失败: {error}")
 
-                    # 在摘要信息中添加资源数量
+                    # 在摘要信息中添加资源数量（各区域并行扫描，输出中带上区域和 scope）
                     resource_count = len(associated_resources)
                     if resource_count > 0:
-                        print(f"    ✓ 获取到 Web ACL: {acl_summary['Name']} ({resource_count} 个关联资源)")
+                        logger.info(f"    ✓ [{region} {scope}] 获取到 Web ACL: {acl_summary['Name']} ({resource_count} 个关联资源)")
                     else:
-                        print(f"    ✓ 获取到 Web ACL: {acl_summary['Name']} (无关联资源)")
+                        logger.info(f"    ✓ [{region} {scope}] 获取到 Web ACL: {acl_summary['Name']} (无关联资源)")
 
                     web_acls.append(web_acl_data)
 
                 except Exception as e:
-                    print(f"    ✗ 获取 Web ACL {acl_summary['Name']} 详情失败: {str(e)}")
+                    logger.info(f"    ✗ [{region} {scope}] 获取 Web ACL {acl_summary['Name']} 详情失败: {str(e)}")
                     web_acls.append({
                         'summary': acl_summary,
                         'error': str(e)
@@ -348,9 +466,9 @@ class WAFConfigExtractor:
             error_msg = str(e)
             # 如果是权限错误或资源不存在，记录但不中断
             if 'AccessDenied' in error_msg or 'UnauthorizedOperation' in error_msg:
-                print(f"    - 无权限访问 {region} ({scope})")
+                logger.info(f"    - 无权限访问 {region} ({scope})")
             else:
-                print(f"    ✗ 扫描 {region} ({scope}) 失败: {error_msg}")
+                logger.info(f"    ✗ 扫描 {region} ({scope}) 失败: {error_msg}")
 
         return web_acls
 
@@ -358,12 +476,12 @@ class WAFConfigExtractor:
         """
         扫描单个账户的所有区域
 
+        CLOUDFRONT scope 和各区域的 REGIONAL scope 作为独立任务并行扫描，结果按原顺序组装。
+
         Args:
             profile_name: AWS CLI profile 名称
         """
-        print(f"\n{'='*80}")
-        print(f"正在扫描账户: {profile_name}")
-        print(f"{'='*80}")
+        self._log_lines(['', '=' * 80, f"正在扫描账户: {profile_name}", '=' * 80])
 
         account_result = {
             'profile': profile_name,
@@ -380,72 +498,49 @@ class WAFConfigExtractor:
             account_result['account_info'] = account_info
 
             if 'error' in account_info:
-                print(f"✗ 无法获取账户信息: {account_info['error']}")
+                logger.info(f"✗ 无法获取账户信息: {account_info['error']}")
                 return account_result
 
-            print(f"✓ 账户 ID: {account_info['account_id']}")
+            logger.info(f"✓ 账户 ID: {account_info['account_id']}")
 
-            # ========================================
-            # 步骤 1: 扫描 CLOUDFRONT scope Web ACLs
-            # CloudFront 是全球服务，必须始终从 us-east-1 查询
-            # ========================================
-            print(f"\n  扫描 CLOUDFRONT scope (全球服务)...")
-            cloudfront_acls = self.get_web_acls_in_region(
-                session, 'us-east-1', 'CLOUDFRONT'
+            # CLOUDFRONT scope：CloudFront 是全球服务，必须始终从 us-east-1 查询
+            # REGIONAL scope：所有区域都扫描
+            tasks = [('us-east-1', 'CLOUDFRONT')] + [(region, 'REGIONAL') for region in self.regions]
+            logger.info(f"\n  并行扫描 CLOUDFRONT scope (全球服务) 和 {len(self.regions)} 个区域的 REGIONAL scope...")
+
+            acls_by_task = self._map_concurrently(
+                lambda task: self.get_web_acls_in_region(session, task[0], task[1]),
+                tasks, self.MAX_REGION_WORKERS
             )
+            cloudfront_acls = acls_by_task[0]
 
-            # 如果有 CloudFront ACLs，将其添加到 us-east-1 区域结果
-            # 如果 us-east-1 不在扫描列表中，仍然要添加它
+            # 组装区域结果（区域 -> 结果，保持插入顺序）：
+            # 有 CloudFront ACLs 时 us-east-1 排在最前（即使 us-east-1 不在扫描列表中），
+            # 其余区域按扫描列表顺序，只保存有 ACL 的区域
+            regions_by_name = {}
             if cloudfront_acls:
-                cloudfront_region_result = {
+                regions_by_name['us-east-1'] = {
                     'region': 'us-east-1',
                     'cloudfront_acls': cloudfront_acls,
                     'regional_acls': []
                 }
-                # 检查是否已经有 us-east-1 的结果（从后续区域扫描中）
-                us_east_1_exists = False
-                for idx, r in enumerate(account_result['regions']):
-                    if r['region'] == 'us-east-1':
-                        account_result['regions'][idx]['cloudfront_acls'] = cloudfront_acls
-                        us_east_1_exists = True
-                        break
-                if not us_east_1_exists:
-                    account_result['regions'].append(cloudfront_region_result)
-
-            # ========================================
-            # 步骤 2: 扫描各个区域的 REGIONAL scope Web ACLs
-            # ========================================
-            for region in self.regions:
-                print(f"\n  扫描区域: {region}")
-
-                # 检查是否已经有这个区域的结果（可能在步骤1中添加了 us-east-1）
-                region_result = None
-                for r in account_result['regions']:
-                    if r['region'] == region:
-                        region_result = r
-                        break
-
-                if region_result is None:
-                    region_result = {
+
+            for region, regional_acls in zip(self.regions, acls_by_task[1:]):
+                region_result = regions_by_name.get(region)
+                if region_result is not None:
+                    region_result['regional_acls'] = regional_acls
+                elif regional_acls:
+                    regions_by_name[region] = {
                         'region': region,
                         'cloudfront_acls': [],
-                        'regional_acls': []
+                        'regional_acls': regional_acls
                     }
 
-                # REGIONAL scope - 所有区域都扫描
-                print(f"    检查 REGIONAL scope...")
-                region_result['regional_acls'] = self.get_web_acls_in_region(
-                    session, region, 'REGIONAL'
-                )
-
-                # 只保存有 ACL 的区域
-                if region_result not in account_result['regions']:
-                    if region_result['cloudfront_acls'] or region_result['regional_acls']:
-                        account_result['regions'].append(region_result)
+            account_result['regions'] = list(regions_by_name.values())
 
         except Exception as e:
             account_result['error'] = str(e)
-            print(f"✗ 扫描账户失败: {str(e)}")
+            logger.info(f"✗ 扫描账户失败: {str(e)}")
 
         return account_result
 
@@ -456,12 +551,12 @@ class WAFConfigExtractor:
         Args:
             parallel: 是否并行扫描多个账户
         """
-        print(f"\n开始扫描 {len(self.profile_names)} 个账户...")
-        print(f"扫描区域: {', '.join(self.regions)}")
+        self._log_lines([f"\n开始扫描 {len(self.profile_names)} 个账户...", f"扫描区域: {', '.join(self.regions)}"])
 
         if parallel and len(self.profile_names) > 1:
-            # 并行扫描
-            with ThreadPoolExecutor(max_workers=3) as executor:
+            # 并行扫描（每个账户内的区域另由 MAX_REGION_WORKERS 个线程并行扫描）
+            workers = min(len(self.profile_names), self.MAX_ACCOUNT_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
                 futures = {
                     executor.submit(self.scan_account, profile): profile
                     for profile in self.profile_names
@@ -473,7 +568,7 @@ class WAFConfigExtractor:
                         result = future.result()
                         self.results.append(result)
                     except Exception as e:
-                        print(f"✗ 处理 {profile} 时出错: {str(e)}")
+                        logger.info(f"✗ 处理 {profile} 时出错: {str(e)}")
         else:
             # 串行扫描
             for profile in self.profile_names:
@@ -504,16 +599,14 @@ class WAFConfigExtractor:
 
     def print_summary(self):
         """打印扫描摘要"""
-        print(f"\n{'='*80}")
-        print("扫描摘要")
-        print(f"{'='*80}")
+        lines = ['', '=' * 80, "扫描摘要", '=' * 80]
 
         total_acls = 0
         total_resources = 0
 
         for account in self.results:
             account_id = account.get('account_info', {}).get('account_id', 'Unknown')
-            print(f"\n账户 {account_id} ({account['profile']}):")
+            lines.append(f"\n账户 {account_id} ({account['profile']}):")
 
             for region_data in account.get('regions', []):
                 cloudfront_acls = region_data.get('cloudfront_acls', [])
@@ -525,18 +618,19 @@ class WAFConfigExtractor:
                 if cloudfront_count > 0:
                     # 统计 CloudFront ACL 关联的资源
                     cf_resources = sum(len(acl.get('associated_resources', [])) for acl in cloudfront_acls)
-                    print(f"  - {region_data['region']} (CLOUDFRONT): {cloudfront_count} 个 Web ACL, {cf_resources} 个关联资源")
+                    lines.append(f"  - {region_data['region']} (CLOUDFRONT): {cloudfront_count} 个 Web ACL, {cf_resources} 个关联资源")
                     total_acls += cloudfront_count
                     total_resources += cf_resources
 
                 if regional_count > 0:
                     # 统计 Regional ACL 关联的资源
                     reg_resources = sum(len(acl.get('associated_resources', [])) for acl in regional_acls)
-                    print(f"  - {region_data['region']} (REGIONAL): {regional_count} 个 Web ACL, {reg_resources} 个关联资源")
+                    lines.append(f"  - {region_data['region']} (REGIONAL): {regional_count} 个 Web ACL, {reg_resources} 个关联资源")
                     total_acls += regional_count
                     total_resources += reg_resources
 
-        print(f"\n总计: {total_acls} 个 Web ACL, {total_resources} 个关联资源")
+        lines.append(f"\n总计: {total_acls} 个 Web ACL, {total_resources} 个关联资源")
+        self._log_lines(lines)
 
 
 def main():
@@ -656,10 +750,15 @@ def main():
         debug=args.debug
     )
 
-    # 执行扫描
+    # 执行扫描（扫描进度通过日志队列输出）
     try:
-        extractor.scan_all_accounts(parallel=not args.no_parallel)
-        extractor.print_summary()
+        listener = setup_logging(args.debug)
+        try:
+            extractor.scan_all_accounts(parallel=not args.no_parallel)
+            extractor.print_summary()
+        finally:
+            listener.stop()
+
         extractor.save_results(args.output, save_latest=not args.no_latest)
 
     except KeyboardInterrupt:
@@ -61,9 +61,18 @@ def cmd_scan(args):
     if args.no_parallel:
         cmd.append('--no-parallel')
 
+    if args.max_account_workers is not None:
+        cmd.extend(['--max-account-workers', str(args.max_account_workers)])
+
     if args.no_latest:
         cmd.append('--no-latest')
 
+    if args.delegation_set:
+        cmd.append('--delegation-set')
+
+    if args.jsonl:
+        cmd.extend(['--jsonl', args.jsonl])
+
     return run_command(cmd, "Route53 配置扫描")
 
 
@@ -102,6 +111,12 @@ def cmd_analyze(args):
     if args.csv:
         cmd.extend(['--csv', args.csv])
 
+    if args.in_memory:
+        cmd.append('--in-memory')
+
+    if args.jobs != 1:
+        cmd.extend(['--jobs', str(args.jobs)])
+
     return run_command(cmd, "Route53 配置分析")
 
 
@@ -189,8 +204,14 @@ def main():
 
     scan_parser.add_argument('--no-parallel', action='store_true',
                             help='禁用并行扫描')
+    scan_parser.add_argument('--max-account-workers', type=int,
+                            help='并行扫描的账户数（默认 8，或配置文件 scan_options.account_workers）')
     scan_parser.add_argument('--no-latest', action='store_true',
                             help='只生成带时间戳的文件，不生成 latest 文件')
+    scan_parser.add_argument('--delegation-set', action='store_true',
+                            help='获取每个 Zone 的 DelegationSet（NS 服务器），默认不获取')
+    scan_parser.add_argument('--jsonl', metavar='FILE',
+                            help='每个账户扫描完成后立即追加一行到该 JSONL 文件（内存中不保留完整结果）')
 
     # ========== analyze 子命令 ==========
     analyze_parser = subparsers.add_parser('analyze', help='分析 Route53 配置')
@@ -222,6 +243,12 @@ def main():
     analyze_parser.add_argument('--csv',
                                help='导出为 CSV 文件')
 
+    analyze_parser.add_argument('--in-memory', action='store_true',
+                               help='一次性加载整个 JSON 文件（默认使用 ijson 流式解析）')
+
+    analyze_parser.add_argument('--jobs', type=int, default=1,
+                               help='完整分析时并行分析账户的进程数（默认: 1）')
+
     # ========== check-env 子命令 ==========
     check_env_parser = subparsers.add_parser('check-env', help='检查环境配置')
 
@@ -8,6 +8,7 @@ AWS Security Audit CLI
 import argparse
 import sys
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 # 导入关联分析器和可视化生成器
@@ -70,6 +71,11 @@ Examples:
         action='store_true',
         help='Enable debug mode'
     )
+    correlate_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not use the correlator index cache (~/.cache/waf-correlator)'
+    )
 
     # check-env 子命令
     check_env_parser = subparsers.add_parser(
@@ -134,7 +140,8 @@ def run_correlate(args):
             args.waf_json,
             args.alb_json,
             args.route53_json,
-            debug=args.debug
+            debug=args.debug,
+            use_cache=not args.no_cache
         )
 
         print("\n" + "=" * 60)
@@ -162,8 +169,8 @@ def run_correlate(args):
         # 显示警告
         if correlator.warnings:
             print(f"\n⚠️  Warnings: {len(correlator.warnings)}")
-            for warning in correlator.warnings[:5]:
-                print(f"  - {warning['message']}")
+            for warning in islice(correlator.warnings, 5):
+                print(f"  - {warning.message}")
             if len(correlator.warnings) > 5:
                 print(f"  ... and {len(correlator.warnings) - 5} more (see report)")
 
@@ -213,13 +220,12 @@ def run_check_env():
     if py_version.major < 3 or (py_version.major == 3 and py_version.minor < 7):
         issues.append("Python 3.7+ is required")
 
-    # 检查 networkx
+    # 检查 networkx（可选，仅导出 networkx 图对象时需要）
     try:
         import networkx
         print(f"✓ networkx: {networkx.__version__}")
     except ImportError:
-        print("✗ networkx: Not installed")
-        issues.append("networkx is required (pip install networkx)")
+        print("- networkx: Not installed (optional)")
 
     # 检查 jinja2
     try:
@@ -73,6 +73,9 @@ class SecurityVisualizer:
             'children': []
         }
 
+        albs_by_location = self.correlator.albs_by_location
+        wafs_by_location = self.correlator.wafs_by_location
+
         # 按账户分组
         for account_id in sorted(self.correlator.accounts):
             account_node = {
@@ -83,10 +86,8 @@ class SecurityVisualizer:
             # 按区域分组
             for region in sorted(self.correlator.regions):
                 # 获取该账户和区域的资源
-                region_albs = [alb for alb in self.correlator.alb_arn_index.values()
-                              if alb.get('account_id') == account_id and alb.get('region') == region]
-                region_wafs = [waf for waf in self.correlator.waf_arn_index.values()
-                              if waf.get('account_id') == account_id and waf.get('region') == region]
+                region_albs = albs_by_location.get((account_id, region), ())
+                region_wafs = wafs_by_location.get((account_id, region), ())
 
                 if not region_albs and not region_wafs:
                     continue
@@ -230,7 +231,7 @@ class SecurityVisualizer:
             'tree_diagram': self.generate_tree_data(),
             'dashboard': self.generate_dashboard_data(),
             'vulnerabilities': self.generate_vulnerability_table(),
-            'warnings': self.correlator.warnings,
+            'warnings': [warning.as_dict() for warning in self.correlator.warnings],
             'statistics': self.correlator.generate_statistics()
         }
 
@@ -254,6 +255,7 @@ def main():
                        default=f"security_audit_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
     parser.add_argument('--json', action='store_true', help='Also output JSON data file')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the correlator index cache')
 
     args = parser.parse_args()
 
@@ -266,7 +268,8 @@ def main():
             args.waf_json,
             args.alb_json,
             args.route53_json,
-            debug=args.debug
+            debug=args.debug,
+            use_cache=not args.no_cache
         )
 
         # 执行关联分析